@@ -81,6 +81,8 @@ from django import forms
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import User, Profile, Problem, Submission, Contest, ContestParticipant
+from .testdata import load_cases, save_cases
+from . import problem_cache, scoreboard
 
 # ---------- helpers ----------
 
@@ -184,7 +186,7 @@ class ProblemAdminForm(forms.ModelForm):
     class Meta:
         model = Problem
         # IMPORTANT: exclude JSON fields we will manage ourselves
-        exclude = ("author", "tags", "test_cases")
+        exclude = ("author", "tags", "test_manifest")
 
     # hold parsed values so we can assign them in save()
     _parsed_tags: list = None
@@ -204,12 +206,7 @@ class ProblemAdminForm(forms.ModelForm):
             self.initial["tags_text"] = ", ".join(tags)
 
         # Prefill input/output boxes from saved cases
-        cases = getattr(self.instance, "test_cases", None) or []
-        if isinstance(cases, str):
-            try:
-                cases = json.loads(cases)
-            except Exception:
-                cases = []
+        cases = load_cases(self.instance) if self.instance.pk else []
         if cases:
             in_lines, out_lines = [], []
             for i, c in enumerate(cases):
@@ -266,13 +263,16 @@ class ProblemAdminForm(forms.ModelForm):
             c.setdefault("is_hidden", True)
 
         self._parsed_cases = cases
+
+        if cleaned.get("checker") == Problem.Checker.CUSTOM and not (cleaned.get("checker_code") or "").strip():
+            raise forms.ValidationError("A custom checker needs checker code.")
         return cleaned
 
     def save(self, commit=True):
         obj = super().save(commit=False)
         # assign parsed fields to the model
         obj.tags = self._parsed_tags or []
-        obj.test_cases = self._parsed_cases or []
+        save_cases(obj, self._parsed_cases or [])
         # author defaulting if you want (Admin's save_model also does this)
         if commit:
             obj.save()
@@ -290,16 +290,33 @@ class ProblemAdmin(admin.ModelAdmin):
         if not obj.pk and not obj.author_id:
             obj.author = request.user
         super().save_model(request, obj, form, change)
+        problem_cache.invalidate(obj.pk)
+
+    def delete_model(self, request, obj):
+        pk = obj.pk
+        super().delete_model(request, obj)
+        problem_cache.invalidate(pk)
+
+    def delete_queryset(self, request, queryset):
+        pks = list(queryset.values_list("pk", flat=True))
+        super().delete_queryset(request, queryset)
+        for pk in pks:
+            problem_cache.invalidate(pk)
 
 
 
 # Rest of your registrations unchanged
 @admin.register(Contest)
 class ContestAdmin(admin.ModelAdmin):
-    list_display = ('title', 'start_time', 'end_time')
+    list_display = ('title', 'scoring', 'start_time', 'end_time')
     search_fields = ('title',)
     filter_horizontal = ('problems',)
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # times, problems or scoring may have changed: standings reload everywhere
+        scoreboard.changed(form.instance.pk)
+
 @admin.register(Submission)
 class SubmissionAdmin(admin.ModelAdmin):
     list_display = ('problem', 'user', 'language', 'verdict', 'submitted_at')
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        # judge workers start with the first request, not in manage.py commands
+        from django.core.signals import request_started
+        from .judge_queue import start_on_first_request, _START_UID
+        request_started.connect(start_on_first_request, dispatch_uid=_START_UID)
@@ -0,0 +1,108 @@
+# CodeArena/codearena_api/api/checkers.py
+"""
+Output checkers, selected per problem by `Problem.checker`.
+
+Built-in comparators walk both outputs lazily (line by line or token by
+token) and stop at the first difference, so a large output that is wrong on
+line 3 is not copied or normalised as a whole. Each returns (ok, message).
+
+  exact   lines must match; CRLF is treated as LF and trailing whitespace
+          at the very end of the output is ignored (the old behaviour)
+  tokens  whitespace-separated tokens must match
+  float   like tokens, but numbers are equal within an absolute or
+          relative `checker_epsilon`
+  custom  the problem's own checker program, run in the executor (/check)
+"""
+import math, re
+from itertools import zip_longest
+from typing import Callable, Iterator, Optional, Tuple
+
+CheckResult = Tuple[bool, str]
+
+_TOKEN = re.compile(r"\S+")
+
+
+def _lines(s: str) -> Iterator[str]:
+    start = 0
+    while True:
+        end = s.find("\n", start)
+        if end < 0:
+            yield s[start:].rstrip("\r")
+            return
+        yield s[start:end].rstrip("\r")
+        start = end + 1
+
+
+def _blank_rest(it: Iterator[str]) -> bool:
+    return all(not line.strip() for line in it)
+
+
+def _short(s: str, n: int = 40) -> str:
+    return s if len(s) <= n else s[:n] + "…"
+
+
+def exact(expected: str, actual: str) -> CheckResult:
+    exp, act = _lines(expected or ""), _lines(actual or "")
+    for n, (e, a) in enumerate(zip_longest(exp, act), start=1):
+        if e == a:
+            continue
+        # a difference only in trailing whitespace is fine if nothing but
+        # whitespace follows in either output
+        if (e or "").rstrip() == (a or "").rstrip() and _blank_rest(exp) and _blank_rest(act):
+            return True, ""
+        if a is None:
+            return False, f"Output ended early at line {n}"
+        if e is None:
+            return False, f"Extra output from line {n}"
+        return False, f"Line {n} differs: expected {_short(e)!r}, got {_short(a)!r}"
+    return True, ""
+
+
+def _token_pairs(expected: str, actual: str):
+    exp = (m.group() for m in _TOKEN.finditer(expected or ""))
+    act = (m.group() for m in _TOKEN.finditer(actual or ""))
+    return enumerate(zip_longest(exp, act), start=1)
+
+
+def tokens(expected: str, actual: str) -> CheckResult:
+    for n, (e, a) in _token_pairs(expected, actual):
+        if e != a:
+            return False, _token_mismatch(n, e, a)
+    return True, ""
+
+
+def floats(epsilon: float) -> Callable[[str, str], CheckResult]:
+    def check(expected: str, actual: str) -> CheckResult:
+        for n, (e, a) in _token_pairs(expected, actual):
+            if e == a:
+                continue
+            if e is None or a is None:
+                return False, _token_mismatch(n, e, a)
+            try:
+                x, y = float(e), float(a)
+            except ValueError:
+                return False, _token_mismatch(n, e, a)
+            if math.isnan(x) or math.isnan(y) or abs(x - y) > epsilon * max(1.0, abs(x)):
+                return False, _token_mismatch(n, e, a)
+        return True, ""
+    return check
+
+
+def _token_mismatch(n: int, e: Optional[str], a: Optional[str]) -> str:
+    if a is None:
+        return f"Output ended early at token {n}"
+    if e is None:
+        return f"Extra output at token {n}"
+    return f"Token {n} differs: expected {_short(e)!r}, got {_short(a)!r}"
+
+
+def for_problem(problem) -> Optional[Callable[[str, str], CheckResult]]:
+    """Comparator for the problem's checker; None for custom checkers."""
+    kind = getattr(problem, "checker", "") or "exact"
+    if kind == "tokens":
+        return tokens
+    if kind == "float":
+        return floats(problem.checker_epsilon or 1e-6)
+    if kind == "custom":
+        return None
+    return exact
@@ -0,0 +1,299 @@
+# CodeArena/codearena_api/api/executor_client.py
+"""
+The one place that talks HTTP to the executor service.
+
+A single requests.Session keeps a pool of keep-alive connections, so judge
+workers running many batches do not pay a TCP handshake per call. Failures
+that are safe to repeat (connection refused/reset, connect timeout, 502/503/
+504 from a proxy or a restarting executor) are retried with exponential
+backoff, on another node when there is one; read timeouts are not, since
+the executor may still be running the job.
+
+Several executor nodes can be configured (EXECUTOR_NODES). Each has its own
+circuit breaker: after EXECUTOR_BREAKER_THRESHOLD consecutive failures the
+node is ejected for EXECUTOR_BREAKER_COOLDOWN seconds, then one trial call
+is let through. A background thread polls every node's /status for its
+queue depth, which also ejects and re-admits nodes without waiting for
+traffic.
+
+Each call goes to the least-loaded healthy node, except that calls with a
+`route_key` (the submission's source) prefer the same node every time so its
+compile cache is reused, as long as that node is not much busier than the
+least-loaded one.
+
+Calls return (payload, status) like the rest of the judge code; on failure
+payload is {"error": "..."}.
+"""
+import hashlib, logging, threading, time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+import requests
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger(__name__)
+
+_RETRY_STATUSES = {502, 503, 504}
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown or self._trial:
+                return False
+            self._trial = True  # half-open: a single probe call
+            return True
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    log.warning("executor circuit opened after %d failures", self.failures)
+                self.opened_at = time.monotonic()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "open" if time.monotonic() - self.opened_at < self.cooldown else "half-open"
+
+
+class Node:
+    """One executor instance: its endpoint URLs, health and last known load."""
+
+    def __init__(self, name: str, urls: Dict[str, str], breaker: CircuitBreaker):
+        self.name = name
+        self.urls = urls            # execute / batch / check / status
+        self.breaker = breaker
+        self.workers = 1
+        self.queued = 0             # running + waiting jobs as of the last /status
+        self.inflight = 0           # our own calls currently on this node
+
+    @classmethod
+    def from_base(cls, base: str, breaker: CircuitBreaker) -> "Node":
+        base = base.rstrip("/")
+        return cls(base, {
+            "execute": base + "/execute",
+            "batch": base + "/execute/batch",
+            "check": base + "/check",
+            "status": base + "/status",
+        }, breaker)
+
+    def load(self) -> float:
+        # /status lags behind; our own in-flight calls are a lower bound meanwhile
+        return max(self.queued, self.inflight) / max(1, self.workers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"circuit": self.breaker.state, "workers": self.workers,
+                "queued": self.queued, "inflight": self.inflight}
+
+
+def _rank(key: str, node: Node) -> str:
+    # rendezvous hashing: every key has a stable favourite node, and losing a
+    # node only moves the keys that preferred it
+    return hashlib.sha256(f"{key}\0{node.name}".encode()).hexdigest()
+
+
+def route_key_for(language: str, code: str) -> str:
+    """Sticky routing key: same source, same node, warm compile cache."""
+    return hashlib.sha256(f"{language}\0{code}".encode("utf-8")).hexdigest()
+
+
+class ExecutorClient:
+    def __init__(self, nodes: List[Node], pool_size: int = 20,
+                 retries: int = 2, backoff: float = 0.2, sticky_slack: float = 2.0):
+        self.nodes = nodes
+        self.retries = retries
+        self.backoff = backoff
+        self.sticky_slack = sticky_slack
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(4, len(nodes)), pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._latency = deque(maxlen=200)  # (endpoint, ms) of recent calls
+        self._lock = threading.Lock()
+        self._poller = None
+
+    # ---------- routing ----------
+
+    def _pick(self, route_key: Optional[str], exclude: List[Node]) -> Optional[Node]:
+        candidates = [n for n in self.nodes if n not in exclude and n.breaker.state != "open"]
+        if not candidates:
+            return None
+        order = sorted(candidates, key=Node.load)
+        if route_key:
+            home = max(candidates, key=lambda n: _rank(route_key, n))
+            if home.load() <= order[0].load() + self.sticky_slack:
+                order.remove(home)
+                order.insert(0, home)
+        # a half-open node admits only one probe at a time
+        return next((n for n in order if n.breaker.allow()), None)
+
+    def _post(self, name: str, body: Dict[str, Any], timeout: float,
+              route_key: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+        tried: List[Node] = []
+        attempt = 0
+        while True:
+            # prefer a node not tried yet for this call; fall back to any
+            node = self._pick(route_key, tried) or (self._pick(route_key, []) if tried else None)
+            if node is None:
+                return {"error": "Executor unavailable (no healthy node)"}, 503
+            with self._lock:
+                node.inflight += 1
+            t0 = time.perf_counter()
+            try:
+                r = self.session.post(node.urls[name], json=body, timeout=timeout)
+            except requests.ReadTimeout as e:
+                node.breaker.failure()
+                return {"error": f"Executor timed out: {e}"}, 504
+            except requests.RequestException as e:
+                node.breaker.failure()
+                if attempt < self.retries:
+                    attempt += 1
+                    tried.append(node)
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+                    continue
+                return {"error": f"Executor unreachable: {e}"}, 502
+            finally:
+                self._record(name, t0)
+                with self._lock:
+                    node.inflight -= 1
+            if r.status_code in _RETRY_STATUSES:
+                node.breaker.failure()
+                if attempt < self.retries:
+                    attempt += 1
+                    tried.append(node)
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+                    continue
+            else:
+                node.breaker.success()
+            if r.status_code != 200:
+                return {"error": f"Executor error: {r.text}"}, r.status_code
+            return r.json(), 200
+
+    # ---------- health ----------
+
+    def poll(self) -> None:
+        """Refresh load and health of every node from its /status."""
+        for node in self.nodes:
+            try:
+                r = self.session.get(node.urls["status"], timeout=2)
+                r.raise_for_status()
+                queue = r.json().get("queue", {})
+            except (requests.RequestException, ValueError):
+                node.breaker.failure()
+                continue
+            node.workers = int(queue.get("workers") or 1)
+            node.queued = int(queue.get("running", 0)) + int(queue.get("queue_depth", 0))
+            node.breaker.success()
+
+    def start_polling(self, interval: float) -> None:
+        """Background health/load polling; pointless with a single node."""
+        if self._poller is not None or len(self.nodes) < 2:
+            return
+
+        def loop():
+            while True:
+                self.poll()
+                time.sleep(interval)
+
+        self._poller = threading.Thread(target=loop, name="executor-health", daemon=True)
+        self._poller.start()
+
+    # ---------- calls ----------
+
+    def _record(self, name: str, t0: float) -> None:
+        ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self._latency.append((name, ms))
+        log.debug("executor %s %.1f ms", name, ms)
+
+    def execute(self, language: str, code: str, input_data: str = "",
+                timeout: float = 10, **limits) -> Tuple[Dict[str, Any], int]:
+        """Run `code` once on `input_data` (POST /execute)."""
+        body = {"code": code, "language": language, "input_data": input_data}
+        body.update({k: v for k, v in limits.items() if v is not None})
+        return self._post("execute", body, timeout)
+
+    def execute_batch(self, language: str, code: str, inputs: List[str],
+                      timeout: float, route_key: Optional[str] = None,
+                      **options) -> Tuple[Dict[str, Any], int]:
+        """Compile once and run every input (POST /execute/batch)."""
+        body = {"code": code, "language": language, "inputs": inputs}
+        body.update({k: v for k, v in options.items() if v is not None})
+        return self._post("batch", body, timeout, route_key)
+
+    def check(self, language: str, code: str, cases: List[Dict[str, str]],
+              timeout: float) -> Tuple[Dict[str, Any], int]:
+        """Run a custom checker over [{input, output, answer}, ...] (POST /check)."""
+        body = {"code": code, "language": language, "cases": cases}
+        return self._post("check", body, timeout, route_key_for(language, code))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = list(self._latency)
+        out = {"nodes": {n.name: n.stats() for n in self.nodes}}
+        for name in ("execute", "batch", "check"):
+            ms = sorted(m for n, m in samples if n == name)
+            if ms:
+                out[name] = {"calls": len(ms), "avg_ms": round(sum(ms) / len(ms), 1),
+                             "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 1)}
+        return out
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _nodes_from_settings() -> List[Node]:
+    def breaker():
+        return CircuitBreaker(getattr(settings, "EXECUTOR_BREAKER_THRESHOLD", 5),
+                              getattr(settings, "EXECUTOR_BREAKER_COOLDOWN", 15))
+
+    bases = [b.strip() for b in getattr(settings, "EXECUTOR_NODES", []) if b.strip()]
+    if bases:
+        return [Node.from_base(b, breaker()) for b in bases]
+    # a single executor, configured by its endpoint URLs
+    execute_url = getattr(settings, "EXECUTOR_URL", "http://127.0.0.1:8001/execute")
+    base = execute_url.rsplit("/", 1)[0]
+    return [Node(base, {
+        "execute": execute_url,
+        "batch": getattr(settings, "EXECUTOR_BATCH_URL", execute_url + "/batch"),
+        "check": getattr(settings, "EXECUTOR_CHECK_URL", base + "/check"),
+        "status": base + "/status",
+    }, breaker())]
+
+
+def get_client() -> ExecutorClient:
+    """Process-wide client configured from settings."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ExecutorClient(
+                _nodes_from_settings(),
+                pool_size=getattr(settings, "EXECUTOR_POOL_SIZE", 20),
+                retries=getattr(settings, "EXECUTOR_RETRIES", 2),
+                backoff=getattr(settings, "EXECUTOR_RETRY_BACKOFF", 0.2),
+                sticky_slack=getattr(settings, "EXECUTOR_STICKY_SLACK", 2.0),
+            )
+            _client.start_polling(getattr(settings, "EXECUTOR_HEALTH_INTERVAL", 5))
+        return _client
@@ -0,0 +1,397 @@
+# CodeArena/codearena_api/api/judge.py
+"""
+Judging helpers shared by the submit endpoints.
+
+Test cases are sent to the executor's /execute/batch endpoint, which
+compiles once per call and runs its inputs in one sandbox. Larger test sets
+are split into chunks that are judged concurrently. Outputs are compared by
+the problem's checker (see checkers.py).
+"""
+import hashlib, json, math, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+
+from . import checkers, leaderboard, problem_stats, scoreboard, testdata, user_stats
+from .executor_client import get_client, route_key_for
+from .models import Problem, Submission
+
+Verdict = Submission.Verdict
+
+# executor run status -> verdict
+_STATUS_VERDICT = {
+    "time_limit": Verdict.TIME_LIMIT_EXCEEDED,
+    "memory_limit": Verdict.MEMORY_LIMIT_EXCEEDED,
+    "output_limit": Verdict.OUTPUT_LIMIT_EXCEEDED,
+    "runtime_error": Verdict.RUNTIME_ERROR,
+}
+
+# verdict of a test that was never run (fail-fast or out of time budget)
+SKIPPED = "Skipped"
+
+# checker result when the executor could not be reached to run a custom checker
+_CHECKER_UNAVAILABLE = (False, "Checker failed: executor unavailable")
+
+
+# seconds the executor may spend per test case before we give up on the batch
+PER_CASE_HTTP_TIMEOUT = 10
+
+
+def _norm(s: str) -> str:
+    if s is None:
+        return ""
+    return s.replace("\r\n", "\n").rstrip()
+
+
+def run_batch(language: str, code: str, inputs: List[str],
+              time_limit: float = None, memory_limit: int = None,
+              stop_on_failure: bool = False, timeout: float = None,
+              route_key: str = None) -> Tuple[Dict[str, Any], int]:
+    """
+    POST a list of test inputs to the executor; limits are per test
+    (CPU seconds, MB) and enforced in the sandbox. Calls with the same
+    `route_key` go to the same executor node while it is healthy.
+    Returns (payload, status); on failure payload is {"error": "..."}.
+    """
+    return get_client().execute_batch(
+        language, code, inputs,
+        timeout=timeout or PER_CASE_HTTP_TIMEOUT * max(1, len(inputs)),
+        route_key=route_key,
+        time_limit=time_limit, memory_limit=memory_limit,
+        stop_on_failure=stop_on_failure,
+    )
+
+
+def check_outputs(problem, tests: List[Dict[str, Any]], runs: List[Dict[str, Any]]) -> List[checkers.CheckResult]:
+    """
+    Checker verdicts (ok, message) for the runs that finished cleanly; None
+    for the others, which get their verdict from the run status instead.
+    If the custom checker could not be run at all they are _CHECKER_UNAVAILABLE.
+    """
+    todo = [k for k, run in enumerate(runs)
+            if run.get("status", "ok") == "ok" and not _norm(run.get("stderr")) and not run.get("truncated")]
+    results = [None] * len(runs)
+    compare = checkers.for_problem(problem)
+    if compare is not None:
+        for k in todo:
+            results[k] = compare(tests[k].get("expected_output", "") or "", runs[k].get("stdout", "") or "")
+        return results
+    if not todo:
+        return results
+
+    payload, status = get_client().check(
+        problem.checker_language or "cpp", problem.checker_code,
+        [{"input": tests[k].get("input_data", "") or "",
+          "output": runs[k].get("stdout", "") or "",
+          "answer": tests[k].get("expected_output", "") or ""} for k in todo],
+        timeout=PER_CASE_HTTP_TIMEOUT * len(todo),
+    )
+    if status != 200:
+        for k in todo:
+            results[k] = _CHECKER_UNAVAILABLE
+        return results
+    error = payload.get("compile_error")
+    verdicts = payload.get("results", []) if not error else []
+    for n, k in enumerate(todo):
+        v = verdicts[n] if n < len(verdicts) else None
+        if v is None or v.get("failed"):
+            results[k] = (False, f"Checker failed: {error or (v or {}).get('message') or 'no result'}")
+        else:
+            results[k] = (bool(v.get("ok")), v.get("message", ""))
+    return results
+
+
+def _evaluate(i: int, tc: Dict[str, Any], payload: Dict[str, Any], status: int, run,
+              checked: checkers.CheckResult = None) -> Dict[str, Any]:
+    """
+    Build the result item for test `i` from its executor run and the
+    checker's (ok, message) for it. `run` is None when the executor skipped
+    the test (stop_on_failure). Tests the executor failed to run (unreachable,
+    timed out, no healthy node) or whose output it could not return whole
+    are marked internal_error: the verdict is not the submission's.
+    """
+    hidden = bool(tc.get("is_hidden", True))
+    visibility = "hidden" if hidden else "public"
+    compile_error = payload.get("compile_error", "") if status == 200 else ""
+
+    if status != 200 or compile_error:
+        item = {
+            "test_case": i, "passed": False,
+            "verdict": Verdict.COMPILATION_ERROR if compile_error else Verdict.RUNTIME_ERROR,
+            "error": compile_error or payload.get("error", "Executor error"),
+            "runtime_ms": 0,
+            "visibility": visibility,
+        }
+        if status != 200:
+            item["internal_error"] = True
+        return item
+    if run is None:
+        return _skipped(i, tc)
+
+    if run.get("truncated") and run.get("status") == "ok":
+        # only part of the output came back: it cannot be checked
+        return {"test_case": i, "passed": False, "verdict": Verdict.RUNTIME_ERROR,
+                "error": "Output could not be read back", "runtime_ms": int(run.get("time_ms", 0)),
+                "visibility": visibility, "internal_error": True}
+
+    err = _norm(run.get("stderr", "") or "")
+    message = ""
+    case_verdict = _STATUS_VERDICT.get(run.get("status"))
+    if case_verdict == Verdict.RUNTIME_ERROR:
+        err = err or f"Exited with code {run.get('exit_code')}"
+    elif case_verdict is not None:
+        err = err or case_verdict.label
+    elif err:
+        case_verdict = Verdict.RUNTIME_ERROR
+    else:
+        passed, message = checked or (False, "Not checked")
+        case_verdict = Verdict.ACCEPTED if passed else Verdict.WRONG_ANSWER
+    ok = case_verdict == Verdict.ACCEPTED
+
+    item = {
+        "test_case": i, "passed": ok,
+        "verdict": case_verdict,
+        "runtime_ms": int(run.get("time_ms", 0)),
+        "memory_kb": int(run.get("memory_kb", 0)),
+        "visibility": visibility,
+    }
+    if checked is _CHECKER_UNAVAILABLE:
+        item["internal_error"] = True
+    if not hidden:
+        item["expected"] = _norm(tc.get("expected_output", "") or "")
+        item["actual"]   = _norm(run.get("stdout", "") or "")
+        if err: item["error"] = err
+        if message and not ok: item["checker"] = message
+    else:
+        if err and not ok: item["error"] = err
+    return item
+
+
+def _skipped(i: int, tc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "test_case": i, "passed": False, "skipped": True,
+        "verdict": SKIPPED,
+        "runtime_ms": 0,
+        "visibility": "hidden" if tc.get("is_hidden", True) else "public",
+    }
+
+
+def judge(problem, language: str, code: str, stop_on_failure: bool = None) -> Dict[str, Any]:
+    """
+    Run `code` against every test case of `problem`.
+    Returns { verdict, passed, total, total_runtime_ms, peak_memory_kb,
+    internal_error, results }; internal_error is set when some test could not
+    be judged because of the executor, not the submission.
+    Runtimes are CPU time of the user program as measured in the sandbox;
+    the problem's time/memory limits decide TLE and MLE per test.
+
+    Tests go out in chunks of JUDGE_BATCH_SIZE, up to JUDGE_MAX_PARALLEL_BATCHES
+    at a time. With JUDGE_STOP_ON_FIRST_FAILURE no new chunk is started once a
+    test failed (and the executor stops within the chunk); tests not run are
+    reported as skipped. Nothing new starts after JUDGE_TIME_BUDGET seconds.
+    `stop_on_failure` overrides the setting (IOI contests score every test).
+    """
+    tests = testdata.cases(problem)  # loaded from the store chunk by chunk
+    size = max(1, getattr(settings, "JUDGE_BATCH_SIZE", 5))
+    parallel = max(1, getattr(settings, "JUDGE_MAX_PARALLEL_BATCHES", 4))
+    stop_early = (getattr(settings, "JUDGE_STOP_ON_FIRST_FAILURE", True)
+                  if stop_on_failure is None else stop_on_failure)
+    deadline = time.monotonic() + getattr(settings, "JUDGE_TIME_BUDGET", 120)
+    # every chunk on the node that compiled (and cached) this source
+    route = route_key_for(language, code)
+
+    def run_chunk(lo: int, hi: int) -> List[Dict[str, Any]]:
+        def run(inputs: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], int]:
+            left = max(1.0, deadline - time.monotonic())
+            return run_batch(
+                language, code, [tc.get("input_data", "") or "" for tc in inputs],
+                time_limit=problem.time_limit, memory_limit=problem.memory_limit,
+                stop_on_failure=stop_early,
+                timeout=min(left, PER_CASE_HTTP_TIMEOUT * len(inputs)),
+                route_key=route,
+            )
+
+        payload, status = run(tests[lo:hi])
+        runs = payload.get("results", []) if status == 200 else []
+        for k, r in enumerate(runs):
+            if r.get("truncated") and r.get("status") == "ok":
+                # its output did not fit in the batch's reply; on its own it does
+                again, again_status = run(tests[lo + k:lo + k + 1])
+                if again_status == 200 and again.get("results"):
+                    runs[k] = again["results"][0]
+        checked = check_outputs(problem, tests[lo:hi], runs)
+        return [
+            _evaluate(j + 1, tests[j], payload, status,
+                      runs[j - lo] if j - lo < len(runs) else None,
+                      checked[j - lo] if j - lo < len(runs) else None)
+            for j in range(lo, hi)
+        ]
+
+    items: List[Dict[str, Any]] = [None] * len(tests)
+    pending = deque((lo, min(lo + size, len(tests))) for lo in range(0, len(tests), size))
+    failed = False
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        inflight = {}
+        while pending or inflight:
+            while (pending and len(inflight) < parallel
+                   and not (stop_early and failed) and time.monotonic() < deadline):
+                lo, hi = pending.popleft()
+                inflight[pool.submit(run_chunk, lo, hi)] = (lo, hi)
+            if not inflight:
+                break
+            done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                lo, hi = inflight.pop(fut)
+                items[lo:hi] = fut.result()
+                failed = failed or any(not (it["passed"] or it.get("skipped")) for it in items[lo:hi])
+
+    results = [item or _skipped(i, tc) for i, (item, tc) in enumerate(zip(items, tests), start=1)]
+    passed = sum(1 for r in results if r["passed"])
+    total_time = sum(r["runtime_ms"] for r in results)
+    peak_kb = max((r.get("memory_kb", 0) for r in results), default=0)
+
+    # the submission takes the verdict of its first failing test; tests left
+    # unjudged without any failure mean the time budget ran out
+    verdict = next((r["verdict"] for r in results if not r["passed"] and not r.get("skipped")), None)
+    if verdict is None:
+        verdict = Verdict.TIME_LIMIT_EXCEEDED if passed < len(tests) else Verdict.ACCEPTED
+
+    return {
+        "verdict": verdict,
+        "passed": passed,
+        "total": len(tests),
+        "total_runtime_ms": total_time,
+        "peak_memory_kb": peak_kb,
+        "internal_error": any(r.get("internal_error") for r in results),
+        "results": results,
+    }
+
+
+# verdicts that depend on machine load are judged again rather than reused
+_NOT_MEMOIZED = {Verdict.PENDING, Verdict.TIME_LIMIT_EXCEEDED}
+
+
+def memoizable(report: Dict[str, Any]) -> bool:
+    """
+    Whether a report may be reused for identical code: every test actually
+    ran (none skipped, none lost to an executor failure) and the verdict does
+    not depend on load.
+    """
+    results = (report or {}).get("results") or []
+    return (bool(results) and len(results) == report.get("total")
+            and report.get("verdict") not in _NOT_MEMOIZED
+            and not report.get("internal_error")
+            and not any(r.get("skipped") or r.get("internal_error") for r in results))
+
+
+# the Problem fields problem_fingerprint() reads
+_VERDICT_FIELDS = ("test_manifest", "time_limit", "memory_limit", "checker",
+                   "checker_epsilon", "checker_language", "checker_code")
+
+
+def problem_fingerprint(problem) -> str:
+    """
+    Changes whenever anything that can change a verdict or its report is
+    edited: test data and visibility, limits, checker.
+    """
+    data = {
+        # visibility too: reports show the input/output of public tests only
+        "tests": [(t.get("input"), t.get("output"), bool(t.get("is_hidden", True)))
+                  for t in (problem.test_manifest or [])],
+        "time_limit": problem.time_limit,
+        "memory_limit": problem.memory_limit,
+        "checker": [problem.checker, problem.checker_epsilon,
+                    problem.checker_language, problem.checker_code],
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def judge_key(problem, language: str, code: str) -> str:
+    """Memoization key: (problem, its test-data version, language, normalized code)."""
+    lines = (code or "").replace("\r\n", "\n").split("\n")
+    normalized = "\n".join(line.rstrip() for line in lines).strip("\n")
+    h = hashlib.sha256()
+    for part in (str(problem.pk), problem_fingerprint(problem), language, normalized):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def create_pending(problem, user, language: str, code: str) -> Tuple[Submission, bool]:
+    """
+    Store a submission. If identical code was already judged on the same
+    version of the problem, it is recorded with that verdict and report right
+    away (returns (submission, True)); otherwise it is left Pending for the
+    judge queue (returns (submission, False)).
+    `problem` may come from problem_cache; the key is built from the
+    database's current test data, limits and checker, never a cached copy.
+    """
+    current = Problem.objects.filter(pk=problem.pk).only("pk", *_VERDICT_FIELDS).first()
+    key = judge_key(current or problem, language, code)
+    previous = None
+    if getattr(settings, "JUDGE_MEMOIZE", True):
+        previous = (Submission.objects.filter(judge_key=key)
+                    .exclude(verdict__in=_NOT_MEMOIZED)
+                    .only("verdict", "execution_time", "memory_used", "judge_report")
+                    .order_by("-submitted_at").first())
+        # complete reports only: an executor failure or a fail-fast stop is judged again
+        if previous is not None and not memoizable(previous.judge_report):
+            previous = None
+    if previous is not None:
+        submission = Submission.objects.create(
+            problem=problem, user=user, code=code, language=language, judge_key=key,
+            verdict=previous.verdict, execution_time=previous.execution_time,
+            memory_used=previous.memory_used, judge_report=previous.judge_report,
+        )
+        user_stats.record(submission, new=True, first_solve=leaderboard.record(submission))
+        problem_stats.record(submission, new=True)
+        scoreboard.record(submission)
+        return submission, True
+    submission = Submission.objects.create(
+        problem=problem, user=user,
+        code=code, language=language, judge_key=key,
+        verdict=Verdict.PENDING,
+    )
+    user_stats.record(submission, new=True, first_solve=False)
+    problem_stats.record(submission, new=True)
+    return submission, False
+
+
+def apply_report(submission: Submission, report: Dict[str, Any], attempt: int = None):
+    """
+    Persist a judge report: verdict, total CPU seconds, peak memory in MB and
+    per-test results; an accepted verdict goes on the leaderboard and the
+    user's and the problem's counters, and every verdict on the standings of
+    running contests. With `attempt` (the judge queue's claim), the report is
+    only stored while the submission is still Pending under that claim;
+    returns None without storing or counting anything otherwise.
+    """
+    fields = {
+        "verdict": report["verdict"],
+        "execution_time": report["total_runtime_ms"] / 1000.0,
+        "memory_used": math.ceil(report.get("peak_memory_kb", 0) / 1024),
+        "judge_report": report,
+    }
+    rows = Submission.objects.filter(pk=submission.pk)
+    if attempt is not None:
+        rows = rows.filter(verdict=Verdict.PENDING, judge_attempts=attempt)
+    if not rows.update(**fields):
+        return None
+    for name, value in fields.items():
+        setattr(submission, name, value)
+    user_stats.record(submission, new=False, first_solve=leaderboard.record(submission))
+    problem_stats.record(submission, new=False)
+    scoreboard.record(submission)
+    return submission
+
+
+def submission_status(submission: Submission) -> Dict[str, Any]:
+    """Status payload for polling clients; the judge report once judged."""
+    data = {"id": submission.pk, "verdict": submission.verdict,
+            "done": submission.verdict != Verdict.PENDING}
+    if data["done"]:
+        data.update(submission.judge_report or {})
+        data["verdict"] = submission.verdict
+    return data
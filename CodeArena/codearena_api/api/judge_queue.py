@@ -0,0 +1,230 @@
+# CodeArena/codearena_api/api/judge_queue.py
+"""
+Asynchronous judging.
+
+Submit only stores a Submission in Pending state and hands its id to the
+judge queue; a pool of worker threads judges it and fills in the verdict
+and per-test report. Pending rows in the database are the durable part of
+the queue: one thread per process scans every JUDGE_POLL_INTERVAL seconds
+for rows nobody holds (never claimed, or claimed more than
+JUDGE_CLAIM_TIMEOUT seconds ago), so nothing is lost when a process
+restarts and a row claimed by a worker that died is picked up again.
+
+A claim is the submission's judge_attempts count. The verdict is only
+stored while the submission is still Pending under the claim it was judged
+with, so a worker that was taken over for being slow stores nothing and
+counts nothing.
+
+A submission whose judging raised, or whose report says the executor could
+not run some tests, stays Pending and is retried after JUDGE_RETRY_DELAY
+seconds (doubling per attempt; the claim is dated so that it goes stale
+then). After JUDGE_MAX_ATTEMPTS attempts it gets a Runtime Error report
+marked internal_error.
+
+Workers run inside the web process (JUDGE_WORKERS threads, started with its
+first request) or standalone via `python manage.py judge_worker`. With
+JUDGE_WORKERS=0 web processes only store the Pending rows.
+
+The queue is fair-share: every user has their own FIFO and workers take
+from the users in round-robin order, so someone with fifty submissions
+queued delays another user's single submission by at most one job.
+"""
+import logging, threading, time
+from collections import OrderedDict, deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from . import scoreboard
+from .judge import judge, apply_report
+from .models import Submission
+
+log = logging.getLogger(__name__)
+
+Verdict = Submission.Verdict
+
+
+def _claim_timeout() -> timedelta:
+    return timedelta(seconds=getattr(settings, "JUDGE_CLAIM_TIMEOUT", 600))
+
+
+def _unclaimed() -> Q:
+    """Pending rows nobody holds: never claimed, or the claim went stale."""
+    stale = timezone.now() - _claim_timeout()
+    return Q(verdict=Verdict.PENDING) & (Q(judge_started_at__isnull=True) | Q(judge_started_at__lt=stale))
+
+
+def _claim(submission_id):
+    """
+    Atomically mark a Pending submission as taken by this worker; returns
+    which attempt at judging it this is, or None if it is not ours to judge.
+    """
+    attempts = (Submission.objects.filter(pk=submission_id, verdict=Verdict.PENDING)
+                .values_list("judge_attempts", flat=True).first())
+    if attempts is None:
+        return None
+    claimed = Submission.objects.filter(
+        _unclaimed(), pk=submission_id, judge_attempts=attempts,
+    ).update(judge_started_at=timezone.now(), judge_attempts=attempts + 1)
+    return attempts + 1 if claimed == 1 else None
+
+
+def _retry_later(submission_id, attempt: int) -> None:
+    """Leave a claimed submission Pending and let it be claimed again after a backoff."""
+    delay = min(getattr(settings, "JUDGE_RETRY_DELAY", 30) * 2 ** (attempt - 1),
+                _claim_timeout().total_seconds())
+    # a claim counts as stale JUDGE_CLAIM_TIMEOUT after judge_started_at
+    Submission.objects.filter(pk=submission_id, verdict=Verdict.PENDING, judge_attempts=attempt).update(
+        judge_started_at=timezone.now() - _claim_timeout() + timedelta(seconds=delay))
+
+
+def _internal_error_report(error: str) -> dict:
+    return {"verdict": Verdict.RUNTIME_ERROR, "passed": 0, "total": 0,
+            "total_runtime_ms": 0, "peak_memory_kb": 0,
+            "internal_error": True, "error": error, "results": []}
+
+
+def judge_submission(submission_id) -> None:
+    """Judge one Pending submission unless another worker already has it."""
+    attempt = _claim(submission_id)
+    if attempt is None:
+        return
+    sub = Submission.objects.select_related("problem").filter(pk=submission_id).first()
+    if sub is None:
+        return
+    last = attempt >= getattr(settings, "JUDGE_MAX_ATTEMPTS", 3)
+    try:
+        full = scoreboard.needs_full_report(sub.user_id, sub.problem_id, sub.submitted_at)
+        report = judge(sub.problem, sub.language, sub.code, stop_on_failure=False if full else None)
+    except Exception as e:
+        log.exception("judging submission %s failed (attempt %s)", submission_id, attempt)
+        if last:
+            apply_report(sub, _internal_error_report(f"Judging failed: {e}"), attempt)
+        else:
+            _retry_later(submission_id, attempt)
+        return
+    if report.get("internal_error") and not last:
+        # the executor let us down, not the submission
+        log.warning("executor failure judging submission %s (attempt %s); retrying",
+                    submission_id, attempt)
+        _retry_later(submission_id, attempt)
+        return
+    if apply_report(sub, report, attempt) is None:
+        log.warning("submission %s was taken over by another worker; dropping attempt %s",
+                    submission_id, attempt)
+
+
+class JudgeQueue:
+    """
+    In-memory wake-up queue in front of the Pending rows, plus worker threads.
+    Holds one FIFO of submission ids per user, served round-robin.
+    """
+
+    def __init__(self, workers: int, poll_interval: float):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._users = OrderedDict()   # user id -> deque of submission ids
+        self._queued = set()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._recovery = None
+
+    def put(self, submission_id, user_id=None) -> None:
+        if self.workers <= 0:
+            return  # nobody here to take it; the judge_worker process scans for Pending rows
+        with self._cond:
+            if submission_id in self._queued:
+                return
+            self._queued.add(submission_id)
+            self._users.setdefault(user_id, deque()).append(submission_id)
+            self._cond.notify()
+
+    def get(self, timeout: float):
+        """Next submission id, taking turns between users; None on timeout."""
+        with self._cond:
+            if not self._users and not self._cond.wait_for(lambda: self._users, timeout):
+                return None
+            user_id, ids = self._users.popitem(last=False)
+            sid = ids.popleft()
+            if ids:
+                self._users[user_id] = ids  # back of the line
+            self._queued.discard(sid)
+            return sid
+
+    def start(self) -> None:
+        with self._cond:
+            if self._threads or self.workers <= 0:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f"judge-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+            self._recovery = threading.Thread(target=self._recover_forever, name="judge-recover",
+                                              daemon=True)
+            self._recovery.start()
+
+    def _recover(self) -> None:
+        """Queue the Pending submissions in the database that nobody holds."""
+        try:
+            rows = list(Submission.objects.filter(_unclaimed())
+                        .order_by("submitted_at").values_list("id", "user_id"))
+        except Exception:
+            log.exception("could not scan for pending submissions")
+            return
+        finally:
+            close_old_connections()
+        for sid, user_id in rows:
+            self.put(sid, user_id)
+
+    def _recover_forever(self) -> None:
+        while True:
+            self._recover()  # first: Pending rows left over from before a restart
+            time.sleep(self.poll_interval)
+
+    def _work(self) -> None:
+        while True:
+            sid = self.get(self.poll_interval)
+            if sid is None:
+                continue
+            try:
+                judge_submission(sid)
+            except Exception:
+                log.exception("judge worker error on submission %s", sid)
+            finally:
+                close_old_connections()
+
+    def run_forever(self) -> None:
+        """Foreground mode for the judge_worker command."""
+        self.start()
+        for t in self._threads:
+            t.join()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"workers": len(self._threads), "queue_depth": len(self._queued),
+                    "users_waiting": len(self._users)}
+
+
+judge_queue = JudgeQueue(
+    workers=getattr(settings, "JUDGE_WORKERS", 2),
+    poll_interval=getattr(settings, "JUDGE_POLL_INTERVAL", 5),
+)
+
+
+def start_on_first_request(**kwargs) -> None:
+    """request_started receiver (see ApiConfig.ready): start this web process's workers."""
+    request_started.disconnect(dispatch_uid=_START_UID)
+    judge_queue.start()
+
+
+_START_UID = "api.judge_queue.start"
+
+
+def enqueue(submission: Submission) -> None:
+    """Hand a freshly created Pending submission to the judge workers."""
+    judge_queue.start()
+    judge_queue.put(submission.pk, submission.user_id)
@@ -0,0 +1,178 @@
+# CodeArena/codearena_api/api/leaderboard.py
+"""
+Global leaderboard: users ranked by problems solved, the most recent new
+solve first on ties.
+
+Nothing is aggregated over submissions on request. SolvedProblem holds each
+user's first accepted submission per problem (unique per user and problem)
+and LeaderboardEntry their count; `record()` updates both when the judge
+stores an accepted verdict. Every process keeps the entries sorted in
+memory and serves pages from there, by offset or by cursor. When another
+process changed the table (a version counter in the cache, checked at most
+every LEADERBOARD_REFRESH seconds) it reloads it; that costs one row per
+user, not per submission.
+
+`rebuild()` recomputes both tables from all submissions
+(`manage.py rebuild_leaderboard`), e.g. after verdicts were edited by hand.
+"""
+import bisect, logging, threading, time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+
+from .models import LeaderboardEntry, SolvedProblem, Submission
+
+log = logging.getLogger(__name__)
+
+# verdict spellings that count as solved (older rows used some of the others)
+AC_VALUES = {"AC", "Accepted", "OK", "CORRECT", "correct"}
+
+_VERSION_KEY = "leaderboard:version"
+_UPDATE_RETRIES = 5
+
+Key = Tuple[int, int, int]
+
+
+def _stamp(dt: Optional[datetime]) -> int:
+    return int(dt.timestamp() * 1_000_000) if dt else 0
+
+
+def _key(user_id: int, solved: int, last: Optional[datetime]) -> Key:
+    # ascending order of the key is leaderboard order
+    return (-solved, -_stamp(last), user_id)
+
+
+def cursor_for(key: Key) -> str:
+    solved, stamp, user_id = key
+    return f"{-solved}.{-stamp}.{user_id}"
+
+
+def parse_cursor(cursor: str) -> Key:
+    """Key of the row a cursor points after; ValueError if malformed."""
+    solved, stamp, user_id = (int(x) for x in cursor.split("."))
+    return (-solved, -stamp, user_id)
+
+
+def _bump() -> int:
+    """Advance the version counter; returns the new version."""
+    if cache.add(_VERSION_KEY, 1, timeout=None):
+        return 1
+    try:
+        return cache.incr(_VERSION_KEY)
+    except ValueError:  # evicted between add and incr
+        cache.set(_VERSION_KEY, 1, timeout=None)
+        return 1
+
+
+class RankedView:
+    """This process's copy of the leaderboard, sorted; rank = position + 1."""
+
+    def __init__(self, refresh: float):
+        self.refresh = refresh
+        self._keys: List[Key] = []
+        self._rows: Dict[int, Tuple[int, Optional[datetime]]] = {}  # user id -> (solved, last)
+        self._version = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self, version) -> None:
+        rows = {uid: (solved, last) for uid, solved, last in
+                LeaderboardEntry.objects.filter(solved__gt=0)
+                .values_list("user_id", "solved", "last_solved_at")}
+        self._keys = sorted(_key(uid, *row) for uid, row in rows.items())
+        self._rows = rows
+        self._version = version
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._version is not None and now - self._checked < self.refresh:
+            return
+        self._checked = now
+        version = cache.get(_VERSION_KEY, 0)
+        if version != self._version:
+            self._load(version)
+
+    def put(self, user_id: int, solved: int, last: Optional[datetime], version: int) -> None:
+        """Apply a change this process made; `version` is the counter after it."""
+        with self._lock:
+            if self._version is None:
+                return  # not loaded yet; the first read loads it
+            old = self._rows.get(user_id)
+            if old is not None:
+                i = bisect.bisect_left(self._keys, _key(user_id, *old))
+                if i < len(self._keys) and self._keys[i][2] == user_id:
+                    del self._keys[i]
+            self._rows[user_id] = (solved, last)
+            bisect.insort(self._keys, _key(user_id, solved, last))
+            if version == self._version + 1:
+                self._version = version  # nobody else changed anything meanwhile
+
+    def page(self, offset: int = 0, limit: int = 50, after: Optional[Key] = None):
+        """
+        (total, rows) with rows [(rank, key, solved, last), ...] starting at
+        `offset`, or right after the row with key `after` (a cursor).
+        """
+        with self._lock:
+            self._refresh()
+            start = bisect.bisect_right(self._keys, after) if after is not None else offset
+            keys = self._keys[start:start + limit]
+            return len(self._keys), [(start + n + 1, k, *self._rows[k[2]])
+                                     for n, k in enumerate(keys)]
+
+
+board = RankedView(refresh=getattr(settings, "LEADERBOARD_REFRESH", 5))
+
+
+def record(submission: Submission) -> bool:
+    """
+    Count a judged submission: the first accepted one of a user on a problem
+    adds to their solved count. Returns True if it did.
+    """
+    if submission.verdict not in AC_VALUES:
+        return False
+    user_id, problem_id, at = submission.user_id, submission.problem_id, submission.submitted_at
+    if SolvedProblem.objects.filter(user_id=user_id, problem_id=problem_id).exists():
+        return False
+    try:
+        SolvedProblem.objects.create(user_id=user_id, problem_id=problem_id, solved_at=at)
+    except DatabaseError:
+        return False  # another worker recorded it first (unique user/problem)
+
+    for _ in range(_UPDATE_RETRIES):
+        entry, _ = LeaderboardEntry.objects.get_or_create(user_id=user_id)
+        last = max(entry.last_solved_at, at) if entry.last_solved_at else at
+        # only if the count is still what we read, so concurrent solves all count
+        if LeaderboardEntry.objects.filter(pk=entry.pk, solved=entry.solved).update(
+                solved=entry.solved + 1, last_solved_at=last):
+            board.put(user_id, entry.solved + 1, last, _bump())
+            return True
+    log.warning("leaderboard entry of user %s kept changing; run rebuild_leaderboard", user_id)
+    return True
+
+
+def rebuild() -> Tuple[int, int]:
+    """Recompute the leaderboard tables from all submissions; returns (users, solved problems)."""
+    first: Dict[Tuple[int, int], datetime] = {}
+    rows = (Submission.objects.filter(verdict__in=AC_VALUES).order_by("submitted_at")
+            .values_list("user_id", "problem_id", "submitted_at"))
+    for user_id, problem_id, at in rows.iterator():
+        first.setdefault((user_id, problem_id), at)
+
+    per_user: Dict[int, Tuple[int, datetime]] = {}
+    for (user_id, _), at in first.items():
+        solved, last = per_user.get(user_id, (0, at))
+        per_user[user_id] = (solved + 1, max(last, at))
+
+    SolvedProblem.objects.all().delete()
+    LeaderboardEntry.objects.all().delete()
+    SolvedProblem.objects.bulk_create(
+        [SolvedProblem(user_id=u, problem_id=p, solved_at=at) for (u, p), at in first.items()],
+        batch_size=1000)
+    LeaderboardEntry.objects.bulk_create(
+        [LeaderboardEntry(user_id=u, solved=s, last_solved_at=last) for u, (s, last) in per_user.items()],
+        batch_size=1000)
+    _bump()
+    return len(per_user), len(first)
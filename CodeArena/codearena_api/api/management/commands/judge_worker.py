@@ -0,0 +1,17 @@
+# api/management/commands/judge_worker.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.judge_queue import JudgeQueue
+
+
+class Command(BaseCommand):
+    help = "Judge Pending submissions (use with JUDGE_WORKERS=0 on the web processes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=getattr(settings, "JUDGE_WORKERS", 2) or 2)
+        parser.add_argument("--poll", type=float, default=getattr(settings, "JUDGE_POLL_INTERVAL", 5))
+
+    def handle(self, *args, **opts):
+        self.stdout.write(f"judge_worker: {opts['workers']} workers, polling every {opts['poll']}s")
+        JudgeQueue(workers=opts["workers"], poll_interval=opts["poll"]).run_forever()
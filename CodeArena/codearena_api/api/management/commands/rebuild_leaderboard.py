@@ -0,0 +1,12 @@
+# api/management/commands/rebuild_leaderboard.py
+from django.core.management.base import BaseCommand
+
+from api.leaderboard import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the leaderboard tables from all accepted submissions."
+
+    def handle(self, *args, **opts):
+        users, solved = rebuild()
+        self.stdout.write(f"rebuild_leaderboard: {users} users, {solved} solved problems")
@@ -0,0 +1,12 @@
+# api/management/commands/rebuild_problem_stats.py
+from django.core.management.base import BaseCommand
+
+from api.problem_stats import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-problem submission and acceptance counts from the submissions."
+
+    def handle(self, *args, **opts):
+        problems = rebuild()
+        self.stdout.write(f"rebuild_problem_stats: {problems} problems")
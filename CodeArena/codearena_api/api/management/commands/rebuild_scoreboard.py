@@ -0,0 +1,21 @@
+# api/management/commands/rebuild_scoreboard.py
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Contest
+from api.scoreboard import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute contest standings (ContestParticipant score, penalty, rank) from the submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("contests", type=int, nargs="+", help="contest ids")
+
+    def handle(self, *args, **opts):
+        for contest_id in opts["contests"]:
+            try:
+                contest = Contest.objects.get(pk=contest_id)
+            except Contest.DoesNotExist:
+                raise CommandError(f"no contest {contest_id}")
+            participants = rebuild(contest)
+            self.stdout.write(f"rebuild_scoreboard: contest {contest_id}, {participants} participants")
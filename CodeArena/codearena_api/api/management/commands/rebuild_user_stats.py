@@ -0,0 +1,16 @@
+# api/management/commands/rebuild_user_stats.py
+from django.core.management.base import BaseCommand
+
+from api.user_stats import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the submission counters on user profiles from the submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="users",
+                            help="only this user id (repeatable); default everyone with submissions")
+
+    def handle(self, *args, **opts):
+        users = rebuild(opts["users"])
+        self.stdout.write(f"rebuild_user_stats: {users} profiles updated")
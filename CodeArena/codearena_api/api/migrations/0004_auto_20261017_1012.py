@@ -0,0 +1,18 @@
+# Generated by Django 3.1.12 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_auto_20250813_2153'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='submission',
+            name='verdict',
+            field=models.CharField(choices=[('Pending', 'Pending'), ('Accepted', 'Accepted'), ('Wrong Answer', 'Wrong Answer'), ('Time Limit Exceeded', 'Time Limit Exceeded'), ('Memory Limit Exceeded', 'Memory Limit Exceeded'), ('Output Limit Exceeded', 'Output Limit Exceeded'), ('Compilation Error', 'Compilation Error'), ('Runtime Error', 'Runtime Error')], default='Pending', max_length=50),
+        ),
+    ]
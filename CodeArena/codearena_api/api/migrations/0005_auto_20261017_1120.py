@@ -0,0 +1,24 @@
+# Generated by Django 3.1.12 on 2026-10-17 11:20
+
+from django.db import migrations, models
+import djongo.models.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_auto_20261017_1012'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='judge_report',
+            field=djongo.models.fields.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='judge_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
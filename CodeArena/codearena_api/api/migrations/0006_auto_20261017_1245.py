@@ -0,0 +1,33 @@
+# Generated by Django 3.1.12 on 2026-10-17 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_auto_20261017_1120'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='checker',
+            field=models.CharField(choices=[('exact', 'Exact match'), ('tokens', 'Tokens (ignore whitespace)'), ('float', 'Floating point (epsilon)'), ('custom', 'Custom checker program')], default='exact', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='checker_code',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='checker_epsilon',
+            field=models.FloatField(default=1e-06),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='checker_language',
+            field=models.CharField(blank=True, default='cpp', max_length=50),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.1.12 on 2026-10-17 13:30
+
+from django.db import migrations
+import djongo.models.fields
+
+
+def move_test_cases(apps, schema_editor):
+    """Copy embedded test cases into the test data store and keep only the manifest."""
+    from api.testdata import save_cases
+
+    Problem = apps.get_model('api', 'Problem')
+    for problem in Problem.objects.all():
+        save_cases(problem, problem.test_cases or [])
+        problem.test_cases = []
+        problem.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_auto_20261017_1245'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='test_manifest',
+            field=djongo.models.fields.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(move_test_cases, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='problem',
+            name='test_cases',
+        ),
+    ]
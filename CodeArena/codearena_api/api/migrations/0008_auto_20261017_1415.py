@@ -0,0 +1,18 @@
+# Generated by Django 3.1.12 on 2026-10-17 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_auto_20261017_1330'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='judge_key',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.1.12 on 2026-10-17 15:45
+
+from django.db import migrations, models
+import djongo.models.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_auto_20261017_1500'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='solved_by_difficulty',
+            field=djongo.models.fields.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='solved_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='stats_version',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='submissions_by_language',
+            field=djongo.models.fields.JSONField(blank=True, default=dict),
+        ),
+    ]
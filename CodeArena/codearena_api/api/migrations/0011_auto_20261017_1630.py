@@ -0,0 +1,44 @@
+# Generated by Django 3.1.12 on 2026-10-17 16:30
+
+from django.db import migrations, models
+import djongo.models.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_auto_20261017_1545'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contest',
+            name='freeze_minutes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='contest',
+            name='penalty_minutes',
+            field=models.IntegerField(default=20),
+        ),
+        migrations.AddField(
+            model_name='contest',
+            name='scoring',
+            field=models.CharField(choices=[('ICPC', 'ICPC (solved, then penalty time)'), ('IOI', 'IOI (partial score per test)')], default='ICPC', max_length=8),
+        ),
+        migrations.AddField(
+            model_name='contestparticipant',
+            name='penalty',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='contestparticipant',
+            name='results',
+            field=djongo.models.fields.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='contestparticipant',
+            name='version',
+            field=models.IntegerField(default=0),
+        ),
+    ]
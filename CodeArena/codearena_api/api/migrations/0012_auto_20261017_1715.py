@@ -0,0 +1,18 @@
+# Generated by Django 3.1.12 on 2026-10-17 17:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_auto_20261017_1630'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='judge_attempts',
+            field=models.IntegerField(default=0),
+        ),
+    ]
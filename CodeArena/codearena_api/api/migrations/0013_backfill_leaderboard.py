@@ -0,0 +1,45 @@
+# Fills SolvedProblem and LeaderboardEntry (added in 0009) from the existing
+# submissions, as `manage.py rebuild_leaderboard` does; without it the
+# leaderboard starts empty and old solves would count as first solves again.
+
+from django.db import migrations
+
+# api.leaderboard.AC_VALUES at the time of writing
+AC_VALUES = {"AC", "Accepted", "OK", "CORRECT", "correct"}
+
+
+def backfill(apps, schema_editor):
+    Submission = apps.get_model("api", "Submission")
+    SolvedProblem = apps.get_model("api", "SolvedProblem")
+    LeaderboardEntry = apps.get_model("api", "LeaderboardEntry")
+
+    first = {}
+    rows = (Submission.objects.filter(verdict__in=AC_VALUES).order_by("submitted_at")
+            .values_list("user_id", "problem_id", "submitted_at"))
+    for user_id, problem_id, at in rows.iterator():
+        first.setdefault((user_id, problem_id), at)
+
+    per_user = {}
+    for (user_id, _), at in first.items():
+        solved, last = per_user.get(user_id, (0, at))
+        per_user[user_id] = (solved + 1, max(last, at))
+
+    SolvedProblem.objects.all().delete()
+    LeaderboardEntry.objects.all().delete()
+    SolvedProblem.objects.bulk_create(
+        [SolvedProblem(user_id=u, problem_id=p, solved_at=at) for (u, p), at in first.items()],
+        batch_size=1000)
+    LeaderboardEntry.objects.bulk_create(
+        [LeaderboardEntry(user_id=u, solved=s, last_solved_at=last) for u, (s, last) in per_user.items()],
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_auto_20261017_1715'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
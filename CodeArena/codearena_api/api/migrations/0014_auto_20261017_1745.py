@@ -0,0 +1,41 @@
+# Generated by Django 3.1.12 on 2026-10-17 17:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Submission.Verdict.ACCEPTED
+ACCEPTED = "Accepted"
+
+
+def backfill(apps, schema_editor):
+    """Counts from the existing submissions, as `manage.py rebuild_problem_stats` does."""
+    Submission = apps.get_model("api", "Submission")
+    ProblemStats = apps.get_model("api", "ProblemStats")
+    counts = {}
+    for problem_id, verdict in Submission.objects.values_list("problem_id", "verdict").iterator():
+        n = counts.setdefault(problem_id, [0, 0])
+        n[0] += 1
+        n[1] += verdict == ACCEPTED
+    ProblemStats.objects.bulk_create(
+        [ProblemStats(problem_id=p, submissions=s, accepted=a) for p, (s, a) in counts.items()],
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_backfill_leaderboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProblemStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('submissions', models.IntegerField(default=0)),
+                ('accepted', models.IntegerField(default=0)),
+                ('problem', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='api.problem')),
+            ],
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -9,12 +9,19 @@ class User(AbstractUser):
 
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
+    # counters maintained as submissions are recorded (api/user_stats.py)
     total_submissions = models.IntegerField(default=0)
     accepted_submissions = models.IntegerField(default=0)
-    
+    solved_count = models.IntegerField(default=0) # distinct problems accepted
+    solved_by_difficulty = djongo_models.JSONField(default=dict, blank=True) # {"Easy": 3, ...}
+    submissions_by_language = djongo_models.JSONField(default=dict, blank=True) # {"python": 12, ...}
+    stats_version = models.IntegerField(default=0) # bumped on every counter update
+
     def __str__(self):
         return self.user.username
 
+# Embedded test case of the old Problem.test_cases array; test data now lives
+# in the content-addressed store (api/testdata.py). Kept for old migrations.
 class TestCase(djongo_models.Model):
     input_data = djongo_models.TextField()
     expected_output = djongo_models.TextField()
@@ -29,17 +36,26 @@ class Problem(models.Model):
         MEDIUM = 'Medium', 'Medium'
         HARD = 'Hard', 'Hard'
 
+    class Checker(models.TextChoices):
+        EXACT = 'exact', 'Exact match'
+        TOKENS = 'tokens', 'Tokens (ignore whitespace)'
+        FLOAT = 'float', 'Floating point (epsilon)'
+        CUSTOM = 'custom', 'Custom checker program'
+
     title = models.CharField(max_length=255)
     description = models.TextField() # Supports Markdown
     difficulty = models.CharField(max_length=10, choices=Difficulty.choices, default=Difficulty.EASY)
     tags = djongo_models.JSONField(default=list) # e.g., ["arrays", "dynamic programming"]
     time_limit = models.FloatField(default=1.0) # in seconds
     memory_limit = models.IntegerField(default=256) # in MB
+    checker = models.CharField(max_length=10, choices=Checker.choices, default=Checker.EXACT)
+    checker_epsilon = models.FloatField(default=1e-6) # abs/rel tolerance for the float checker
+    checker_code = models.TextField(blank=True, default='') # custom checker: `checker input output answer`
+    checker_language = models.CharField(max_length=50, blank=True, default='cpp')
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
-    test_cases = djongo_models.ArrayField(
-        model_container=TestCase
-    )
+    # [{input, output (sha256 in the test data store), input_bytes, output_bytes, is_hidden}]
+    test_manifest = djongo_models.JSONField(default=list, blank=True)
 
     objects = djongo_models.DjongoManager()
 
@@ -53,6 +69,7 @@ class Submission(models.Model):
         WRONG_ANSWER = 'Wrong Answer', 'Wrong Answer'
         TIME_LIMIT_EXCEEDED = 'Time Limit Exceeded', 'Time Limit Exceeded'
         MEMORY_LIMIT_EXCEEDED = 'Memory Limit Exceeded', 'Memory Limit Exceeded'
+        OUTPUT_LIMIT_EXCEEDED = 'Output Limit Exceeded', 'Output Limit Exceeded'
         COMPILATION_ERROR = 'Compilation Error', 'Compilation Error'
         RUNTIME_ERROR = 'Runtime Error', 'Runtime Error'
 
@@ -65,11 +82,55 @@ class Submission(models.Model):
     memory_used = models.IntegerField(null=True, blank=True) # in MB
     submitted_at = models.DateTimeField(auto_now_add=True)
     ai_feedback = models.TextField(blank=True, null=True)
+    # full judge report (per-test results); empty while Pending
+    judge_report = djongo_models.JSONField(default=dict, blank=True)
+    # set when a judge worker claims the submission
+    judge_started_at = models.DateTimeField(null=True, blank=True)
+    # how many times a worker claimed it; capped by JUDGE_MAX_ATTEMPTS
+    judge_attempts = models.IntegerField(default=0)
+    # hash of (problem test data/limits/checker, language, normalized code);
+    # identical resubmissions reuse the verdict of an earlier one
+    judge_key = models.CharField(max_length=64, blank=True, default='', db_index=True)
 
     def __str__(self):
         return f'{self.user.username} - {self.problem.title} ({self.verdict})'
 
+# Leaderboard tables, maintained as submissions are judged (api/leaderboard.py)
+# and rebuilt from all submissions by `manage.py rebuild_leaderboard`.
+class SolvedProblem(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE)
+    solved_at = models.DateTimeField() # submission time of the first accepted submission
+
+    class Meta:
+        unique_together = ('user', 'problem')
+
+    def __str__(self):
+        return f'{self.user_id} solved {self.problem_id}'
+
+class LeaderboardEntry(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='leaderboard_entry')
+    solved = models.IntegerField(default=0)
+    last_solved_at = models.DateTimeField(null=True, blank=True) # latest first solve
+
+    def __str__(self):
+        return f'{self.user_id}: {self.solved} solved'
+
+# Per-problem submission counts for the problem list, maintained as
+# submissions are stored and judged (api/problem_stats.py).
+class ProblemStats(models.Model):
+    problem = models.OneToOneField(Problem, on_delete=models.CASCADE, related_name='stats')
+    submissions = models.IntegerField(default=0)
+    accepted = models.IntegerField(default=0) # submissions with verdict Accepted
+
+    def __str__(self):
+        return f'{self.problem_id}: {self.accepted}/{self.submissions}'
+
 class Contest(models.Model):
+    class Scoring(models.TextChoices):
+        ICPC = 'ICPC', 'ICPC (solved, then penalty time)'
+        IOI = 'IOI', 'IOI (partial score per test)'
+
     title = models.CharField(max_length=255)
     description = models.TextField()
     start_time = models.DateTimeField()
@@ -77,6 +138,11 @@ class Contest(models.Model):
     problems = models.ManyToManyField(Problem)
     participants = models.ManyToManyField(User, through='ContestParticipant', related_name='contests')
     plagiarism_report_url = models.URLField(blank=True, null=True)
+    scoring = models.CharField(max_length=8, choices=Scoring.choices, default=Scoring.ICPC)
+    # ICPC: minutes added per rejected attempt on a problem that is then solved
+    penalty_minutes = models.IntegerField(default=20)
+    # the public scoreboard stops changing this many minutes before the end
+    freeze_minutes = models.IntegerField(default=0)
 
     def __str__(self):
         return self.title
@@ -86,6 +152,12 @@ class ContestParticipant(models.Model):
     contest = models.ForeignKey(Contest, on_delete=models.CASCADE)
     score = models.IntegerField(default=0)
     rank = models.IntegerField(null=True, blank=True)
+    # maintained by api/scoreboard.py: ICPC penalty minutes, or for IOI the
+    # minute of the last score improvement (the tie-break)
+    penalty = models.IntegerField(default=0)
+    # per-problem results: {"live": {problem_id: {...}}, "public": {...}}
+    results = djongo_models.JSONField(default=dict, blank=True)
+    version = models.IntegerField(default=0)
 
     class Meta:
         unique_together = ('user', 'contest')
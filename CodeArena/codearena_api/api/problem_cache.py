@@ -0,0 +1,133 @@
+# CodeArena/codearena_api/api/problem_cache.py
+"""
+Read-through cache of problems.
+
+Problems rarely change, but every problem page and every submit reads one,
+and during a contest all participants open the same few problems over and
+over. This keeps the serialized detail (statement, limits, tags: what
+non-staff users get from GET /problems/<id>/) and the Problem row used by
+the submit paths in a small LRU in each process, in front of the shared
+cache.
+
+Each problem has a version number in the shared cache, and entries are
+stored under it. `invalidate()` (ProblemAdmin, the ViewSet's update and
+destroy) bumps it, so a reader that loaded the problem just before an edit
+writes its copy under the old version, where nobody looks any more. The
+editing process drops its own LRU entries at once; the others see the new
+version within PROBLEM_CACHE_REFRESH seconds.
+"""
+import threading, time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Problem
+from .serializers import ProblemSerializer
+
+_SIZE = getattr(settings, "PROBLEM_CACHE_SIZE", 256)
+_TIMEOUT = getattr(settings, "PROBLEM_CACHE_TIMEOUT", 3600)
+_REFRESH = getattr(settings, "PROBLEM_CACHE_REFRESH", 5)
+
+
+def _version_key(pk: int) -> str:
+    return f"problem:{pk}:version"
+
+
+def version(pk: int) -> int:
+    """The problem's current version."""
+    key = _version_key(pk)
+    v = cache.get(key)
+    if v is None:
+        # start from the clock, so a version lost to eviction never comes back
+        v = int(time.time() * 1000)
+        if not cache.add(key, v, timeout=None):
+            v = cache.get(key, v)
+    return v
+
+
+class _LRU:
+    """This process's entries: (pk, kind) -> (version, checked at, value)."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.drops = 0  # bumped by every drop; a load that overlapped one is not kept
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry, drops: int) -> None:
+        with self._lock:
+            if drops != self.drops:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def drop(self, pk: int) -> None:
+        with self._lock:
+            self.drops += 1
+            for key in [k for k in self._entries if k[0] == pk]:
+                del self._entries[key]
+
+
+_local = _LRU(_SIZE)
+
+
+def _get(pk: int, kind: str, load: Callable[[], Any]):
+    now = time.monotonic()
+    drops = _local.drops
+    entry = _local.get((pk, kind))
+    if entry is not None and now - entry[1] < _REFRESH:
+        return entry[2]
+    v = version(pk)
+    if entry is not None and entry[0] == v:
+        _local.put((pk, kind), (v, now, entry[2]), drops)
+        return entry[2]
+    key = f"problem:{pk}:{v}:{kind}"
+    value = cache.get(key)
+    if value is None:
+        value = load()
+        if value is None:
+            return None
+        cache.set(key, value, timeout=_TIMEOUT)
+    _local.put((pk, kind), (v, now, value), drops)
+    return value
+
+
+def problem(pk) -> Optional[Problem]:
+    """The Problem row, or None if there is no such problem."""
+    pk = int(pk)
+    return _get(pk, "row", lambda: Problem.objects.filter(pk=pk).first())
+
+
+def detail(pk) -> Optional[Dict[str, Any]]:
+    """GET /problems/<pk>/ as non-staff users see it, or None if there is no such problem."""
+    pk = int(pk)
+
+    def load():
+        # from the database: a row this process cached may predate the version read above
+        row = Problem.objects.filter(pk=pk).first()
+        return dict(ProblemSerializer(row).data) if row is not None else None
+
+    return _get(pk, "detail", load)
+
+
+def invalidate(pk) -> None:
+    """The problem was edited or deleted: no cached copy of it is served again."""
+    pk = int(pk)
+    _local.drop(pk)
+    try:
+        cache.incr(_version_key(pk))
+    except ValueError:
+        # no version stored (or evicted): a fresh one from the clock is newer
+        # than any the old entries were written under
+        cache.set(_version_key(pk), int(time.time() * 1000), timeout=None)
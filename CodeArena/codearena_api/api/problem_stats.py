@@ -0,0 +1,61 @@
+# CodeArena/codearena_api/api/problem_stats.py
+"""
+Submission and acceptance counts per problem, for the problem list.
+
+ProblemStats holds them and `record()` updates them as submissions are
+stored and judged, so listing problems reads one row per problem instead
+of grouping the submissions collection on every request. Updates are
+compare-and-swap on the counts read, so concurrent judge workers all
+count. `rebuild()` (manage.py rebuild_problem_stats) recomputes them from
+the submissions.
+"""
+import logging
+from collections import Counter
+from typing import Dict, Iterable
+
+from .models import ProblemStats, Submission
+
+log = logging.getLogger(__name__)
+
+_UPDATE_RETRIES = 5
+
+
+def record(submission: Submission, new: bool) -> None:
+    """Count `submission`: once when `new` (just stored), and once if its verdict is Accepted."""
+    accepted = submission.verdict == Submission.Verdict.ACCEPTED
+    if not (new or accepted):
+        return
+    for _ in range(_UPDATE_RETRIES):
+        stats, _ = ProblemStats.objects.get_or_create(problem_id=submission.problem_id)
+        changes = {}
+        if new:
+            changes["submissions"] = stats.submissions + 1
+        if accepted:
+            changes["accepted"] = stats.accepted + 1
+        if ProblemStats.objects.filter(pk=stats.pk, submissions=stats.submissions,
+                                       accepted=stats.accepted).update(**changes):
+            return
+    log.warning("counts of problem %s kept changing; run rebuild_problem_stats", submission.problem_id)
+
+
+def for_problems(ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """{problem_id: {submissions, accepted}} for one page of problems."""
+    ids = list(ids)
+    stats = {pid: {"submissions": 0, "accepted": 0} for pid in ids}
+    for pid, submissions, accepted in (ProblemStats.objects.filter(problem_id__in=ids)
+                                       .values_list("problem_id", "submissions", "accepted")):
+        stats[pid] = {"submissions": submissions, "accepted": accepted}
+    return stats
+
+
+def rebuild() -> int:
+    """Recompute every problem's counts from the submissions; returns problems counted."""
+    submissions, accepted = Counter(), Counter()
+    for problem_id, verdict in Submission.objects.values_list("problem_id", "verdict").iterator():
+        submissions[problem_id] += 1
+        accepted[problem_id] += verdict == Submission.Verdict.ACCEPTED
+    ProblemStats.objects.all().delete()
+    ProblemStats.objects.bulk_create(
+        [ProblemStats(problem_id=p, submissions=n, accepted=accepted[p]) for p, n in submissions.items()],
+        batch_size=1000)
+    return len(submissions)
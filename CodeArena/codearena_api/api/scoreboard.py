@@ -0,0 +1,501 @@
+# CodeArena/codearena_api/api/scoreboard.py
+"""
+Contest standings, ICPC or IOI style, updated as submissions are judged.
+
+A submission counts for a contest when its author joined the contest, its
+problem is one of the contest's and it was made between start and end.
+`record()` (called by the judge with every verdict) applies it to the
+participant's per-problem results in this process's copy of the standings
+and moves them in the sorted order, so a page of standings costs the page,
+not a recompute over submissions.
+
+ICPC: problems solved, then penalty minutes (the minute of the first
+accepted submission plus penalty_minutes per rejected attempt before it;
+compilation errors are free). IOI: each problem is worth 100 points scaled
+by the share of tests passed, the best submission counts, and ties go to
+whoever reached their score first. Submissions of IOI participants are
+judged on all tests, not stopped at the first failure.
+
+During the last freeze_minutes of a contest the public board only takes
+submissions made before the freeze (later ones show as pending); staff see
+the live results, and everyone does after the end.
+
+Changes reach ContestParticipant every SCOREBOARD_PERSIST seconds, ranks
+included, written outside the lock that page reads take: compare-and-swap
+on its version, and a participant another process changed meanwhile is
+recomputed from their submissions. Whatever is left is written when the
+process exits. A process that died before writing its changes loses
+nothing either: the first process to load a contest recomputes it from
+the submissions and writes the participants whose stored results differ.
+Other processes reload a contest when its version counter in the cache moved
+(checked at most every SCOREBOARD_REFRESH seconds). A rejected verdict that
+is judged after a later accepted one counts correctly; the reverse order
+may overcount penalty until `rebuild()` (manage.py rebuild_scoreboard)
+recomputes the contest from its submissions.
+"""
+import atexit, bisect, logging, threading, time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from .leaderboard import AC_VALUES
+from .models import Contest, ContestParticipant, Submission
+
+log = logging.getLogger(__name__)
+
+Verdict = Submission.Verdict
+ICPC, IOI = Contest.Scoring.ICPC, Contest.Scoring.IOI
+
+_PERSIST = getattr(settings, "SCOREBOARD_PERSIST", 10)
+_REFRESH = getattr(settings, "SCOREBOARD_REFRESH", 5)
+_UPDATE_RETRIES = 5
+# submissions are still judged a while after a contest ends
+_JUDGING_GRACE = timedelta(days=1)
+
+VIEWS = ("live", "public")
+
+Cells = Dict[str, Dict]          # problem id -> that problem's results
+Key = Tuple[int, int, int]       # ascending order of the key is standings order
+
+
+def _key(user_id: int, score: int, penalty: int) -> Key:
+    return (-score, penalty, user_id)
+
+
+def _version_key(contest_id: int) -> str:
+    return f"scoreboard:{contest_id}:version"
+
+
+def _bump(contest_id: int) -> int:
+    """Advance the contest's version counter; returns the new version."""
+    key = _version_key(contest_id)
+    if cache.add(key, 1, timeout=None):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:  # evicted between add and incr
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def _apply(scoring: str, cell: Dict, verdict: str, passed: int, total: int, t: int) -> Dict:
+    """A problem's results after a judged submission made `t` seconds into the contest."""
+    cell = dict(cell)
+    accepted = verdict in AC_VALUES
+    if scoring == IOI:
+        points = 100 if accepted else (100 * passed // total if total else 0)
+        cell["tries"] = cell.get("tries", 0) + 1
+        best = cell.get("score", 0)
+        if points > best or (points and points == best and t < cell.get("at", t)):
+            cell["score"], cell["at"] = points, t
+        return cell
+    if verdict == Verdict.COMPILATION_ERROR:
+        return cell
+    solved = cell.get("solved")
+    if accepted:
+        if solved is None or t < solved:
+            cell["solved"] = t
+    elif solved is None or t < solved:
+        cell["tries"] = cell.get("tries", 0) + 1
+    return cell
+
+
+def _totals(contest: Contest, cells: Cells) -> Tuple[int, int]:
+    """(score, penalty) of one view of a participant's results."""
+    if contest.scoring == IOI:
+        score = sum(c.get("score", 0) for c in cells.values())
+        last = max((c["at"] for c in cells.values() if c.get("score")), default=0)
+        return score, last // 60
+    solved = [c for c in cells.values() if c.get("solved") is not None]
+    return len(solved), sum(c["solved"] // 60 + contest.penalty_minutes * c.get("tries", 0) for c in solved)
+
+
+def _freeze_at(contest: Contest) -> Optional[int]:
+    """Seconds into the contest from which the public board stops changing."""
+    if contest.freeze_minutes <= 0:
+        return None
+    return int((contest.end_time - contest.start_time).total_seconds()) - contest.freeze_minutes * 60
+
+
+def _add(contest: Contest, results: Dict, problem_id, verdict: str, passed: int, total: int,
+         at: datetime) -> Dict:
+    """A participant's results ({"live": cells, "public": cells}) after one more submission."""
+    t = int((at - contest.start_time).total_seconds())
+    pid = str(problem_id)
+    live, public = dict(results.get("live", {})), dict(results.get("public", {}))
+    live[pid] = _apply(contest.scoring, live.get(pid, {}), verdict, passed, total, t)
+    freeze = _freeze_at(contest)
+    if freeze is None or t < freeze:
+        public[pid] = _apply(contest.scoring, public.get(pid, {}), verdict, passed, total, t)
+    else:
+        cell = dict(public.get(pid, {}))
+        cell["pending"] = cell.get("pending", 0) + 1
+        public[pid] = cell
+    return {"live": live, "public": public}
+
+
+def _compute(contest: Contest, problem_ids: List[int], user_ids: Iterable[int]) -> Dict[int, Dict]:
+    """Results of `user_ids` recomputed from their submissions to the contest."""
+    results = {uid: {"live": {}, "public": {}} for uid in user_ids}
+    subs = (Submission.objects
+            .filter(user_id__in=list(results), problem_id__in=problem_ids,
+                    submitted_at__gte=contest.start_time, submitted_at__lt=contest.end_time)
+            .exclude(verdict=Verdict.PENDING)
+            .order_by("submitted_at")
+            .values_list("user_id", "problem_id", "verdict", "judge_report", "submitted_at"))
+    for uid, problem_id, verdict, report, at in subs.iterator():
+        report = report or {}
+        if report.get("internal_error"):
+            continue  # the executor failed, not the submission
+        results[uid] = _add(contest, results[uid], problem_id, verdict,
+                            report.get("passed", 0), report.get("total", 0), at)
+    return results
+
+
+class Standings:
+    """This process's copy of one contest's standings, sorted per view."""
+
+    def __init__(self, contest: Contest):
+        self.contest = contest
+        self.problem_ids: List[int] = []
+        self._results: Dict[int, Dict] = {}     # user id -> {"live": cells, "public": cells}
+        self._versions: Dict[int, int] = {}     # ContestParticipant.version the results build on
+        self._ranks: Dict[int, Optional[int]] = {}  # rank last written
+        self._totals: Dict[str, Dict[int, Tuple[int, int]]] = {v: {} for v in VIEWS}
+        self._keys: Dict[str, List[Key]] = {v: [] for v in VIEWS}
+        self._dirty = set()
+        self._recompute = set()  # dirty rows to recompute from the submissions, not write as they are
+        self._timer = None
+        self._version = None
+        self._checked = 0.0
+        self._lock = threading.RLock()
+        self._writing = threading.Lock()  # one persist at a time; never taken while holding _lock
+
+    # ---- loading ----
+
+    def _load(self, version) -> None:
+        first = self._version is None
+        self.contest = Contest.objects.get(pk=self.contest.pk)  # times or scoring may have been edited
+        self.problem_ids = sorted(self.contest.problems.values_list("id", flat=True))
+        kept = {uid: (self._results[uid], self._versions.get(uid, 0)) for uid in self._dirty}
+        self._results, self._versions, self._ranks = {}, {}, {}
+        rows = (ContestParticipant.objects.filter(contest_id=self.contest.pk)
+                .values_list("user_id", "results", "version", "rank"))
+        for uid, results, row_version, rank in rows:
+            # changes not written yet stay, and keep the version they build on
+            self._results[uid], self._versions[uid] = kept.get(uid, (results or {}, row_version))
+            self._ranks[uid] = rank
+        self._dirty &= set(self._results)  # participants removed meanwhile
+        if first:
+            self._reconcile(kept)
+        for view in VIEWS:
+            self._totals[view] = {uid: _totals(self.contest, r.get(view, {}))
+                                  for uid, r in self._results.items()}
+            self._keys[view] = sorted(_key(uid, *t) for uid, t in self._totals[view].items())
+        self._version = version
+
+    def _reconcile(self, kept: Dict) -> None:
+        """
+        Take the participants' results from their submissions where the stored
+        ones differ (a process died before writing what it had recorded); the
+        next persist writes them.
+        """
+        computed = _compute(self.contest, self.problem_ids, [u for u in self._results if u not in kept])
+        for uid, results in computed.items():
+            stored = self._results[uid]
+            if any(results[view] != stored.get(view, {}) for view in VIEWS):
+                self._results[uid] = results
+                self._dirty.add(uid)
+        if self._dirty and self._timer is None:
+            self._schedule()
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._version is not None and now - self._checked < _REFRESH:
+            return
+        self._checked = now
+        version = cache.get(_version_key(self.contest.pk), 0)
+        if version != self._version:
+            self._load(version)
+
+    def _put(self, user_id: int, results: Dict) -> None:
+        for view in VIEWS:
+            keys, totals = self._keys[view], self._totals[view]
+            old = totals.get(user_id)
+            if old is not None:
+                i = bisect.bisect_left(keys, _key(user_id, *old))
+                if i < len(keys) and keys[i][2] == user_id:
+                    del keys[i]
+            totals[user_id] = _totals(self.contest, results.get(view, {}))
+            bisect.insort(keys, _key(user_id, *totals[user_id]))
+        self._results[user_id] = results
+
+    def _participant(self, user_id: int) -> bool:
+        """Whether `user_id` is in the contest, picking up joins made in other processes."""
+        if user_id in self._results:
+            return True
+        row = (ContestParticipant.objects.filter(contest_id=self.contest.pk, user_id=user_id)
+               .values_list("results", "version", "rank").first())
+        if row is None:
+            return False
+        self._versions[user_id], self._ranks[user_id] = row[1], row[2]
+        self._put(user_id, row[0] or {})
+        return True
+
+    # ---- updates ----
+
+    def has(self, user_id: int) -> bool:
+        with self._lock:
+            self._refresh()
+            return self._participant(user_id)
+
+    def join(self, user_id: int) -> None:
+        """Show a new participant (already saved) with nothing solved."""
+        with self._lock:
+            self._refresh()
+            if self._participant(user_id):
+                self._bump()
+
+    def record(self, user_id: int, problem_id: int, verdict: str, passed: int, total: int,
+               at: datetime) -> bool:
+        """Apply one judged submission; False if it does not count for this contest."""
+        with self._lock:
+            first = self._version is None
+            self._refresh()
+            if (problem_id not in self.problem_ids
+                    or not self.contest.start_time <= at < self.contest.end_time):
+                return False
+            if first and user_id in self._results:
+                return True  # just loaded from the submissions, this one included
+            if not self._participant(user_id):
+                return False
+            self._put(user_id, _add(self.contest, self._results[user_id], problem_id,
+                                    verdict, passed, total, at))
+            self._dirty.add(user_id)
+            if self._timer is None:
+                self._schedule()
+            return True
+
+    # ---- persistence ----
+
+    def _persist_in_background(self) -> None:
+        try:
+            self.persist()
+        except Exception:
+            log.exception("writing the standings of contest %s failed", self.contest.pk)
+        finally:
+            connection.close()  # the timer's thread ends here
+
+    def persist(self) -> None:
+        """
+        Write changed participants and ranks to ContestParticipant. What to
+        write is taken under the standings lock; the writes happen outside
+        it, so pages are served meanwhile.
+        """
+        with self._writing:
+            with self._lock:
+                self._timer = None
+                dirty, self._dirty = self._dirty & set(self._results), set()
+                recompute, self._recompute = self._recompute & dirty, set()
+                rows = {uid: (self._results[uid], self._totals["live"][uid], self._versions.get(uid, 0))
+                        for uid in dirty}
+                keys = self._keys["live"]
+                ranks = {}
+                for key in keys:
+                    rank = bisect.bisect_left(keys, key[:2]) + 1  # ties share the rank
+                    if self._ranks.get(key[2]) != rank:
+                        ranks[key[2]] = rank
+
+            stored, recomputed, failed = {}, {}, set()
+            for user_id, (results, (score, penalty), version) in rows.items():
+                try:
+                    if user_id not in recompute and self._store(user_id, version, results, score, penalty):
+                        stored[user_id] = version + 1
+                        continue
+                    # another process changed the row since we read it: start over from the submissions
+                    results = _compute(self.contest, self.problem_ids, [user_id])[user_id]
+                    recomputed[user_id] = (results, self._force(user_id, results))
+                except DatabaseError:
+                    log.exception("saving standings of user %s in contest %s failed",
+                                  user_id, self.contest.pk)
+                    failed.add(user_id)
+            try:
+                self._store_ranks(ranks)
+            except DatabaseError:
+                log.exception("saving ranks in contest %s failed", self.contest.pk)
+                ranks = {}
+
+            with self._lock:
+                self._versions.update(stored)
+                for user_id, (results, version) in recomputed.items():
+                    if user_id in self._dirty:
+                        # recorded meanwhile on top of the old results: recompute again next time
+                        self._recompute.add(user_id)
+                    self._put(user_id, results)
+                    if version is not None:
+                        self._versions[user_id] = version
+                self._ranks.update(ranks)
+                self._dirty |= failed
+                if rows or ranks:
+                    self._bump()
+                if self._dirty and self._timer is None:
+                    self._schedule()
+
+    def _schedule(self) -> None:
+        self._timer = threading.Timer(_PERSIST, self._persist_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _store(self, user_id: int, expected: int, results: Dict, score: int, penalty: int) -> bool:
+        """Write a participant's results if their row is still at version `expected`."""
+        return bool(ContestParticipant.objects.filter(
+            contest_id=self.contest.pk, user_id=user_id, version=expected).update(
+            score=score, penalty=penalty, results=results, version=expected + 1))
+
+    def _force(self, user_id: int, results: Dict) -> Optional[int]:
+        """Write a participant's results over whatever version is stored; returns the new version."""
+        score, penalty = _totals(self.contest, results.get("live", {}))
+        for _ in range(_UPDATE_RETRIES):
+            current = (ContestParticipant.objects.filter(contest_id=self.contest.pk, user_id=user_id)
+                       .values_list("version", flat=True).first())
+            if current is None:
+                return None
+            if self._store(user_id, current, results, score, penalty):
+                return current + 1
+        log.warning("standings of user %s in contest %s kept changing; run rebuild_scoreboard",
+                    user_id, self.contest.pk)
+        return None
+
+    def _store_ranks(self, ranks: Dict[int, int]) -> None:
+        """One UPDATE per rank value, in one transaction."""
+        by_rank: Dict[int, List[int]] = {}
+        for user_id, rank in ranks.items():
+            by_rank.setdefault(rank, []).append(user_id)
+        with transaction.atomic():
+            for rank, user_ids in by_rank.items():
+                ContestParticipant.objects.filter(
+                    contest_id=self.contest.pk, user_id__in=user_ids).update(rank=rank)
+
+    def _bump(self) -> None:
+        version = _bump(self.contest.pk)
+        if self._version is not None and version == self._version + 1:
+            self._version = version  # nobody else changed anything meanwhile
+
+    def rebuild(self) -> int:
+        """Recompute every participant from the submissions and write them; returns participants."""
+        with self._writing, self._lock:
+            self._load(cache.get(_version_key(self.contest.pk), 0))
+            self._dirty.clear()
+            self._recompute.clear()
+            for user_id, results in _compute(self.contest, self.problem_ids, list(self._results)).items():
+                self._put(user_id, results)
+                version = self._force(user_id, results)
+                if version is not None:
+                    self._versions[user_id] = version
+            keys = self._keys["live"]
+            self._ranks = {k[2]: bisect.bisect_left(keys, k[:2]) + 1 for k in keys}
+            self._store_ranks(self._ranks)
+            self._bump()
+            return len(self._results)
+
+    # ---- reading ----
+
+    def view_for(self, user, now: datetime = None) -> str:
+        """The view `user` gets: public while the board is frozen for them, else live."""
+        now = now or timezone.now()
+        freeze = _freeze_at(self.contest)
+        if freeze is None or getattr(user, "is_staff", False) or now >= self.contest.end_time:
+            return "live"
+        return "public" if now >= self.contest.start_time + timedelta(seconds=freeze) else "live"
+
+    def page(self, view: str = "live", offset: int = 0, limit: int = 50):
+        """(total, rows) with rows [(rank, user_id, score, penalty, cells), ...] from `offset`."""
+        with self._lock:
+            self._refresh()
+            keys = self._keys[view]
+            return len(keys), [
+                (bisect.bisect_left(keys, k[:2]) + 1, k[2], -k[0], k[1],
+                 self._results[k[2]].get(view, {}))
+                for k in keys[offset:offset + limit]
+            ]
+
+
+_boards: Dict[int, Standings] = {}
+_recent = {"checked": None, "contests": []}  # contests submissions may still count for
+_registry_lock = threading.Lock()
+
+
+@atexit.register
+def flush() -> None:
+    """Write what every contest has recorded but not persisted yet."""
+    with _registry_lock:
+        boards = list(_boards.values())
+    for board in boards:
+        if board._dirty:
+            try:
+                board.persist()
+            except Exception:
+                log.exception("writing the standings of contest %s failed", board.contest.pk)
+
+
+def standings(contest: Contest) -> Standings:
+    """This process's standings of `contest`, loaded on first use."""
+    with _registry_lock:
+        board = _boards.get(contest.pk)
+        if board is None:
+            board = _boards[contest.pk] = Standings(contest)
+        return board
+
+
+def _contests_for(problem_id: int, at: datetime) -> List[Contest]:
+    """Contests running at `at` that include the problem (from a list refreshed every SCOREBOARD_REFRESH s)."""
+    now = time.monotonic()
+    with _registry_lock:
+        if _recent["checked"] is None or now - _recent["checked"] >= _REFRESH:
+            contests = list(Contest.objects.filter(end_time__gte=timezone.now() - _JUDGING_GRACE))
+            links = (Contest.problems.through.objects
+                     .filter(contest_id__in=[c.pk for c in contests])
+                     .values_list("contest_id", "problem_id"))
+            problems: Dict[int, set] = {}
+            for contest_id, pid in links:
+                problems.setdefault(contest_id, set()).add(pid)
+            _recent["contests"] = [(c, problems.get(c.pk, set())) for c in contests]
+            _recent["checked"] = now
+        recent = _recent["contests"]
+    return [c for c, pids in recent if problem_id in pids and c.start_time <= at < c.end_time]
+
+
+def record(submission: Submission) -> None:
+    """Apply a judged submission to the standings of every contest it counts for."""
+    report = submission.judge_report or {}
+    if submission.verdict == Verdict.PENDING or report.get("internal_error"):
+        return  # not judged, or the executor failed rather than the submission
+    for contest in _contests_for(submission.problem_id, submission.submitted_at):
+        standings(contest).record(submission.user_id, submission.problem_id, submission.verdict,
+                                  report.get("passed", 0), report.get("total", 0),
+                                  submission.submitted_at)
+
+
+def needs_full_report(user_id: int, problem_id: int, at: datetime) -> bool:
+    """Whether a submission counts for an IOI contest, which scores every test."""
+    return any(c.scoring == IOI and standings(c).has(user_id)
+               for c in _contests_for(problem_id, at))
+
+
+def changed(contest_id: int) -> None:
+    """
+    A contest was edited: every process reloads it. Results already recorded
+    stay; run rebuild_scoreboard if the scoring or the times changed.
+    """
+    _bump(contest_id)
+    with _registry_lock:
+        _recent["checked"] = None
+
+
+def rebuild(contest: Contest) -> int:
+    """Recompute a contest's standings from its submissions; returns participants."""
+    return standings(contest).rebuild()
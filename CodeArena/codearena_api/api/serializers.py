@@ -2,9 +2,11 @@
 # api/serializers.py
 
 from rest_framework import serializers
-from .models import User, Profile, Problem, Submission, Contest, ContestParticipant, TestCase
+from .models import User, Profile, Problem, Submission, Contest, ContestParticipant
+from .testdata import load_cases, save_cases
 
-# CORRECTED: Use a plain Serializer for the abstract TestCase model
+# Plain Serializer for test cases written through the API; they are stored in
+# the test data store and only the manifest is kept on the problem
 class TestCaseSerializer(serializers.Serializer):
     input_data = serializers.CharField()
     expected_output = serializers.CharField()
@@ -23,14 +25,61 @@ class ProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = Profile
         fields = '__all__'
+        # maintained by api/user_stats.py
+        read_only_fields = ('total_submissions', 'accepted_submissions', 'solved_count',
+                            'solved_by_difficulty', 'submissions_by_language', 'stats_version')
 
 class ProblemSerializer(serializers.ModelSerializer):
-    test_cases = TestCaseSerializer(many=True)
+    # write-only: reads return the manifest (hashes, sizes) instead of the data
+    test_cases = TestCaseSerializer(many=True, write_only=True, required=False)
     # This new line ensures 'tags' is serialized as a proper JSON array
     tags = serializers.ListField(child=serializers.CharField()) 
     class Meta:
         model = Problem
-        fields = ['id', 'title', 'description', 'difficulty', 'tags', 'time_limit', 'memory_limit', 'author', 'created_at', 'test_cases']
+        fields = ['id', 'title', 'description', 'difficulty', 'tags', 'time_limit', 'memory_limit', 'author', 'created_at', 'test_cases', 'test_manifest']
+        read_only_fields = ['test_manifest']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        request = self.context.get('request')
+        if request is not None and request.user.is_staff:
+            data['test_cases'] = load_cases(instance)  # admins only, read from the store
+        else:
+            data.pop('test_manifest', None)
+        return data
+
+    def _save(self, instance, cases):
+        if cases is not None:
+            save_cases(instance, cases)
+            instance.save()
+        return instance
+
+    def create(self, validated_data):
+        cases = validated_data.pop('test_cases', None)
+        return self._save(super().create(validated_data), cases)
+
+    def update(self, instance, validated_data):
+        cases = validated_data.pop('test_cases', None)
+        return self._save(super().update(instance, validated_data), cases)
+
+class ProblemSummarySerializer(serializers.ModelSerializer):
+    """Problem list rows: no statement, no test data; stats come from the view's context."""
+    tags = serializers.ListField(child=serializers.CharField())
+    submissions = serializers.SerializerMethodField()
+    accepted = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Problem
+        fields = ['id', 'title', 'difficulty', 'tags', 'submissions', 'accepted']
+
+    def _stats(self, obj):
+        return self.context.get('stats', {}).get(obj.pk, {})
+
+    def get_submissions(self, obj):
+        return self._stats(obj).get('submissions', 0)
+
+    def get_accepted(self, obj):
+        return self._stats(obj).get('accepted', 0)
 
 class SubmissionSerializer(serializers.ModelSerializer):
     user = serializers.ReadOnlyField(source='user.username')
@@ -39,6 +88,17 @@ class SubmissionSerializer(serializers.ModelSerializer):
         model = Submission
         fields = ['id', 'problem', 'user', 'code', 'language', 'verdict', 'execution_time', 'memory_used', 'submitted_at', 'ai_feedback']
 
+class SubmissionSummarySerializer(serializers.ModelSerializer):
+    """Submission history rows: no code or feedback; titles come from the view's context."""
+    problem = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Submission
+        fields = ['id', 'problem', 'problem_id', 'language', 'verdict', 'execution_time', 'memory_used', 'submitted_at']
+
+    def get_problem(self, obj):
+        return self.context.get('titles', {}).get(obj.problem_id, '')
+
 
 
 class ContestSerializer(serializers.ModelSerializer):
@@ -0,0 +1,94 @@
+# CodeArena/codearena_api/api/testdata.py
+"""
+Content-addressed store for test inputs and expected outputs.
+
+A problem only carries a small manifest (`Problem.test_manifest`): per test
+the sha256 of its input and output, their sizes and the hidden flag. The
+data itself lives in files named by hash under TESTDATA_DIR, written once
+and shared by every problem that uses the same content. Nothing is read
+until judging asks for a particular test, so listing or fetching a problem
+costs the same whether its tests are 1 KB or 50 MB.
+"""
+import hashlib, os, tempfile
+from typing import Any, Dict, Iterable, List
+
+from django.conf import settings
+
+
+class TestDataStore:
+    def __init__(self, root: str):
+        self.root = str(root)
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, text: str) -> str:
+        data = (text or "").encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)  # atomic: readers never see a partial blob
+        return digest
+
+    def read(self, digest: str) -> str:
+        with open(self.path(digest), "rb") as f:
+            return f.read().decode("utf-8")
+
+
+store = TestDataStore(getattr(settings, "TESTDATA_DIR", os.path.join(os.getcwd(), "testdata")))
+
+
+class TestCaseRef:
+    """
+    One test of a problem, read from the store on first access.
+    Supports the dict-style `get()` the judge uses on plain test case dicts.
+    """
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.entry = entry
+        self._data = {}
+
+    @property
+    def is_hidden(self) -> bool:
+        return bool(self.entry.get("is_hidden", True))
+
+    def get(self, key: str, default=None):
+        if key == "is_hidden":
+            return self.is_hidden
+        field = {"input_data": "input", "expected_output": "output"}.get(key)
+        if field is None:
+            return default
+        if key not in self._data:
+            self._data[key] = store.read(self.entry[field])
+        return self._data[key]
+
+
+def save_cases(problem, cases: Iterable[Dict[str, Any]]) -> None:
+    """Store `cases` ({input_data, expected_output, is_hidden}) and set the problem's manifest (not saved)."""
+    manifest = []
+    for c in cases:
+        inp = c.get("input_data", "") or ""
+        out = c.get("expected_output", "") or ""
+        manifest.append({
+            "input": store.put(inp),
+            "output": store.put(out),
+            "input_bytes": len(inp.encode("utf-8")),
+            "output_bytes": len(out.encode("utf-8")),
+            "is_hidden": bool(c.get("is_hidden", True)),
+        })
+    problem.test_manifest = manifest
+
+
+def cases(problem) -> List[TestCaseRef]:
+    """Lazy test cases of `problem`, in order."""
+    return [TestCaseRef(e) for e in (problem.test_manifest or [])]
+
+
+def load_cases(problem) -> List[Dict[str, Any]]:
+    """Fully loaded test cases (admin editing / export)."""
+    return [{"input_data": ref.get("input_data"), "expected_output": ref.get("expected_output"),
+             "is_hidden": ref.is_hidden} for ref in cases(problem)]
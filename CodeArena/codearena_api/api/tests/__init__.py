@@ -0,0 +1,2 @@
+# a cache of their own, so tests neither see nor clobber the shared one
+LOCAL_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
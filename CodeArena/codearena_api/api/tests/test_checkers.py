@@ -0,0 +1,97 @@
+import random
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from .. import checkers, judge
+from ..judge import _norm
+
+
+class CheckerTests(SimpleTestCase):
+    def test_exact(self):
+        self.assertEqual(checkers.exact("1 2\n3\n", "1 2\n3\n"), (True, ""))
+        self.assertEqual(checkers.exact("1 2\n3\n", "1 2\r\n3\r\n"), (True, ""))
+        self.assertEqual(checkers.exact("1 2\n3\n", "1 2\n3  \n\n\n"), (True, ""))
+        self.assertEqual(checkers.exact("1\n2\n", "1\n3\n"),
+                         (False, "Line 2 differs: expected '2', got '3'"))
+        self.assertEqual(checkers.exact("1\n2", "1"), (False, "Output ended early at line 2"))
+        self.assertEqual(checkers.exact("1", "1\n2"), (False, "Extra output from line 2"))
+        # trailing spaces inside the output still count, as before
+        self.assertFalse(checkers.exact("1\n2\n", "1 \n2\n")[0])
+        self.assertFalse(checkers.exact("1", " 1")[0])
+
+    def test_exact_matches_old_normalisation(self):
+        cases = [
+            ("", ""), ("", "\n"), ("", " "), ("a", "a\r\n"), ("a", "a\r"),
+            ("a\n\n", "a"), ("a \n", "a"), ("a\n b", "a\nb"), ("a\r\nb", "a\nb"),
+            ("a\rb", "a\nb"), ("a\n\nb", "a\nb"), ("a\t\n", "a\n\t\n"),
+        ]
+        rng = random.Random(13)
+        for _ in range(2000):
+            cases.append(tuple("".join(rng.choice("ab \t\r\n") for _ in range(rng.randrange(6)))
+                               for _ in range(2)))
+        for expected, actual in cases:
+            with self.subTest(expected=expected, actual=actual):
+                self.assertEqual(checkers.exact(expected, actual)[0],
+                                 _norm(expected) == _norm(actual))
+
+    def test_tokens(self):
+        self.assertEqual(checkers.tokens("1 2\n3\n", "1\n2 3"), (True, ""))
+        self.assertEqual(checkers.tokens("", "  \n"), (True, ""))
+        self.assertEqual(checkers.tokens("1 2 3", "1 2 4"),
+                         (False, "Token 3 differs: expected '3', got '4'"))
+        self.assertEqual(checkers.tokens("1 2", "1"), (False, "Output ended early at token 2"))
+        self.assertEqual(checkers.tokens("1", "1 2"), (False, "Extra output at token 2"))
+
+    def test_floats(self):
+        check = checkers.floats(1e-6)
+        self.assertTrue(check("0.5 yes", "0.5000001 yes")[0])
+        self.assertTrue(check("1000000", "1000000.5")[0])  # relative
+        self.assertFalse(check("0.5", "0.5001")[0])
+        self.assertFalse(check("nan", "nan0")[0])
+        self.assertFalse(check("1.0", "one")[0])
+        self.assertFalse(check("1 2", "1")[0])
+        self.assertTrue(check("nan", "nan")[0])  # same token
+
+    def test_for_problem(self):
+        self.assertIs(checkers.for_problem(SimpleNamespace(checker="")), checkers.exact)
+        self.assertIs(checkers.for_problem(SimpleNamespace(checker="tokens")), checkers.tokens)
+        self.assertIsNone(checkers.for_problem(SimpleNamespace(checker="custom")))
+        check = checkers.for_problem(SimpleNamespace(checker="float", checker_epsilon=0.1))
+        self.assertTrue(check("1.0", "1.05")[0])
+
+
+class CheckOutputsTests(SimpleTestCase):
+    tests = [{"input_data": "1", "expected_output": "2"}, {"input_data": "3", "expected_output": "4"},
+             {"input_data": "5", "expected_output": "6"}]
+    runs = [{"status": "ok", "stdout": "2"}, {"status": "ok", "stdout": "5"},
+            {"status": "time_limit", "stdout": ""}]
+
+    def custom(self, payload, status=200):
+        client = mock.Mock()
+        client.check.return_value = (payload, status)
+        problem = SimpleNamespace(checker="custom", checker_language="python", checker_code="...")
+        with mock.patch.object(judge, "get_client", return_value=client):
+            return judge.check_outputs(problem, self.tests, self.runs), client
+
+    def test_builtin(self):
+        problem = SimpleNamespace(checker="exact")
+        runs = self.runs[:2] + [{"status": "ok", "stdout": "6", "stderr": "Traceback"}]
+        self.assertEqual(judge.check_outputs(problem, self.tests, runs),
+                         [(True, ""), (False, "Line 1 differs: expected '4', got '5'"), None])
+
+    def test_custom(self):
+        results, client = self.custom({"results": [{"ok": True, "message": "ok"},
+                                                   {"ok": False, "message": "wrong"}]})
+        # only the runs that finished cleanly go to the checker
+        self.assertEqual([c["answer"] for c in client.check.call_args[0][2]], ["2", "4"])
+        self.assertEqual(results, [(True, "ok"), (False, "wrong"), None])
+
+    def test_custom_failures(self):
+        results, _ = self.custom({"compile_error": "boom"})
+        self.assertEqual(results[:2], [(False, "Checker failed: boom")] * 2)
+        results, _ = self.custom({"results": [{"ok": False, "failed": True, "message": "crash"}]})
+        self.assertEqual(results[:2], [(False, "Checker failed: crash"), (False, "Checker failed: no result")])
+        results, _ = self.custom({"error": "down"}, status=503)
+        self.assertEqual(results, [judge._CHECKER_UNAVAILABLE, judge._CHECKER_UNAVAILABLE, None])
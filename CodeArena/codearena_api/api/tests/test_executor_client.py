@@ -0,0 +1,149 @@
+from types import SimpleNamespace
+
+import requests
+from django.test import SimpleTestCase
+
+from ..executor_client import CircuitBreaker, ExecutorClient, Node, route_key_for
+
+
+def _response(status, payload=None):
+    def raise_for_status():
+        if status >= 400:
+            raise requests.HTTPError(status)
+    return SimpleNamespace(status_code=status, text=str(payload), json=lambda: payload,
+                           raise_for_status=raise_for_status)
+
+
+class FakeSession:
+    """Answers requests from a script: a response or an exception per call."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = []
+
+    def post(self, url, json=None, timeout=None):
+        self.calls.append(url)
+        outcome = self.script.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    get = post
+
+
+def _client(session, nodes=("http://a",), retries=2, threshold=5, cooldown=60, sticky_slack=2.0):
+    client = ExecutorClient([Node.from_base(base, CircuitBreaker(threshold, cooldown)) for base in nodes],
+                            retries=retries, backoff=0, sticky_slack=sticky_slack)
+    client.session = session
+    return client
+
+
+class RetryTests(SimpleTestCase):
+    def test_call(self):
+        session = FakeSession(_response(200, {"results": []}))
+        client = _client(session)
+        self.assertEqual(client.execute_batch("python", "", [""], timeout=5), ({"results": []}, 200))
+        self.assertEqual(session.calls, ["http://a/execute/batch"])
+        self.assertEqual(client.stats()["batch"]["calls"], 1)
+
+    def test_retries_connection_errors(self):
+        session = FakeSession(requests.ConnectionError("refused"), _response(503), _response(200, {"ok": 1}))
+        self.assertEqual(_client(session).execute("python", "")[1], 200)
+        self.assertEqual(len(session.calls), 3)
+
+    def test_gives_up(self):
+        session = FakeSession(*[requests.ConnectionError("refused")] * 3)
+        payload, status = _client(session).execute("python", "")
+        self.assertEqual((status, len(session.calls)), (502, 3))
+        self.assertIn("unreachable", payload["error"])
+
+        session = FakeSession(*[_response(503, "busy")] * 3)
+        self.assertEqual(_client(session).execute("python", "")[1], 503)
+
+    def test_read_timeout_not_retried(self):
+        # the executor may still be running the job
+        session = FakeSession(requests.ReadTimeout("slow"))
+        self.assertEqual(_client(session).execute("python", "")[1], 504)
+        self.assertEqual(len(session.calls), 1)
+
+    def test_client_error_not_retried(self):
+        session = FakeSession(_response(400, "bad language"))
+        self.assertEqual(_client(session).execute("cobol", ""), ({"error": "Executor error: bad language"}, 400))
+        self.assertEqual(len(session.calls), 1)
+
+
+class BreakerTests(SimpleTestCase):
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+        breaker.failure()
+        self.assertTrue(breaker.allow())
+        breaker.failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+
+    def test_half_open_lets_one_probe(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=60)
+        breaker.failure()
+        breaker.opened_at -= 60
+        self.assertEqual(breaker.state, "half-open")
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # the probe is still out
+        breaker.success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=60)
+        breaker.failure()
+        breaker.opened_at -= 60
+        breaker.allow()
+        breaker.failure()
+        self.assertEqual(breaker.state, "open")
+
+
+class RoutingTests(SimpleTestCase):
+    NODES = ("http://a", "http://b", "http://c")
+
+    def test_least_loaded(self):
+        client = _client(None, self.NODES)
+        for node, queued in zip(client.nodes, (4, 1, 3)):
+            node.queued = queued
+        self.assertEqual(client._pick(None, []).name, "http://b")
+        client.nodes[0].workers = 8  # load is per worker
+        self.assertEqual(client._pick(None, []).name, "http://a")
+
+    def test_sticky(self):
+        client = _client(None, self.NODES, sticky_slack=2)
+        key = route_key_for("cpp", "int main() {}")
+        home = client._pick(key, [])
+        self.assertEqual(key, route_key_for("cpp", "int main() {}"))
+        # stays home while it is within the slack of the least-loaded node...
+        home.queued = 2
+        self.assertIs(client._pick(key, []), home)
+        # ...and not beyond it
+        home.queued = 3
+        self.assertIsNot(client._pick(key, []), home)
+
+    def test_skips_open_nodes(self):
+        client = _client(None, self.NODES, threshold=1)
+        client.nodes[0].breaker.failure()
+        client.nodes[1].breaker.failure()
+        self.assertEqual(client._pick(None, []).name, "http://c")
+        client.nodes[2].breaker.failure()
+        self.assertEqual(client.execute("python", ""), ({"error": "Executor unavailable (no healthy node)"}, 503))
+
+    def test_fails_over(self):
+        session = FakeSession(requests.ConnectionError("refused"), _response(200, {"ok": 1}))
+        client = _client(session, self.NODES[:2])
+        self.assertEqual(client.execute("python", "")[1], 200)
+        self.assertEqual(len(set(session.calls)), 2)  # the retry went to the other node
+        self.assertEqual([n.inflight for n in client.nodes], [0, 0])
+
+    def test_poll(self):
+        session = FakeSession(_response(200, {"queue": {"workers": 4, "running": 4, "queue_depth": 6}}),
+                              requests.ConnectionError("refused"))
+        client = _client(session, self.NODES[:2], threshold=1)
+        client.poll()
+        a, b = client.nodes
+        self.assertEqual((a.workers, a.queued, a.load()), (4, 10, 2.5))
+        self.assertEqual((a.breaker.state, b.breaker.state), ("closed", "open"))
+        self.assertEqual(session.calls, ["http://a/status", "http://b/status"])
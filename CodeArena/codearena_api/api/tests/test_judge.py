@@ -0,0 +1,201 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import LOCAL_CACHE
+from .. import judge
+from ..models import Problem, Submission, User
+
+Verdict = Submission.Verdict
+
+
+def _tests(*expected):
+    return [{"input_data": str(k), "expected_output": out, "is_hidden": True} for k, out in enumerate(expected)]
+
+
+def _run(stdout, status="ok", truncated=False):
+    return {"stdout": stdout, "stderr": "", "status": status, "exit_code": 0,
+            "time_ms": 10, "memory_kb": 1024, "truncated": truncated}
+
+
+class LimitVerdictTests(SimpleTestCase):
+    def test_status_verdicts(self):
+        tc = {"expected_output": "1", "is_hidden": False}
+        for status, verdict in [("time_limit", Verdict.TIME_LIMIT_EXCEEDED),
+                                ("memory_limit", Verdict.MEMORY_LIMIT_EXCEEDED),
+                                ("output_limit", Verdict.OUTPUT_LIMIT_EXCEEDED),
+                                ("runtime_error", Verdict.RUNTIME_ERROR)]:
+            with self.subTest(status=status):
+                item = judge._evaluate(1, tc, {}, 200, _run("1", status))
+                self.assertEqual((item["verdict"], item["passed"]), (verdict, False))
+                self.assertEqual((item["runtime_ms"], item["memory_kb"]), (10, 1024))
+
+    def test_problem_limits_sent(self):
+        problem = SimpleNamespace(time_limit=2.5, memory_limit=128, checker="exact")
+        with mock.patch.object(judge.testdata, "cases", return_value=_tests("1")), \
+                mock.patch.object(judge, "run_batch", return_value=({"results": [_run("1")]}, 200)) as run:
+            judge.judge(problem, "cpp", "")
+        self.assertEqual((run.call_args.kwargs["time_limit"], run.call_args.kwargs["memory_limit"]), (2.5, 128))
+
+
+@override_settings(JUDGE_BATCH_SIZE=5, JUDGE_MAX_PARALLEL_BATCHES=1, JUDGE_STOP_ON_FIRST_FAILURE=False)
+class TruncatedOutputTests(SimpleTestCase):
+    problem = SimpleNamespace(time_limit=1, memory_limit=256, checker="exact")
+
+    def judge(self, tests, replies):
+        with mock.patch.object(judge.testdata, "cases", return_value=tests), \
+                mock.patch.object(judge, "run_batch", side_effect=replies) as run:
+            return judge.judge(self.problem, "python", ""), run
+
+    def test_rerun_alone(self):
+        tests = _tests("a", "b" * 10)
+        report, run = self.judge(tests, [
+            ({"results": [_run("a"), _run("b" * 4, truncated=True)]}, 200),
+            ({"results": [_run("b" * 10)]}, 200),
+        ])
+        self.assertEqual((report["verdict"], report["passed"]), (Verdict.ACCEPTED, 2))
+        self.assertEqual(run.call_args_list[1].args[2], ["1"])
+
+    def test_still_truncated_is_internal(self):
+        report, _ = self.judge(_tests("a"), [
+            ({"results": [_run("a", truncated=True)]}, 200),
+            ({"error": "unavailable"}, 503),
+        ])
+        self.assertTrue(report["internal_error"])
+        self.assertEqual(report["results"][0]["verdict"], Verdict.RUNTIME_ERROR)
+
+    def test_truncated_failure_is_not_rerun(self):
+        report, run = self.judge(_tests("a"), [({"results": [_run("", "output_limit", True)]}, 200)])
+        self.assertEqual((report["verdict"], run.call_count), (Verdict.OUTPUT_LIMIT_EXCEEDED, 1))
+
+
+def _echo(payload_for):
+    """run_batch stand-in answering each input with payload_for(input)."""
+    def run_batch(language, code, inputs, **kwargs):
+        return {"results": [payload_for(i) for i in inputs]}, 200
+    return run_batch
+
+
+class ChunkingTests(SimpleTestCase):
+    problem = SimpleNamespace(time_limit=1, memory_limit=256, checker="exact")
+
+    def judge(self, tests, run_batch, stop_on_failure=None, **settings):
+        settings = {"JUDGE_BATCH_SIZE": 5, "JUDGE_MAX_PARALLEL_BATCHES": 1,
+                    "JUDGE_STOP_ON_FIRST_FAILURE": True, **settings}
+        with override_settings(**settings), \
+                mock.patch.object(judge.testdata, "cases", return_value=tests), \
+                mock.patch.object(judge, "run_batch", side_effect=run_batch) as run:
+            return judge.judge(self.problem, "python", "", stop_on_failure=stop_on_failure), run
+
+    def test_chunks(self):
+        tests = _tests(*[str(k) for k in range(12)])
+        report, run = self.judge(tests, _echo(lambda i: _run(i)), JUDGE_MAX_PARALLEL_BATCHES=3)
+        self.assertEqual([len(c.args[2]) for c in run.call_args_list], [5, 5, 2])
+        self.assertEqual((report["verdict"], report["passed"], report["total"]), (Verdict.ACCEPTED, 12, 12))
+        self.assertEqual([r["test_case"] for r in report["results"]], list(range(1, 13)))
+        # every chunk goes to the node that compiled the source
+        self.assertEqual(len({c.kwargs["route_key"] for c in run.call_args_list}), 1)
+
+    def test_fail_fast(self):
+        tests = _tests(*[str(k) for k in range(12)])
+        report, run = self.judge(tests, _echo(lambda i: _run("wrong" if i == "3" else i)))
+        self.assertEqual(run.call_count, 1)
+        self.assertTrue(run.call_args.kwargs["stop_on_failure"])
+        self.assertEqual(report["verdict"], Verdict.WRONG_ANSWER)
+        self.assertEqual(report["results"][3]["verdict"], Verdict.WRONG_ANSWER)
+        self.assertTrue(all(r.get("skipped") for r in report["results"][5:]))
+
+    def test_stopped_within_chunk(self):
+        # the executor stops after the failing run; the rest of the chunk is skipped
+        report, _ = self.judge(_tests("0", "1", "2"), lambda *a, **k: ({"results": [_run("x")]}, 200))
+        self.assertEqual([r["verdict"] for r in report["results"]], [Verdict.WRONG_ANSWER, judge.SKIPPED, judge.SKIPPED])
+
+    def test_score_every_test(self):
+        tests = _tests(*[str(k) for k in range(7)])
+        report, run = self.judge(tests, _echo(lambda i: _run("wrong" if i == "0" else i)), stop_on_failure=False)
+        self.assertEqual((run.call_count, report["passed"]), (2, 6))
+        self.assertFalse(run.call_args.kwargs["stop_on_failure"])
+
+    def test_executor_failure(self):
+        report, _ = self.judge(_tests("0"), lambda *a, **k: ({"error": "no healthy executor"}, 503))
+        self.assertTrue(report["internal_error"])
+        self.assertEqual(report["results"][0]["error"], "no healthy executor")
+
+    def test_time_budget(self):
+        report, run = self.judge(_tests("0", "1"), _echo(lambda i: _run(i)), JUDGE_TIME_BUDGET=0)
+        self.assertEqual((run.call_count, report["verdict"]), (0, Verdict.TIME_LIMIT_EXCEEDED))
+
+
+def _report(verdict=Verdict.ACCEPTED, **result):
+    return {"verdict": verdict, "passed": 1, "total": 1, "results": [{"test_case": 1, "passed": True, **result}]}
+
+
+class MemoKeyTests(SimpleTestCase):
+    def problem(self, **fields):
+        return Problem(**{"pk": 1, "test_manifest": [{"input": "a", "output": "b", "is_hidden": True}], **fields})
+
+    def test_code_normalized(self):
+        key = judge.judge_key(self.problem(), "python", "print(1)\n")
+        self.assertEqual(judge.judge_key(self.problem(), "python", "\r\nprint(1)   \r\n\n"), key)
+        self.assertNotEqual(judge.judge_key(self.problem(), "python", "print( 1)"), key)
+        self.assertNotEqual(judge.judge_key(self.problem(), "cpp", "print(1)"), key)
+
+    def test_changes_with_problem(self):
+        key = judge.judge_key(self.problem(), "python", "")
+        for fields in [{"time_limit": 9}, {"memory_limit": 1}, {"checker": "float"},
+                       {"test_manifest": []},
+                       {"test_manifest": [{"input": "a", "output": "b", "is_hidden": False}]}]:
+            with self.subTest(fields=fields):
+                self.assertNotEqual(judge.judge_key(self.problem(**fields), "python", ""), key)
+        self.assertEqual(judge.judge_key(self.problem(title="renamed"), "python", ""), key)
+
+    def test_memoizable(self):
+        self.assertTrue(judge.memoizable(_report()))
+        self.assertTrue(judge.memoizable(_report(Verdict.WRONG_ANSWER)))
+        for report in [None, _report(Verdict.TIME_LIMIT_EXCEEDED), {**_report(), "total": 2},
+                       {**_report(), "internal_error": True}, _report(skipped=True),
+                       _report(internal_error=True), {**_report(), "results": []}]:
+            with self.subTest(report=report):
+                self.assertFalse(judge.memoizable(report))
+
+
+@override_settings(CACHES=LOCAL_CACHE, JUDGE_MEMOIZE=True)
+class MemoizeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="alice")
+        self.problem = Problem.objects.create(title="p", description="", author=self.user,
+                                              test_manifest=[{"input": "a", "output": "b"}])
+        for name in ("user_stats", "problem_stats", "leaderboard", "scoreboard"):
+            patcher = mock.patch.object(judge, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def judged(self, report, code="print(1)"):
+        submission, judged = judge.create_pending(self.problem, self.user, "python", code)
+        self.assertFalse(judged)
+        Submission.objects.filter(pk=submission.pk).update(verdict=report["verdict"], judge_report=report)
+        return submission
+
+    def test_resubmission_reuses_verdict(self):
+        self.judged(_report(Verdict.WRONG_ANSWER))
+        submission, judged = judge.create_pending(self.problem, self.user, "python", "print(1)  \n")
+        self.assertTrue(judged)
+        self.assertEqual((submission.verdict, submission.judge_report), (Verdict.WRONG_ANSWER, _report(Verdict.WRONG_ANSWER)))
+
+    def test_incomplete_report_judged_again(self):
+        self.judged(_report(internal_error=True))
+        self.judged(_report(Verdict.TIME_LIMIT_EXCEEDED))
+        self.assertFalse(judge.create_pending(self.problem, self.user, "python", "print(1)")[1])
+
+    def test_edited_problem_judged_again(self):
+        self.judged(_report())
+        # a stale copy (as problem_cache may hold) still keys on the current data
+        stale = Problem.objects.get(pk=self.problem.pk)
+        Problem.objects.filter(pk=self.problem.pk).update(time_limit=7)
+        self.assertFalse(judge.create_pending(stale, self.user, "python", "print(1)")[1])
+
+    @override_settings(JUDGE_MEMOIZE=False)
+    def test_disabled(self):
+        self.judged(_report())
+        self.assertFalse(judge.create_pending(self.problem, self.user, "python", "print(1)")[1])
@@ -0,0 +1,122 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import LOCAL_CACHE
+from .. import judge, judge_queue
+from ..judge_queue import JudgeQueue
+from ..models import Problem, Submission, User
+
+Verdict = Submission.Verdict
+
+
+def _report(verdict=Verdict.ACCEPTED, internal_error=False):
+    return {"verdict": verdict, "passed": 1, "total": 1, "total_runtime_ms": 5, "peak_memory_kb": 2048,
+            "internal_error": internal_error, "results": [{"test_case": 1, "passed": True}]}
+
+
+class QueueTests(SimpleTestCase):
+    def test_no_workers_keeps_nothing(self):
+        queue = JudgeQueue(workers=0, poll_interval=1)
+        queue.put(1, 1)
+        self.assertIsNone(queue.get(0))
+
+    def test_put_once(self):
+        queue = JudgeQueue(workers=1, poll_interval=1)
+        queue.put(1, 7)
+        queue.put(1, 7)
+        self.assertEqual((queue.get(0), queue.get(0)), (1, None))
+
+    def test_round_robin(self):
+        queue = JudgeQueue(workers=1, poll_interval=1)
+        for submission_id, user_id in [(1, "a"), (2, "a"), (3, "a"), (4, "b"), (5, "c"), (6, "b")]:
+            queue.put(submission_id, user_id)
+        # one user's backlog delays the others by at most one job
+        self.assertEqual([queue.get(0) for _ in range(7)], [1, 4, 5, 2, 6, 3, None])
+
+
+@override_settings(CACHES=LOCAL_CACHE, JUDGE_CLAIM_TIMEOUT=600, JUDGE_RETRY_DELAY=30, JUDGE_MAX_ATTEMPTS=3)
+class ClaimTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="alice")
+        self.problem = Problem.objects.create(title="p", description="", author=self.user)
+        # the counters apply_report feeds are not under test here
+        for name in ("user_stats", "problem_stats", "leaderboard", "scoreboard"):
+            patcher = mock.patch.object(judge, name)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def pending(self, started_ago=None, attempts=0):
+        started = timezone.now() - timedelta(seconds=started_ago) if started_ago is not None else None
+        return Submission.objects.create(problem=self.problem, user=self.user, code="", language="python",
+                                         judge_started_at=started, judge_attempts=attempts)
+
+    def age(self, submission, seconds):
+        Submission.objects.filter(pk=submission.pk).update(
+            judge_started_at=timezone.now() - timedelta(seconds=seconds))
+
+    def test_claim(self):
+        sub = self.pending()
+        self.assertEqual(judge_queue._claim(sub.pk), 1)
+        self.assertIsNone(judge_queue._claim(sub.pk))  # held
+        self.age(sub, 601)
+        self.assertEqual(judge_queue._claim(sub.pk), 2)  # stale: taken over
+
+    def test_takeover_stores_once(self):
+        sub = self.pending()
+        judge_queue._claim(sub.pk)
+        self.age(sub, 601)
+        judge_queue._claim(sub.pk)
+        # the slow first worker finishes after the takeover: nothing stored, nothing counted
+        self.assertIsNone(judge.apply_report(sub, _report(Verdict.WRONG_ANSWER), 1))
+        self.assertEqual(Submission.objects.get(pk=sub.pk).verdict, Verdict.PENDING)
+        self.scoreboard.record.assert_not_called()
+        self.problem_stats.record.assert_not_called()
+
+        self.assertIsNotNone(judge.apply_report(sub, _report(), 2))
+        self.assertEqual(Submission.objects.get(pk=sub.pk).verdict, Verdict.ACCEPTED)
+        self.assertEqual(self.scoreboard.record.call_count, 1)
+        # and once judged, the other claim cannot overwrite it either
+        self.assertIsNone(judge.apply_report(sub, _report(Verdict.WRONG_ANSWER), 2))
+
+    def test_retries_then_internal_error(self):
+        sub = self.pending()
+        with mock.patch.object(judge_queue, "judge", return_value=_report(Verdict.RUNTIME_ERROR, internal_error=True)) as run:
+            judge_queue.judge_submission(sub.pk)
+            row = Submission.objects.get(pk=sub.pk)
+            self.assertEqual((row.verdict, row.judge_attempts), (Verdict.PENDING, 1))
+            # held back for JUDGE_RETRY_DELAY seconds
+            judge_queue.judge_submission(sub.pk)
+            self.assertEqual(run.call_count, 1)
+            self.age(sub, 601)
+            judge_queue.judge_submission(sub.pk)
+            self.age(sub, 601)
+            judge_queue.judge_submission(sub.pk)
+        row = Submission.objects.get(pk=sub.pk)
+        self.assertEqual((row.verdict, row.judge_attempts, run.call_count), (Verdict.RUNTIME_ERROR, 3, 3))
+        self.assertTrue(row.judge_report["internal_error"])
+
+    def test_exception_is_retried(self):
+        sub = self.pending()
+        with mock.patch.object(judge_queue, "judge", side_effect=RuntimeError("executor down")):
+            judge_queue.judge_submission(sub.pk)
+        row = Submission.objects.get(pk=sub.pk)
+        self.assertEqual(row.verdict, Verdict.PENDING)
+        # due again after the first backoff: the claim goes stale 30 s from now
+        due = row.judge_started_at + timedelta(seconds=600) - timezone.now()
+        self.assertAlmostEqual(due.total_seconds(), 30, delta=5)
+
+    def test_recover_only_unheld(self):
+        fresh = self.pending()
+        held = self.pending(started_ago=10, attempts=1)
+        stale = self.pending(started_ago=601, attempts=1)
+        backoff = self.pending(started_ago=600 - 30, attempts=1)  # waiting for a retry
+        judged = self.pending()
+        Submission.objects.filter(pk=judged.pk).update(verdict=Verdict.ACCEPTED)
+        queue = JudgeQueue(workers=1, poll_interval=1)
+        queue._recover()
+        self.assertEqual(queue._queued, {fresh.pk, stale.pk})
+        self.assertNotIn(held.pk, queue._queued)
+        self.assertNotIn(backoff.pk, queue._queued)
@@ -0,0 +1,118 @@
+import importlib
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.apps import apps
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import LOCAL_CACHE
+from .. import leaderboard
+from ..models import LeaderboardEntry, Problem, SolvedProblem, Submission, User
+
+Verdict = Submission.Verdict
+START = datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc)
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        for key in [leaderboard._key(7, 3, START), leaderboard._key(1, 0, None)]:
+            self.assertEqual(leaderboard.parse_cursor(leaderboard.cursor_for(key)), key)
+
+    def test_cursor_follows_order(self):
+        keys = sorted(leaderboard._key(uid, solved, START + timedelta(minutes=m))
+                      for uid, solved, m in [(1, 3, 5), (2, 3, 9), (3, 5, 1), (4, 0, 0)])
+        # most solved first, then the most recent solve
+        self.assertEqual([k[2] for k in keys], [3, 2, 1, 4])
+        self.assertEqual(sorted(leaderboard.parse_cursor(leaderboard.cursor_for(k)) for k in keys), keys)
+
+    def test_malformed(self):
+        for cursor in ["", "abc", "1.2", "1.2.3.4", "1.x.3"]:
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                leaderboard.parse_cursor(cursor)
+
+
+class RankedViewTests(SimpleTestCase):
+    def view(self):
+        view = leaderboard.RankedView(refresh=3600)
+        view._version, view._checked = 0, float("inf")  # loaded, never reloads
+        return view
+
+    def test_put_and_page(self):
+        view = self.view()
+        for n, (uid, solved) in enumerate([(1, 1), (2, 2), (3, 1), (1, 3)], start=1):
+            view.put(uid, solved, START + timedelta(minutes=uid), n)
+        total, rows = view.page(0, 10)
+        self.assertEqual(total, 3)  # user 1 moved, not added twice
+        self.assertEqual([(rank, key[2], solved) for rank, key, solved, _ in rows],
+                         [(1, 1, 3), (2, 2, 2), (3, 3, 1)])
+        self.assertEqual(view._version, 4)
+
+        # by cursor: the rows after user 1's, ranks unchanged
+        _, rows = view.page(limit=1, after=rows[0][1])
+        self.assertEqual([(rank, key[2]) for rank, key, *_ in rows], [(2, 2)])
+
+    def test_put_before_load(self):
+        view = leaderboard.RankedView(refresh=3600)
+        view.put(1, 1, START, 1)
+        self.assertEqual(view._keys, [])  # the first read loads it from the table
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class RecordTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(leaderboard, "board", leaderboard.RankedView(refresh=0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.alice = User.objects.create(username="alice")
+        self.bob = User.objects.create(username="bob")
+        self.p1 = Problem.objects.create(title="p1", description="", author=self.alice)
+        self.p2 = Problem.objects.create(title="p2", description="", author=self.alice)
+
+    def submit(self, user, problem, verdict, minute):
+        submission = Submission.objects.create(problem=problem, user=user, code="", language="python",
+                                               verdict=verdict)
+        at = START + timedelta(minutes=minute)
+        Submission.objects.filter(pk=submission.pk).update(submitted_at=at)
+        submission.submitted_at = at
+        return submission
+
+    def test_first_solve_counts_once(self):
+        self.assertFalse(leaderboard.record(self.submit(self.alice, self.p1, Verdict.WRONG_ANSWER, 1)))
+        self.assertTrue(leaderboard.record(self.submit(self.alice, self.p1, Verdict.ACCEPTED, 2)))
+        self.assertFalse(leaderboard.record(self.submit(self.alice, self.p1, Verdict.ACCEPTED, 3)))
+        self.assertTrue(leaderboard.record(self.submit(self.alice, self.p2, Verdict.ACCEPTED, 4)))
+        entry = LeaderboardEntry.objects.get(user=self.alice)
+        self.assertEqual((entry.solved, entry.last_solved_at), (2, START + timedelta(minutes=4)))
+        self.assertEqual(SolvedProblem.objects.filter(user=self.alice).count(), 2)
+
+    def test_page(self):
+        leaderboard.record(self.submit(self.bob, self.p1, Verdict.ACCEPTED, 1))
+        leaderboard.record(self.submit(self.alice, self.p1, Verdict.ACCEPTED, 2))
+        total, rows = leaderboard.board.page()
+        # tied on solved: the most recent solve ranks first
+        self.assertEqual((total, [key[2] for _, key, *_ in rows]), (2, [self.alice.pk, self.bob.pk]))
+
+    def test_rebuild(self):
+        for user, problem, verdict, minute in [(self.alice, self.p1, Verdict.ACCEPTED, 1),
+                                               (self.alice, self.p1, Verdict.ACCEPTED, 2),
+                                               (self.alice, self.p2, Verdict.WRONG_ANSWER, 3),
+                                               (self.bob, self.p2, Verdict.ACCEPTED, 4)]:
+            self.submit(user, problem, verdict, minute)
+        LeaderboardEntry.objects.create(user=self.alice, solved=9)  # stale
+        self.assertEqual(leaderboard.rebuild(), (2, 2))
+        self.assertEqual(sorted(LeaderboardEntry.objects.values_list("user__username", "solved")),
+                         [("alice", 1), ("bob", 1)])
+        self.assertEqual(SolvedProblem.objects.get(user=self.alice).solved_at, START + timedelta(minutes=1))
+
+    def test_migration_backfill(self):
+        # the migration that introduced the tables must fill them like rebuild() does
+        self.submit(self.alice, self.p1, Verdict.ACCEPTED, 1)
+        self.submit(self.alice, self.p1, Verdict.ACCEPTED, 2)
+        self.submit(self.bob, self.p1, Verdict.WRONG_ANSWER, 3)
+        migration = importlib.import_module("api.migrations.0013_backfill_leaderboard")
+        self.assertEqual(migration.AC_VALUES, leaderboard.AC_VALUES)
+        migration.backfill(apps, None)
+        self.assertEqual(list(LeaderboardEntry.objects.values_list("user__username", "solved")),
+                         [("alice", 1)])
+        # a later accepted submission is not a first solve
+        self.assertFalse(leaderboard.record(self.submit(self.alice, self.p1, Verdict.ACCEPTED, 4)))
@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from . import LOCAL_CACHE
+from .. import problem_cache
+from ..models import Problem, User
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class ProblemCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.process(problem_cache._LRU(8))
+        self.user = User.objects.create(username="alice")
+        self.problem = Problem.objects.create(title="p", description="old", author=self.user)
+
+    def process(self, lru):
+        """Act as a process with its own LRU in front of the shared cache."""
+        patcher = mock.patch.object(problem_cache, "_local", lru)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return lru
+
+    def edit(self, description):
+        Problem.objects.filter(pk=self.problem.pk).update(description=description)
+        problem_cache.invalidate(self.problem.pk)
+
+    def test_read_through(self):
+        self.assertEqual(problem_cache.detail(self.problem.pk)["description"], "old")
+        self.assertNotIn("test_cases", problem_cache.detail(self.problem.pk))
+        problem_cache.problem(self.problem.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(problem_cache.detail(str(self.problem.pk))["description"], "old")
+            self.assertEqual(problem_cache.problem(self.problem.pk).pk, self.problem.pk)
+        # another process finds it in the shared cache
+        self.process(problem_cache._LRU(8))
+        with self.assertNumQueries(0):
+            problem_cache.detail(self.problem.pk)
+
+    def test_missing(self):
+        self.assertIsNone(problem_cache.detail(self.problem.pk + 1))
+        Problem.objects.create(pk=self.problem.pk + 1, title="q", description="", author=self.user)
+        self.assertEqual(problem_cache.detail(self.problem.pk + 1)["title"], "q")
+
+    def test_invalidate(self):
+        problem_cache.detail(self.problem.pk)
+        self.edit("new")
+        self.assertEqual(problem_cache.detail(self.problem.pk)["description"], "new")
+
+    def test_other_process_refreshes(self):
+        problem_cache.detail(self.problem.pk)
+        editor = problem_cache._LRU(8)
+        with mock.patch.object(problem_cache, "_local", editor):
+            self.edit("new")
+        self.assertEqual(problem_cache.detail(self.problem.pk)["description"], "old")  # until its next check
+        with mock.patch.object(problem_cache, "_REFRESH", 0):
+            self.assertEqual(problem_cache.detail(self.problem.pk)["description"], "new")
+
+    def test_load_overlapping_an_edit_not_kept(self):
+        def load():
+            self.edit("new")  # the edit lands while the old row is being read
+            return {"description": "old"}
+
+        self.assertEqual(problem_cache._get(self.problem.pk, "detail", load), {"description": "old"})
+        self.assertEqual(problem_cache.detail(self.problem.pk)["description"], "new")
+
+    def test_version_lost_to_eviction(self):
+        problem_cache.detail(self.problem.pk)
+        cache.delete(problem_cache._version_key(self.problem.pk))
+        self.edit("new")
+        self.process(problem_cache._LRU(8))
+        self.assertEqual(problem_cache.detail(self.problem.pk)["description"], "new")
+
+    def test_lru_bounded(self):
+        lru = self.process(problem_cache._LRU(2))
+        for pk in (1, 2, 1, 3):
+            lru.put((pk, "row"), (0, 0, pk), lru.drops)
+        self.assertEqual(list(lru._entries), [(1, "row"), (3, "row")])
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import LOCAL_CACHE
+from .. import judge_queue, problem_cache, problem_stats
+from ..models import Problem, ProblemStats, Submission, User
+
+Verdict = Submission.Verdict
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class ProblemStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="alice")
+        self.p1 = Problem.objects.create(title="p1", description="", author=self.user)
+        self.p2 = Problem.objects.create(title="p2", description="", author=self.user)
+
+    def submit(self, problem, verdict=Verdict.PENDING):
+        return Submission.objects.create(problem=problem, user=self.user, code="", language="python",
+                                         verdict=verdict)
+
+    def test_record(self):
+        sub = self.submit(self.p1)
+        problem_stats.record(sub, new=True)
+        sub.verdict = Verdict.ACCEPTED
+        problem_stats.record(sub, new=False)
+        problem_stats.record(self.submit(self.p1, Verdict.ACCEPTED), new=True)  # memoized accept
+        wrong = self.submit(self.p1, Verdict.WRONG_ANSWER)
+        problem_stats.record(wrong, new=True)
+        problem_stats.record(wrong, new=False)  # judged, not accepted: nothing to count
+        self.assertEqual(problem_stats.for_problems([self.p1.pk, self.p2.pk]), {
+            self.p1.pk: {"submissions": 3, "accepted": 2},
+            self.p2.pk: {"submissions": 0, "accepted": 0},
+        })
+
+    def test_rebuild(self):
+        for problem, verdict in [(self.p1, Verdict.ACCEPTED), (self.p1, Verdict.WRONG_ANSWER),
+                                 (self.p2, Verdict.ACCEPTED)]:
+            self.submit(problem, verdict)
+        ProblemStats.objects.create(problem=self.p1, submissions=9, accepted=9)  # stale
+        self.assertEqual(problem_stats.rebuild(), 2)
+        self.assertEqual(problem_stats.for_problems([self.p1.pk, self.p2.pk]), {
+            self.p1.pk: {"submissions": 2, "accepted": 1},
+            self.p2.pk: {"submissions": 1, "accepted": 1},
+        })
+
+
+@override_settings(CACHES=LOCAL_CACHE, SECURE_SSL_REDIRECT=False)
+class ProblemListTests(TestCase):
+    def setUp(self):
+        # a request would start this process's judge workers
+        patcher = mock.patch.object(judge_queue.judge_queue, "start")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # and the detail is served through the problem cache: start it empty
+        cache.clear()
+        patcher = mock.patch.object(problem_cache, "_local", problem_cache._LRU(8))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create(username="alice")
+        for n in range(3):
+            problem = Problem.objects.create(title=f"p{n}", description="long statement", author=self.user,
+                                             tags=["dp"], test_manifest=[{"input": "x", "output": "y"}])
+            ProblemStats.objects.create(problem=problem, submissions=n + 1, accepted=n)
+
+    def test_summary_rows(self):
+        response = APIClient().get("/api/problems/", {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["count"], len(response.data["results"])), (3, 2))
+        row = response.data["results"][1]
+        self.assertEqual(set(row), {"id", "title", "difficulty", "tags", "submissions", "accepted"})
+        self.assertEqual((row["title"], row["submissions"], row["accepted"]), ("p1", 2, 1))
+
+        response = APIClient().get(response.data["next"])
+        self.assertEqual([r["title"] for r in response.data["results"]], ["p2"])
+
+    def test_detail_has_no_test_data(self):
+        problem = Problem.objects.get(title="p0")
+        response = APIClient().get(f"/api/problems/{problem.pk}/")
+        self.assertEqual((response.status_code, response.data["description"]), (200, "long statement"))
+        self.assertNotIn("test_cases", response.data)
+        self.assertNotIn("test_manifest", response.data)
@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import LOCAL_CACHE
+from .. import scoreboard
+from ..models import Contest, ContestParticipant, Problem, Submission, User
+
+Verdict = Submission.Verdict
+START = datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def _contest(scoring, freeze_minutes=0, penalty_minutes=20, minutes=300):
+    return SimpleNamespace(scoring=scoring, penalty_minutes=penalty_minutes,
+                           freeze_minutes=freeze_minutes, start_time=START,
+                           end_time=START + timedelta(minutes=minutes))
+
+
+class ScoringTests(SimpleTestCase):
+    def submit(self, contest, results, problem_id, verdict, minute, passed=0, total=10):
+        return scoreboard._add(contest, results, problem_id, verdict, passed, total,
+                               START + timedelta(minutes=minute))
+
+    def test_icpc_penalty(self):
+        contest = _contest(Contest.Scoring.ICPC)
+        results = {}
+        for verdict, minute in [(Verdict.WRONG_ANSWER, 10), (Verdict.COMPILATION_ERROR, 20),
+                                (Verdict.ACCEPTED, 30), (Verdict.WRONG_ANSWER, 40)]:
+            results = self.submit(contest, results, 1, verdict, minute)
+        # one rejected try before the solve; compilation errors and later tries are free
+        self.assertEqual(scoreboard._totals(contest, results["live"]), (1, 30 + 20))
+
+    def test_icpc_out_of_order(self):
+        contest = _contest(Contest.Scoring.ICPC)
+        results = self.submit(contest, {}, 1, Verdict.ACCEPTED, 30)
+        results = self.submit(contest, results, 1, Verdict.WRONG_ANSWER, 10)
+        self.assertEqual(scoreboard._totals(contest, results["live"]), (1, 50))
+
+    def test_icpc_freeze(self):
+        contest = _contest(Contest.Scoring.ICPC, freeze_minutes=60)
+        results = {}
+        for problem_id, verdict, minute in [(1, Verdict.WRONG_ANSWER, 10), (1, Verdict.ACCEPTED, 30),
+                                            (2, Verdict.WRONG_ANSWER, 250), (2, Verdict.ACCEPTED, 260)]:
+            results = self.submit(contest, results, problem_id, verdict, minute)
+        self.assertEqual(scoreboard._totals(contest, results["live"]), (2, 50 + 280))
+        self.assertEqual(scoreboard._totals(contest, results["public"]), (1, 50))
+        self.assertEqual(results["public"]["2"], {"pending": 2})
+
+    def test_ioi_best_score(self):
+        contest = _contest(Contest.Scoring.IOI)
+        results = {}
+        for problem_id, verdict, minute, passed in [
+                (1, Verdict.WRONG_ANSWER, 10, 3), (1, Verdict.WRONG_ANSWER, 50, 7),
+                (1, Verdict.WRONG_ANSWER, 60, 7), (1, Verdict.WRONG_ANSWER, 70, 2),
+                (2, Verdict.ACCEPTED, 100, 10)]:
+            results = self.submit(contest, results, problem_id, verdict, minute, passed)
+        cell = results["live"]["1"]
+        self.assertEqual((cell["score"], cell["at"], cell["tries"]), (70, 50 * 60, 4))
+        # best scores add up; ties go by the minute the last of them was reached
+        self.assertEqual(scoreboard._totals(contest, results["live"]), (170, 100))
+
+    def test_apply_keeps_cell(self):
+        cell = {"tries": 1}
+        scoreboard._apply(Contest.Scoring.ICPC, cell, Verdict.ACCEPTED, 10, 10, 60)
+        self.assertEqual(cell, {"tries": 1})
+
+    def test_view_for(self):
+        board = scoreboard.Standings(_contest(Contest.Scoring.ICPC, freeze_minutes=60))
+        user, staff = SimpleNamespace(is_staff=False), SimpleNamespace(is_staff=True)
+        frozen = START + timedelta(minutes=250)
+        self.assertEqual(board.view_for(user, START + timedelta(minutes=100)), "live")
+        self.assertEqual(board.view_for(user, frozen), "public")
+        self.assertEqual(board.view_for(staff, frozen), "live")
+        self.assertEqual(board.view_for(user, START + timedelta(minutes=300)), "live")
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class StandingsTests(TestCase):
+    def setUp(self):
+        # persisted by hand, not by a timer thread
+        patcher = mock.patch.object(scoreboard.Standings, "_schedule", lambda self: None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(scoreboard._boards.clear)
+        self.alice = User.objects.create(username="alice")
+        self.bob = User.objects.create(username="bob")
+        self.problem = Problem.objects.create(title="p", description="", author=self.alice)
+        self.contest = Contest.objects.create(title="c", description="", start_time=START,
+                                              end_time=START + timedelta(hours=5))
+        self.contest.problems.add(self.problem)
+        for user in (self.alice, self.bob):
+            ContestParticipant.objects.create(contest=self.contest, user=user)
+
+    def submit(self, board, user, verdict, minute):
+        at = START + timedelta(minutes=minute)
+        submission = Submission.objects.create(problem=self.problem, user=user, code="", language="python",
+                                               verdict=verdict, judge_report={"passed": 0, "total": 1})
+        Submission.objects.filter(pk=submission.pk).update(submitted_at=at)
+        if board is not None:
+            self.assertTrue(board.record(user.pk, self.problem.pk, verdict, 0, 1, at))
+
+    def row(self, user):
+        return ContestParticipant.objects.values_list("score", "penalty", "rank", "version").get(
+            contest=self.contest, user=user)
+
+    def test_persist(self):
+        board = scoreboard.standings(self.contest)
+        self.submit(board, self.alice, Verdict.WRONG_ANSWER, 10)
+        self.submit(board, self.alice, Verdict.ACCEPTED, 30)
+        self.assertEqual(self.row(self.alice), (0, 0, None, 0))  # not written yet
+        board.persist()
+        self.assertEqual(self.row(self.alice), (1, 50, 1, 1))
+        self.assertEqual(self.row(self.bob)[2], 2)
+        total, rows = board.page()
+        self.assertEqual((total, [r[1:4] for r in rows]),
+                         (2, [(self.alice.pk, 1, 50), (self.bob.pk, 0, 0)]))
+
+    def test_changed_elsewhere(self):
+        board = scoreboard.standings(self.contest)
+        self.submit(None, self.bob, Verdict.ACCEPTED, 5)  # recorded by another process
+        self.submit(board, self.bob, Verdict.WRONG_ANSWER, 1)
+        ContestParticipant.objects.filter(user=self.bob).update(version=7)
+        board.persist()
+        # the row moved on: recomputed from both submissions, not overwritten
+        self.assertEqual(self.row(self.bob), (1, 25, 1, 8))
+
+    def test_flush_at_exit(self):
+        board = scoreboard.standings(self.contest)
+        self.submit(board, self.bob, Verdict.ACCEPTED, 20)
+        scoreboard.flush()
+        self.assertEqual(self.row(self.bob)[:3], (1, 20, 1))
+
+    def test_lost_updates_reconciled_on_load(self):
+        # a process recorded a solve and died before writing it
+        board = scoreboard.Standings(self.contest)
+        self.submit(board, self.alice, Verdict.ACCEPTED, 40)
+        self.assertEqual(self.row(self.alice)[:2], (0, 0))
+
+        board = scoreboard.Standings(self.contest)
+        self.assertTrue(board.has(self.alice.pk))
+        self.assertEqual(board.page()[1][0][1:4], (self.alice.pk, 1, 40))
+        self.assertEqual(board._dirty, {self.alice.pk})  # bob's row was right
+        board.persist()
+        self.assertEqual(self.row(self.alice), (1, 40, 1, 1))
+
+    def test_rebuild(self):
+        self.submit(None, self.alice, Verdict.ACCEPTED, 15)
+        self.submit(None, self.bob, Verdict.WRONG_ANSWER, 15)
+        self.assertEqual(scoreboard.rebuild(self.contest), 2)
+        self.assertEqual(self.row(self.alice)[:3], (1, 15, 1))
+        self.assertEqual(self.row(self.bob)[:3], (0, 0, 2))
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import LOCAL_CACHE
+from .. import judge_queue
+from ..models import Problem, Submission, User
+
+START = datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc)
+
+
+@override_settings(CACHES=LOCAL_CACHE, SECURE_SSL_REDIRECT=False)
+class SubmissionHistoryTests(TestCase):
+    def setUp(self):
+        # a request would start this process's judge workers
+        patcher = mock.patch.object(judge_queue.judge_queue, "start")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.alice = User.objects.create(username="alice")
+        bob = User.objects.create(username="bob")
+        self.problem = Problem.objects.create(title="Two Sum", description="", author=self.alice)
+        self.ids = []
+        for minute in range(5):
+            submission = Submission.objects.create(problem=self.problem, user=self.alice, code=f"print({minute})",
+                                                   language="python", ai_feedback="long feedback")
+            Submission.objects.filter(pk=submission.pk).update(submitted_at=START + timedelta(minutes=minute))
+            self.ids.append(submission.pk)
+        Submission.objects.create(problem=self.problem, user=bob, code="", language="cpp")
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def test_pages_newest_first(self):
+        seen, url, params = [], "/api/submissions/", {"page_size": 2}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            seen.append([row["id"] for row in response.data["results"]])
+            url, params = response.data["next"], None
+        # own submissions only, each once
+        self.assertEqual(seen, [self.ids[:2:-1], self.ids[2:0:-1], self.ids[:1]])
+
+    def test_rows_leave_out_code(self):
+        row = self.client.get("/api/submissions/").data["results"][0]
+        self.assertEqual(set(row), {"id", "problem", "problem_id", "language", "verdict",
+                                    "execution_time", "memory_used", "submitted_at"})
+        self.assertEqual((row["problem"], row["problem_id"]), ("Two Sum", self.problem.pk))
+
+        detail = self.client.get(f"/api/submissions/{row['id']}/").data
+        self.assertEqual((detail["code"], detail["ai_feedback"]), ("print(4)", "long feedback"))
+
+    def test_requires_login(self):
+        self.assertEqual(APIClient().get("/api/submissions/").status_code, 401)
@@ -0,0 +1,61 @@
+import hashlib, os, tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from .. import testdata
+from ..testdata import TestDataStore
+
+
+class TestDataTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        patcher = mock.patch.object(testdata, "store", TestDataStore(self.root))
+        self.store = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def blobs(self):
+        return sorted(name for _, _, files in os.walk(self.root) for name in files)
+
+    def test_put_is_content_addressed(self):
+        digest = self.store.put("1 2\n")
+        self.assertEqual(digest, hashlib.sha256(b"1 2\n").hexdigest())
+        self.assertEqual(self.store.put("1 2\n"), digest)
+        self.assertEqual(self.store.put(None), hashlib.sha256(b"").hexdigest())
+        self.assertEqual(self.store.read(digest), "1 2\n")
+        # one file per distinct content, under a two-character fan-out directory
+        self.assertEqual(self.blobs(), sorted([digest, hashlib.sha256(b"").hexdigest()]))
+        self.assertTrue(os.path.isfile(os.path.join(self.root, digest[:2], digest)))
+
+    def test_save_cases(self):
+        problem = SimpleNamespace(test_manifest=[])
+        testdata.save_cases(problem, [{"input_data": "1\n", "expected_output": "2\n", "is_hidden": False},
+                                      {"input_data": "1\n", "expected_output": "é\n"}])
+        first, second = problem.test_manifest
+        self.assertEqual(first["input"], second["input"])  # stored once, shared
+        self.assertEqual((first["is_hidden"], second["is_hidden"]), (False, True))
+        self.assertEqual((second["input_bytes"], second["output_bytes"]), (2, 3))
+        self.assertEqual(len(self.blobs()), 3)
+        self.assertEqual(testdata.load_cases(problem), [
+            {"input_data": "1\n", "expected_output": "2\n", "is_hidden": False},
+            {"input_data": "1\n", "expected_output": "é\n", "is_hidden": True},
+        ])
+
+    def test_cases_are_lazy(self):
+        problem = SimpleNamespace(test_manifest=[])
+        testdata.save_cases(problem, [{"input_data": "a", "expected_output": "b"}] * 3)
+        with mock.patch.object(self.store, "read", wraps=self.store.read) as read:
+            refs = testdata.cases(problem)
+            self.assertEqual(len(refs), 3)
+            self.assertTrue(refs[0].get("is_hidden"))
+            read.assert_not_called()
+            self.assertEqual(refs[1].get("input_data"), "a")
+            self.assertEqual(refs[1].get("input_data"), "a")
+            self.assertEqual(read.call_count, 1)  # one test, one field, read once
+            self.assertIsNone(refs[1].get("checker"))
+
+    def test_no_manifest(self):
+        self.assertEqual(testdata.cases(SimpleNamespace(test_manifest=None)), [])
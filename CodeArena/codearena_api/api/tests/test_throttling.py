@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from . import LOCAL_CACHE
+from .. import throttling
+from ..throttling import SubmitThrottle
+
+
+@override_settings(CACHES=LOCAL_CACHE, THROTTLE_BUCKETS={"submit": (2, 0.001)},
+                   THROTTLE_IP_BUCKETS={"submit": (3, 0.001)})
+class ThrottleTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def request(self, user_id, addr="10.0.0.1"):
+        user = SimpleNamespace(pk=user_id, is_authenticated=True)
+        return SimpleNamespace(user=user, META={"REMOTE_ADDR": addr})
+
+    def allow(self, *args):
+        throttle = SubmitThrottle()
+        return throttle.allow_request(self.request(*args), None), throttle.wait()
+
+    def test_user_bucket(self):
+        self.assertEqual([self.allow(1)[0] for _ in range(3)], [True, True, False])
+        allowed, wait = self.allow(1)
+        self.assertFalse(allowed)
+        self.assertGreater(wait, 0)
+        self.assertTrue(self.allow(2)[0])  # a different user, same address
+
+    def test_ip_bucket_is_larger(self):
+        # three users behind one address: the address has room for three
+        self.assertEqual([self.allow(uid)[0] for uid in (1, 2, 3, 4)], [True, True, True, False])
+        self.assertTrue(self.allow(5, "10.0.0.2")[0])
+
+    def test_refused_takes_nothing(self):
+        for uid in (1, 2, 3):
+            self.allow(uid)
+        # refused by the address: the user's own bucket is not charged
+        self.assertFalse(self.allow(1)[0])
+        self.assertEqual(throttling.take("submit", ["user:1"]), (0.0, None))
+        self.assertEqual(throttling.take("submit", ["user:1"])[1], "user:1")
+
+    def test_stats(self):
+        self.allow(1), self.allow(1), self.allow(1)
+        stats = throttling.throttle_stats()
+        self.assertEqual({k: stats["scopes"]["submit"][k] for k in ("allowed", "throttled", "ip_burst")},
+                         {"allowed": 2, "throttled": 1, "ip_burst": 3.0})
+        self.assertEqual(stats["recent"][-1]["who"], "user:1")
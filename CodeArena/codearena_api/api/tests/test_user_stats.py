@@ -0,0 +1,70 @@
+from django.test import TestCase, override_settings
+
+from . import LOCAL_CACHE
+from .. import user_stats
+from ..models import Problem, Profile, Submission, User
+
+Verdict = Submission.Verdict
+Difficulty = Problem.Difficulty
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class UserStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="alice")
+        self.easy = Problem.objects.create(title="e", description="", author=self.user, difficulty=Difficulty.EASY)
+        self.hard = Problem.objects.create(title="h", description="", author=self.user, difficulty=Difficulty.HARD)
+
+    def submit(self, problem, verdict, language="python"):
+        return Submission.objects.create(problem=problem, user=self.user, code="", language=language,
+                                         verdict=verdict)
+
+    def counters(self):
+        profile = Profile.objects.get(user=self.user)
+        return {field: getattr(profile, field) for field in user_stats._FIELDS}
+
+    def test_backfilled_on_first_read(self):
+        self.submit(self.easy, Verdict.ACCEPTED)
+        self.submit(self.easy, Verdict.ACCEPTED, "cpp")
+        self.submit(self.hard, Verdict.WRONG_ANSWER)
+        profile = user_stats.for_user(self.user)
+        self.assertEqual(profile.stats_version, 1)
+        self.assertEqual(self.counters(), {
+            "total_submissions": 3, "accepted_submissions": 2, "solved_count": 1,
+            "solved_by_difficulty": {Difficulty.EASY: 1},
+            "submissions_by_language": {"python": 2, "cpp": 1},
+        })
+
+    def test_record(self):
+        user_stats.for_user(self.user)  # counted: nothing yet
+        pending = self.submit(self.hard, Verdict.PENDING, "java")
+        user_stats.record(pending, new=True, first_solve=False)
+        pending.verdict = Verdict.ACCEPTED
+        user_stats.record(pending, new=False, first_solve=True)
+        again = self.submit(self.hard, Verdict.ACCEPTED, "java")
+        user_stats.record(again, new=True, first_solve=False)
+        wrong = self.submit(self.easy, Verdict.WRONG_ANSWER)
+        user_stats.record(wrong, new=False, first_solve=False)  # judged, not accepted: nothing to count
+        self.assertEqual(self.counters(), {
+            "total_submissions": 2, "accepted_submissions": 2, "solved_count": 1,
+            "solved_by_difficulty": {Difficulty.HARD: 1},
+            "submissions_by_language": {"java": 2},
+        })
+        self.assertEqual(Profile.objects.get(user=self.user).stats_version, 4)
+
+    def test_record_on_uncounted_profile(self):
+        # the first record of a user never counted counts their history, this submission included
+        self.submit(self.easy, Verdict.WRONG_ANSWER)
+        submission = self.submit(self.easy, Verdict.PENDING)
+        user_stats.record(submission, new=True, first_solve=False)
+        self.assertEqual(self.counters()["total_submissions"], 2)
+
+    def test_rebuild(self):
+        bob = User.objects.create(username="bob")
+        Submission.objects.create(problem=self.hard, user=bob, code="", language="cpp", verdict=Verdict.ACCEPTED)
+        self.submit(self.easy, Verdict.ACCEPTED)
+        user_stats.for_user(self.user)
+        Profile.objects.filter(user=self.user).update(total_submissions=99)  # drifted
+        self.assertEqual(user_stats.rebuild(), 2)
+        self.assertEqual(self.counters()["total_submissions"], 1)
+        self.assertEqual(Profile.objects.get(user=bob).solved_by_difficulty, {Difficulty.HARD: 1})
@@ -0,0 +1,118 @@
+# CodeArena/codearena_api/api/throttling.py
+"""
+Token-bucket throttles for the endpoints that cost executor time.
+
+Every caller has a bucket per scope ("run", "submit") holding up to `burst`
+tokens and refilled at `per_minute` tokens a minute; a request takes one
+token or is refused with 429 and a Retry-After of the time until the next
+token. Requests are checked against both a per-user and a per-IP bucket, so
+neither a shared account nor a script cycling accounts from one address can
+flood the executor; a token is only taken when both buckets have one. A
+contest hall behind one NAT address shares its IP bucket, so IP limits are
+separate and larger: settings.THROTTLE_BUCKETS for users,
+settings.THROTTLE_IP_BUCKETS for addresses.
+
+Buckets and hit counters live in the default Django cache. The default
+file-based cache is shared by the processes of one host; with web processes
+on several hosts it must point at a shared backend (memcached, see CACHES)
+for the limits to be global.
+"""
+import threading, time
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+_lock = threading.Lock()
+
+# keys of the admin-visible counters (see throttle_stats)
+_STATS_KEY = "throttle:stats:{scope}:{outcome}"
+_RECENT_KEY = "throttle:recent"
+_RECENT_MAX = 50
+
+
+def _limits(scope: str, kind: str = "user") -> Tuple[float, float]:
+    if kind == "ip":
+        burst, per_minute = getattr(settings, "THROTTLE_IP_BUCKETS", {}).get(scope, (40, 120))
+    else:
+        burst, per_minute = getattr(settings, "THROTTLE_BUCKETS", {}).get(scope, (10, 30))
+    return float(burst), float(per_minute) / 60.0
+
+
+def take(scope: str, idents: List[str]) -> Tuple[float, Optional[str]]:
+    """
+    Take a token from each of `idents`' buckets ("user:<pk>", "ip:<addr>"),
+    or from none of them if any is empty. Returns (0, None) if allowed, else
+    the seconds to wait and the ident whose bucket was empty.
+    """
+    now = time.time()
+    with _lock:
+        buckets = []
+        for ident in idents:
+            burst, rate = _limits(scope, ident.split(":", 1)[0])
+            key = f"throttle:{scope}:{ident}"
+            tokens, stamp = cache.get(key) or (burst, now)
+            tokens = min(burst, tokens + (now - stamp) * rate)
+            if tokens < 1:
+                return (1 - tokens) / rate, ident
+            buckets.append((key, tokens, burst, rate))
+        for key, tokens, burst, rate in buckets:
+            cache.set(key, (tokens - 1, now), timeout=int(burst / rate) + 60)
+    return 0.0, None
+
+
+def _count(scope: str, outcome: str, ident: str = None) -> None:
+    key = _STATS_KEY.format(scope=scope, outcome=outcome)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:  # evicted between add and incr
+            cache.set(key, 1, timeout=None)
+    if ident:
+        with _lock:
+            recent = cache.get(_RECENT_KEY) or []
+            recent.append({"scope": scope, "who": ident, "at": int(time.time())})
+            cache.set(_RECENT_KEY, recent[-_RECENT_MAX:], timeout=None)
+
+
+def throttle_stats() -> Dict[str, object]:
+    """Allowed/throttled counts per scope and the most recent throttled callers."""
+    scopes = getattr(settings, "THROTTLE_BUCKETS", {})
+    out = {}
+    for scope in scopes:
+        burst, rate = _limits(scope)
+        ip_burst, ip_rate = _limits(scope, "ip")
+        out[scope] = {
+            "burst": burst, "per_minute": rate * 60,
+            "ip_burst": ip_burst, "ip_per_minute": ip_rate * 60,
+            "allowed": cache.get(_STATS_KEY.format(scope=scope, outcome="allowed"), 0),
+            "throttled": cache.get(_STATS_KEY.format(scope=scope, outcome="throttled"), 0),
+        }
+    return {"scopes": out, "recent": cache.get(_RECENT_KEY) or []}
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def allow_request(self, request, view):
+        idents = [f"ip:{self.get_ident(request)}"]
+        if request.user and request.user.is_authenticated:
+            idents.insert(0, f"user:{request.user.pk}")
+        self.wait_seconds, ident = take(self.scope, idents)
+        if self.wait_seconds:
+            _count(self.scope, "throttled", ident)
+            return False
+        _count(self.scope, "allowed")
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class RunThrottle(TokenBucketThrottle):
+    scope = "run"
+
+
+class SubmitThrottle(TokenBucketThrottle):
+    scope = "submit"
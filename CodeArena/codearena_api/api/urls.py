@@ -4,7 +4,7 @@ from rest_framework.routers import DefaultRouter
 
 from .views import ProfileViewSet, ProblemViewSet, SubmissionViewSet, ContestViewSet
 from .views_ai import review_solution   # <-- add this
-from .views_extra import register, me_summary, leaderboard, codeforces_contests
+from .views_extra import register, me_summary, leaderboard, codeforces_contests, judge_load
 from .views_auth import me
 
 router = DefaultRouter()
@@ -19,6 +19,7 @@ urlpatterns = [
     path("me/summary/", me_summary, name="me-summary"),
     path("leaderboard/", leaderboard, name="leaderboard"),
     path("contests/codeforces/", codeforces_contests, name="cf-contests"),
+    path("judge/load/", judge_load, name="judge-load"),
     
     # custom endpoint (AI review)
     path("problems/<int:pk>/review/", review_solution, name="problem-review"),
@@ -0,0 +1,114 @@
+# CodeArena/codearena_api/api/user_stats.py
+"""
+Per-user submission counters on Profile: total and accepted submissions,
+distinct problems solved, solved per difficulty and submissions per
+language. They are updated as submissions are recorded, so the dashboard
+reads one profile instead of counting submissions.
+
+Updates are compare-and-swap on Profile.stats_version inside a
+transaction, so judge workers finishing two submissions of the same user
+at once both count. A profile that was never counted (stats_version 0) is
+filled from the user's submissions the first time it is needed, and
+`rebuild()` (manage.py rebuild_user_stats) recomputes the counters from
+the submissions for everyone, to backfill or repair them.
+"""
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from django.db import transaction
+
+from .leaderboard import AC_VALUES
+from .models import Problem, Profile, Submission
+
+log = logging.getLogger(__name__)
+
+_UPDATE_RETRIES = 5
+_FIELDS = ("total_submissions", "accepted_submissions", "solved_count",
+           "solved_by_difficulty", "submissions_by_language")
+
+
+def record(submission: Submission, new: bool, first_solve: bool) -> None:
+    """
+    Count `submission`: `new` when it was just created, its verdict if
+    accepted, and its problem as solved on the user's `first_solve`.
+    """
+    accepted = submission.verdict in AC_VALUES
+    if not (new or accepted):
+        return
+    difficulty = submission.problem.difficulty if first_solve else None
+
+    for _ in range(_UPDATE_RETRIES):
+        with transaction.atomic():
+            profile, _ = Profile.objects.get_or_create(user_id=submission.user_id)
+            if profile.stats_version == 0:
+                # never counted: start from the user's history, which already
+                # includes this submission
+                rebuild([submission.user_id])
+                return
+            changes = {"stats_version": profile.stats_version + 1}
+            if new:
+                changes["total_submissions"] = profile.total_submissions + 1
+                langs = dict(profile.submissions_by_language or {})
+                langs[submission.language] = langs.get(submission.language, 0) + 1
+                changes["submissions_by_language"] = langs
+            if accepted:
+                changes["accepted_submissions"] = profile.accepted_submissions + 1
+            if first_solve:
+                changes["solved_count"] = profile.solved_count + 1
+                by_difficulty = dict(profile.solved_by_difficulty or {})
+                key = difficulty or "Unknown"
+                by_difficulty[key] = by_difficulty.get(key, 0) + 1
+                changes["solved_by_difficulty"] = by_difficulty
+            if Profile.objects.filter(pk=profile.pk, stats_version=profile.stats_version).update(**changes):
+                return
+    log.warning("profile counters of user %s kept changing; run rebuild_user_stats", submission.user_id)
+
+
+def for_user(user) -> Profile:
+    """The user's profile, with counters backfilled if it had none yet."""
+    profile = Profile.objects.filter(user=user).first()
+    if profile is None or profile.stats_version == 0:
+        rebuild([user.pk])
+        profile = Profile.objects.get(user=user)
+    return profile
+
+
+def rebuild(user_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute the counters of `user_ids` (default: everyone with submissions); returns users updated."""
+    subs = Submission.objects.all()
+    problems = Problem.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        subs = subs.filter(user_id__in=user_ids)
+        problems = problems.filter(id__in=subs.values_list("problem_id", flat=True).distinct())
+    difficulty = dict(problems.values_list("id", "difficulty"))
+
+    stats: Dict[int, Dict] = {uid: _empty() for uid in (user_ids or [])}
+    solved = set()
+    for user_id, problem_id, language, verdict in subs.values_list(
+            "user_id", "problem_id", "language", "verdict").iterator():
+        s = stats.setdefault(user_id, _empty())
+        s["total_submissions"] += 1
+        s["submissions_by_language"][language] += 1
+        if verdict in AC_VALUES:
+            s["accepted_submissions"] += 1
+            if (user_id, problem_id) not in solved:
+                solved.add((user_id, problem_id))
+                s["solved_count"] += 1
+                s["solved_by_difficulty"][difficulty.get(problem_id) or "Unknown"] += 1
+
+    for user_id, s in stats.items():
+        with transaction.atomic():
+            profile, _ = Profile.objects.get_or_create(user_id=user_id)
+            for field in _FIELDS:
+                value = s[field]
+                setattr(profile, field, dict(value) if isinstance(value, Counter) else value)
+            profile.stats_version += 1
+            profile.save(update_fields=[*_FIELDS, "stats_version"])
+    return len(stats)
+
+
+def _empty() -> Dict:
+    return {"total_submissions": 0, "accepted_submissions": 0, "solved_count": 0,
+            "solved_by_difficulty": Counter(), "submissions_by_language": Counter()}
@@ -3,14 +3,22 @@ from django.shortcuts import render
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action, permission_classes
 from rest_framework.response import Response
-from django.conf import settings
-from .models import Profile, Problem, Submission, Contest
-from .serializers import ProfileSerializer, ProblemSerializer, SubmissionSerializer, ContestSerializer
-
+from .models import Profile, Problem, Submission, Contest, ContestParticipant
+from .serializers import (ProfileSerializer, ProblemSerializer, ProblemSummarySerializer,
+                          SubmissionSerializer, SubmissionSummarySerializer, ContestSerializer)
+from . import problem_cache, problem_stats, scoreboard
+from .judge import create_pending, submission_status
+from .judge_queue import enqueue
+from .executor_client import get_client
+from .throttling import RunThrottle, SubmitThrottle
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.views import APIView
-from django.conf import settings
-import requests, time
+import time
 
 from rest_framework.permissions import (
     AllowAny,
@@ -19,7 +27,15 @@ from rest_framework.permissions import (
     IsAdminUser,
 )
 
-import requests, time
+def _run(language: str, code: str, stdin: str):
+    """One executor run shaped for the editor's Run button: (payload, status)."""
+    t0 = time.perf_counter()
+    data, status = get_client().execute(language, code, stdin)
+    elapsed = int((time.perf_counter() - t0) * 1000)
+    if status != 200:
+        return {"error": data["error"], "timeMs": elapsed}, status
+    return {"stdout": data.get("output", ""), "stderr": data.get("error", ""),
+            "timeMs": data.get("time_ms", elapsed), "memoryKb": data.get("memory_kb", 0)}, 200
 
 def _norm(s: str) -> str:
     if s is None:
@@ -32,6 +48,7 @@ class ProblemRunView(APIView):
     body: { code, language, stdin }
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [RunThrottle]
 
     def post(self, request, pk: int):
         code = request.data.get("code") or ""
@@ -41,131 +58,41 @@ class ProblemRunView(APIView):
         if language not in ("python", "cpp", "java"):
             return Response({"error": "Unsupported language"}, status=400)
 
-        url = getattr(settings, "EXECUTOR_URL", "http://127.0.0.1:8001/execute")
-        t0 = time.perf_counter()
-        try:
-            r = requests.post(url, json={
-                "code": code,
-                "language": language,
-                "input_data": stdin
-            }, timeout=10)
-        except requests.RequestException as e:
-            return Response({"error": f"Executor unreachable: {e}"}, status=502)
-
-        elapsed = int((time.perf_counter() - t0) * 1000)
-        if r.status_code != 200:
-            return Response({"error": f"Executor error: {r.text}"}, status=r.status_code)
-
-        data = r.json()
-        return Response({
-            "stdout": data.get("output", ""),
-            "stderr": data.get("error", ""),
-            "timeMs": elapsed
-        })
+        payload, status = _run(language, code, stdin)
+        return Response(payload, status=status)
+
+def _cached_problem(pk) -> Problem:
+    """The problem from problem_cache; 404 if there is none."""
+    try:
+        problem = problem_cache.problem(pk)
+    except ValueError:
+        problem = None
+    if problem is None:
+        raise Http404("No Problem matches the given query.")
+    return problem
 
 class ProblemSubmitView(APIView):
     """
     POST /api/problems/<pk>/submit/
     body: { code, language }
-    Runs all test_cases on the problem and returns verdict + per-case results.
+    Queues the submission for judging and returns its Pending status (202),
+    or the reused result of an identical earlier submission (201).
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [SubmitThrottle]
 
     def post(self, request, pk: int):
-        problem = get_object_or_404(Problem, pk=pk)
+        problem = _cached_problem(pk)
         code = request.data.get("code") or ""
         language = (request.data.get("language") or "").lower()
 
         if language not in ("python", "cpp", "java"):
             return Response({"error": "Unsupported language"}, status=400)
 
-        tests = problem.test_cases or []
-        results = []
-        passed = 0
-        total_time = 0
-        url = getattr(settings, "EXECUTOR_URL", "http://127.0.0.1:8001/execute")
-
-        for i, tc in enumerate(tests, start=1):
-            stdin = tc.get("input_data", "") or ""
-            exp = _norm(tc.get("expected_output", "") or "")
-            hidden = bool(tc.get("is_hidden", True))
-
-            t0 = time.perf_counter()
-            try:
-                r = requests.post(url, json={
-                    "code": code,
-                    "language": language,
-                    "input_data": stdin
-                }, timeout=10)
-            except requests.RequestException as e:
-                results.append({
-                    "test_case": i,
-                    "passed": False,
-                    "error": f"Executor unreachable: {e}",
-                    "runtime_ms": 0,
-                    "visibility": "hidden" if hidden else "public",
-                })
-                continue
-
-            elapsed = int((time.perf_counter() - t0) * 1000)
-            total_time += elapsed
-
-            if r.status_code != 200:
-                results.append({
-                    "test_case": i,
-                    "passed": False,
-                    "error": f"Executor error: {r.text}",
-                    "runtime_ms": elapsed,
-                    "visibility": "hidden" if hidden else "public",
-                })
-                continue
-
-            data = r.json()
-            out = _norm(data.get("output", "") or "")
-            err = _norm(data.get("error", "") or "")
-            ok = (out == exp) and (err == "")
-
-            if ok: passed += 1
-
-            item = {
-                "test_case": i,
-                "passed": ok,
-                "runtime_ms": elapsed,
-                "visibility": "hidden" if hidden else "public",
-            }
-            if not hidden:
-                item["expected"] = exp
-                item["actual"] = out
-                if err:
-                    item["error"] = err
-            else:
-                if err and not ok:
-                    item["error"] = err
-
-            results.append(item)
-
-        verdict = "Accepted" if passed == len(tests) else "Wrong Answer"
-        if any(("error" in r and not r["passed"]) for r in results):
-            verdict = "Runtime Error"
-
-        # Optional: save Submission if user is logged in
-        if request.user.is_authenticated:
-            Submission.objects.create(
-                problem=problem,
-                user=request.user,
-                code=code,
-                language=language,
-                verdict=verdict,
-                execution_time=total_time / 1000.0,
-            )
-
-        return Response({
-            "verdict": verdict,
-            "passed": passed,
-            "total": len(tests),
-            "total_runtime_ms": total_time,
-            "results": results
-        })
+        submission, judged = create_pending(problem, request.user, language, code)
+        if not judged:
+            enqueue(submission)
+        return Response(submission_status(submission), status=201 if judged else 202)
 
 
 def _normalize(s: str) -> str:
@@ -186,9 +113,70 @@ def _norm(s: str) -> str:
         return ""
     return s.replace("\r\n", "\n").rstrip()
 
+class ProblemPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class SubmissionPagination(CursorPagination):
+    # keyset on (submitted_at, id): a page costs the same however deep it is
+    ordering = ("-submitted_at", "-id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+# what a history row shows; the source and feedback are only on the detail
+SUBMISSION_LIST_FIELDS = ("id", "problem_id", "language", "verdict",
+                          "execution_time", "memory_used", "submitted_at")
+
+
 class ProblemViewSet(viewsets.ModelViewSet):
-    queryset = Problem.objects.all()
+    queryset = Problem.objects.all().order_by("id")
     serializer_class = ProblemSerializer
+    pagination_class = ProblemPagination
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action == "list":
+            # only what the summary rows need
+            qs = qs.only("id", "title", "difficulty", "tags")
+        return qs
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return ProblemSummarySerializer
+        return ProblemSerializer
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        problems = list(page if page is not None else queryset)
+        context = self.get_serializer_context()
+        context["stats"] = problem_stats.for_problems([p.pk for p in problems])
+        data = ProblemSummarySerializer(problems, many=True, context=context).data
+        return self.get_paginated_response(data) if page is not None else Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.user.is_staff:
+            return super().retrieve(request, *args, **kwargs)  # with test data, never cached
+        try:
+            data = problem_cache.detail(kwargs["pk"])
+        except ValueError:
+            data = None
+        if data is None:
+            raise Http404("No Problem matches the given query.")
+        return Response(data)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        problem_cache.invalidate(serializer.instance.pk)
+
+    def perform_destroy(self, instance):
+        pk = instance.pk
+        super().perform_destroy(instance)
+        problem_cache.invalidate(pk)
     # permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     # def get_permissions(self):
     #     # Public read; auth for everything else (submit/run/custom actions)
@@ -210,24 +198,10 @@ class ProblemViewSet(viewsets.ModelViewSet):
         return [p() for p in perms]
 
     def _exec(self, language: str, code: str, stdin: str):
-        url = getattr(settings, "EXECUTOR_URL", "http://127.0.0.1:8001/execute")
-        t0 = time.perf_counter()
-        try:
-            r = requests.post(url, json={
-                "code": code,
-                "language": language,
-                "input_data": stdin
-            }, timeout=10)
-        except requests.RequestException as e:
-            return {"error": f"Executor unreachable: {e}"}, 502
-        elapsed = int((time.perf_counter() - t0) * 1000)
-        if r.status_code != 200:
-            return {"error": f"Executor error: {r.text}", "timeMs": elapsed}, r.status_code
-        data = r.json()
-        return {"stdout": data.get("output", ""), "stderr": data.get("error", ""), "timeMs": elapsed}, 200
+        return _run(language, code, stdin)
 
     @action(detail=True, methods=["post"], url_path="run",
-            permission_classes=[permissions.AllowAny])
+            permission_classes=[permissions.AllowAny], throttle_classes=[RunThrottle])
     def run(self, request, pk=None):
         language = (request.data.get("language") or "").lower()
         code     = request.data.get("code") or ""
@@ -238,71 +212,19 @@ class ProblemViewSet(viewsets.ModelViewSet):
         return Response(payload, status=status)
 
     @action(detail=True, methods=["post"], url_path="submit",
-            permission_classes=[permissions.AllowAny])
+            permission_classes=[permissions.AllowAny], throttle_classes=[SubmitThrottle])
     def submit(self, request, pk=None):
         language = (request.data.get("language") or "").lower()
         code     = request.data.get("code") or ""
         if language not in ("python", "cpp", "java"):
             return Response({"error": "Unsupported language"}, status=400)
 
-        problem = self.get_object()
-        tests = problem.test_cases or []
-        results, passed, total_time = [], 0, 0
-
-        for i, tc in enumerate(tests, start=1):
-            stdin = tc.get("input_data", "") or ""
-            exp   = _norm(tc.get("expected_output", "") or "")
-            hidden = bool(tc.get("is_hidden", True))
-
-            payload, status = self._exec(language, code, stdin)
-            if status != 200:
-                results.append({
-                    "test_case": i, "passed": False,
-                    "error": payload.get("error", "Executor error"),
-                    "runtime_ms": payload.get("timeMs", 0),
-                    "visibility": "hidden" if hidden else "public",
-                })
-                continue
-
-            out = _norm(payload.get("stdout", "") or "")
-            err = _norm(payload.get("stderr", "") or "")
-            ok  = (out == exp) and (err == "")
-
-            total_time += int(payload.get("timeMs", 0))
-            if ok: passed += 1
-
-            item = {
-                "test_case": i, "passed": ok,
-                "runtime_ms": int(payload.get("timeMs", 0)),
-                "visibility": "hidden" if hidden else "public",
-            }
-            if not hidden:
-                item["expected"] = exp
-                item["actual"]   = out
-                if err: item["error"] = err
-            else:
-                if err and not ok: item["error"] = err
-
-            results.append(item)
-
-        verdict = "Accepted" if passed == len(tests) else "Wrong Answer"
-        if any(("error" in r and not r["passed"]) for r in results):
-            verdict = "Runtime Error"
-
-        if request.user.is_authenticated:
-            Submission.objects.create(
-                problem=problem, user=request.user,
-                code=code, language=language,
-                verdict=verdict, execution_time=total_time/1000.0
-            )
-
-        return Response({
-            "verdict": verdict,
-            "passed": passed,
-            "total": len(tests),
-            "total_runtime_ms": total_time,
-            "results": results
-        })
+        # judged by the judge_queue workers; poll GET /submissions/<id>/status/
+        problem = _cached_problem(pk)
+        submission, judged = create_pending(problem, request.user, language, code)
+        if not judged:
+            enqueue(submission)
+        return Response(submission_status(submission), status=201 if judged else 202)
 
 
 
@@ -310,16 +232,85 @@ class SubmissionViewSet(viewsets.ModelViewSet):
     queryset = Submission.objects.all()
     serializer_class = SubmissionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = SubmissionPagination
 
     def get_queryset(self):
-        if self.request.user.is_authenticated:
-            return Submission.objects.filter(user=self.request.user)
-        return Submission.objects.none()
+        if not self.request.user.is_authenticated:
+            return Submission.objects.none()
+        qs = Submission.objects.filter(user=self.request.user)
+        if self.action == "list":
+            qs = qs.only(*SUBMISSION_LIST_FIELDS)
+        return qs
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return SubmissionSummarySerializer
+        return SubmissionSerializer
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        submissions = list(page if page is not None else queryset)
+        context = self.get_serializer_context()
+        # one query for the titles of the whole page
+        context["titles"] = dict(Problem.objects.filter(
+            id__in={s.problem_id for s in submissions}).values_list("id", "title"))
+        data = SubmissionSummarySerializer(submissions, many=True, context=context).data
+        return self.get_paginated_response(data) if page is not None else Response(data)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=True, methods=["get"], url_path="status")
+    def judge_status(self, request, pk=None):
+        """Cheap polling endpoint: verdict, and the judge report once done."""
+        submission = get_object_or_404(
+            self.get_queryset().only("id", "verdict", "judge_report"), pk=pk
+        )
+        return Response(submission_status(submission))
+
 class ContestViewSet(viewsets.ModelViewSet):
     queryset = Contest.objects.all()
     serializer_class = ContestSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    @action(detail=True, methods=["post"])
+    def join(self, request, pk=None):
+        """Register the current user; their submissions count from then on."""
+        contest = self.get_object()
+        if timezone.now() >= contest.end_time:
+            return Response({"detail": "Contest is over"}, status=400)
+        _, created = ContestParticipant.objects.get_or_create(contest=contest, user=request.user)
+        if created:
+            scoreboard.standings(contest).join(request.user.pk)
+        return Response({"joined": True}, status=201 if created else 200)
+
+    @action(detail=True, methods=["get"])
+    def standings(self, request, pk=None):
+        """
+        One page of the standings (api/scoreboard.py); frozen for non-staff
+        near the end if the contest has a freeze period.
+        Query: limit (default 50, max 200) and offset.
+        """
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 50)), 200))
+            offset = max(0, int(request.query_params.get("offset", 0)))
+        except ValueError:
+            return Response({"detail": "invalid limit or offset"}, status=400)
+
+        board = scoreboard.standings(self.get_object())
+        view = board.view_for(request.user)
+        total, rows = board.page(view, offset=offset, limit=limit)
+        names = dict(get_user_model().objects.filter(id__in=[r[1] for r in rows])
+                     .values_list("id", "username"))
+        return Response({
+            "count": total,
+            "scoring": board.contest.scoring,
+            "frozen": view == "public",
+            "problems": board.problem_ids,
+            "results": [
+                {"rank": rank, "user_id": uid, "username": names.get(uid, ""),
+                 "score": score, "penalty": penalty, "problems": cells}
+                for rank, uid, score, penalty, cells in rows
+            ],
+        })
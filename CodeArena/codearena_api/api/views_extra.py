@@ -4,21 +4,21 @@ from typing import List, Dict, Any, Tuple
 import time, requests
 
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Q, Max
 from django.shortcuts import get_object_or_404
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
 
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from . import leaderboard as ranking, user_stats
 from .models import Problem, Submission, Profile
+from .judge_queue import judge_queue
+from .throttling import throttle_stats
 
 User = get_user_model()
 
-AC_VALUES = {"AC", "Accepted", "OK", "CORRECT", "correct"}
-
 # ---------- Auth: Register ----------
 @api_view(["POST"])
 @permission_classes([AllowAny])
@@ -48,28 +48,20 @@ def register(request):
 @permission_classes([IsAuthenticated])
 def me_summary(request):
     """
-    Returns stats for the logged-in user:
-    - total_submissions
+    Returns stats for the logged-in user, from the counters kept on their
+    profile (api/user_stats.py):
+    - total_submissions, accepted_submissions
     - solved_count (distinct problems with AC verdict)
     - difficulty_breakdown (easy/medium/hard solved)
+    - language_breakdown (submissions per language)
     - recent_submissions (last 10)
     """
     u = request.user
+    profile = user_stats.for_user(u)
 
-    subs = Submission.objects.filter(user=u).select_related("problem").order_by("-submitted_at")
-    total_submissions = subs.count()
-    solved_q = subs.filter(verdict__in=AC_VALUES)
-    solved_count = solved_q.values("problem").distinct().count()
-
-    # difficulty breakdown (if your Problem has difficulty field)
-    diff = (
-        solved_q.values("problem__difficulty")
-        .annotate(cnt=Count("problem", distinct=True))
-    )
-    difficulty_breakdown = {
-        (row["problem__difficulty"] or "Unknown"): row["cnt"] for row in diff
-    }
-
+    subs = (Submission.objects.filter(user=u).select_related("problem")
+            .only("problem", "problem__title", "language", "verdict", "execution_time", "submitted_at")
+            .order_by("-submitted_at"))
     recent = [
         {
             "id": s.id,
@@ -85,9 +77,11 @@ def me_summary(request):
 
     return Response({
         "user": {"id": u.id, "username": u.username, "email": u.email},
-        "total_submissions": total_submissions,
-        "solved_count": solved_count,
-        "difficulty_breakdown": difficulty_breakdown,
+        "total_submissions": profile.total_submissions,
+        "accepted_submissions": profile.accepted_submissions,
+        "solved_count": profile.solved_count,
+        "difficulty_breakdown": profile.solved_by_difficulty or {},
+        "language_breakdown": profile.submissions_by_language or {},
         "recent_submissions": recent,
     })
 
@@ -97,29 +91,52 @@ def me_summary(request):
 @permission_classes([AllowAny])
 def leaderboard(request):
     """
-    Top N users by number of distinct problems solved (AC verdict).
+    Users by number of distinct problems solved, from the maintained
+    leaderboard (api/leaderboard.py), one page at a time.
+    Query: limit (default 50, max 200) and either offset or cursor (the
+    `next_cursor` of the previous page, stable while ranks change).
     """
-    N = int(request.query_params.get("limit", 50))
-    qs = (
-        Submission.objects.filter(verdict__in=AC_VALUES)
-        .values("user__id", "user__username")
-        .annotate(
-            solved=Count("problem", distinct=True),
-            last_time=Max("submitted_at"),
-        )
-        .order_by("-solved", "-last_time")[:N]
-    )
-
+    try:
+        limit = max(1, min(int(request.query_params.get("limit", 50)), 200))
+        offset = max(0, int(request.query_params.get("offset", 0)))
+        cursor = request.query_params.get("cursor")
+        after = ranking.parse_cursor(cursor) if cursor else None
+    except ValueError:
+        return Response({"detail": "invalid limit, offset or cursor"}, status=400)
+
+    total, rows = ranking.board.page(offset=offset, limit=limit, after=after)
+    names = dict(User.objects.filter(id__in=[key[2] for _, key, _, _ in rows])
+                 .values_list("id", "username"))
     data = [
         {
-            "user_id": row["user__id"],
-            "username": row["user__username"],
-            "solved": row["solved"],
-            "last_submission": row["last_time"],
+            "rank": rank,
+            "user_id": key[2],
+            "username": names.get(key[2], ""),
+            "solved": solved,
+            "last_submission": last,
         }
-        for row in qs
+        for rank, key, solved, last in rows
     ]
-    return Response({"results": data})
+    more = rows and rows[-1][0] < total
+    return Response({
+        "count": total,
+        "next_cursor": ranking.cursor_for(rows[-1][1]) if more else None,
+        "results": data,
+    })
+
+
+# ---------- Load / abuse counters (admins) ----------
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def judge_load(request):
+    """
+    Throttle counters per scope (allowed / throttled, recent offenders) and
+    this process's judge queue.
+    """
+    return Response({
+        "throttles": throttle_stats(),
+        "judge_queue": judge_queue.stats(),
+    })
 
 
 # ---------- Codeforces contests (simple proxy with tiny cache) ----------
@@ -179,6 +179,95 @@ APPEND_SLASH = True   # default in Django, but being explicit avoids drift
 # Executor service (API -> local dockerized executor)
 # -----------------------------------------------------------------------------
 EXECUTOR_URL = os.getenv("EXECUTOR_URL", "http://127.0.0.1:8001/execute")
+# Compile-once, run-all-tests endpoint used by submit
+EXECUTOR_BATCH_URL = os.getenv("EXECUTOR_BATCH_URL", EXECUTOR_URL + "/batch")
+# Runs custom (special judge) checkers
+EXECUTOR_CHECK_URL = os.getenv("EXECUTOR_CHECK_URL", EXECUTOR_URL.rsplit("/", 1)[0] + "/check")
+
+# Shared executor client (api/executor_client.py): keep-alive connections,
+# retries for connection errors / 502-504, and a circuit breaker that fails
+# fast for EXECUTOR_BREAKER_COOLDOWN s after that many consecutive failures.
+EXECUTOR_POOL_SIZE = int(os.getenv("EXECUTOR_POOL_SIZE", "20"))
+EXECUTOR_RETRIES = int(os.getenv("EXECUTOR_RETRIES", "2"))
+EXECUTOR_RETRY_BACKOFF = float(os.getenv("EXECUTOR_RETRY_BACKOFF", "0.2"))
+EXECUTOR_BREAKER_THRESHOLD = int(os.getenv("EXECUTOR_BREAKER_THRESHOLD", "5"))
+EXECUTOR_BREAKER_COOLDOWN = float(os.getenv("EXECUTOR_BREAKER_COOLDOWN", "15"))
+
+# Several executors: comma-separated base URLs (e.g. http://exec1:8001,http://exec2:8001).
+# Empty means the single executor at EXECUTOR_URL. Calls go to the least-loaded
+# healthy node (by /status queue depth, polled every EXECUTOR_HEALTH_INTERVAL s);
+# a submission sticks to one node unless it is EXECUTOR_STICKY_SLACK queued jobs
+# per worker busier than the least-loaded one.
+EXECUTOR_NODES = [u for u in os.getenv("EXECUTOR_NODES", "").split(",") if u.strip()]
+EXECUTOR_HEALTH_INTERVAL = float(os.getenv("EXECUTOR_HEALTH_INTERVAL", "5"))
+EXECUTOR_STICKY_SLACK = float(os.getenv("EXECUTOR_STICKY_SLACK", "2"))
+
+# Judging fan-out: tests per batch call, concurrent batch calls per submission,
+# stop after the first failing test, and wall-clock budget per submission (s).
+JUDGE_BATCH_SIZE = int(os.getenv("JUDGE_BATCH_SIZE", "5"))
+JUDGE_MAX_PARALLEL_BATCHES = int(os.getenv("JUDGE_MAX_PARALLEL_BATCHES", "4"))
+JUDGE_STOP_ON_FIRST_FAILURE = os.getenv("JUDGE_STOP_ON_FIRST_FAILURE", "1") == "1"
+JUDGE_TIME_BUDGET = float(os.getenv("JUDGE_TIME_BUDGET", "120"))
+
+# Content-addressed test data (inputs/expected outputs), see api/testdata.py
+TESTDATA_DIR = os.getenv("TESTDATA_DIR", str(BASE_DIR / "testdata"))
+
+# Cache shared by every process: throttle buckets, and the version counters
+# that tell processes to reload the leaderboard, contest standings and
+# problems. The default, files on local disk, is shared by the processes of
+# one host; across hosts point CACHE_BACKEND/CACHE_LOCATION at memcached
+# (django.core.cache.backends.memcached.MemcachedCache, host:port).
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / "cache")),
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "20000"))},
+    }
+}
+
+# Asynchronous judging: worker threads per web process (0 = leave it to
+# `manage.py judge_worker`), idle re-scan interval for Pending submissions (s),
+# and how long a claimed submission may stay Pending before it is retried (s).
+JUDGE_WORKERS = int(os.getenv("JUDGE_WORKERS", "2"))
+JUDGE_POLL_INTERVAL = float(os.getenv("JUDGE_POLL_INTERVAL", "5"))
+JUDGE_CLAIM_TIMEOUT = float(os.getenv("JUDGE_CLAIM_TIMEOUT", "600"))
+# Submissions whose judging failed (exception, executor unavailable) are
+# retried after JUDGE_RETRY_DELAY seconds, doubling each time, and get an
+# internal-error verdict after JUDGE_MAX_ATTEMPTS attempts.
+JUDGE_RETRY_DELAY = float(os.getenv("JUDGE_RETRY_DELAY", "30"))
+JUDGE_MAX_ATTEMPTS = int(os.getenv("JUDGE_MAX_ATTEMPTS", "3"))
+# Reuse the verdict of an identical earlier submission (same code, language
+# and problem version) instead of judging it again.
+JUDGE_MEMOIZE = os.getenv("JUDGE_MEMOIZE", "1") == "1"
+
+# Seconds a process serves its in-memory leaderboard before checking whether
+# another process changed it (see api/leaderboard.py).
+LEADERBOARD_REFRESH = float(os.getenv("LEADERBOARD_REFRESH", "5"))
+
+# Contest standings (api/scoreboard.py): seconds between writes of changed
+# participants to ContestParticipant, and between checks for other processes'.
+SCOREBOARD_PERSIST = float(os.getenv("SCOREBOARD_PERSIST", "10"))
+SCOREBOARD_REFRESH = float(os.getenv("SCOREBOARD_REFRESH", "5"))
+
+# Problem cache (api/problem_cache.py): entries kept per process, seconds an
+# entry lives in the shared cache, and seconds a process serves its own copy
+# before checking whether the problem was edited elsewhere.
+PROBLEM_CACHE_SIZE = int(os.getenv("PROBLEM_CACHE_SIZE", "256"))
+PROBLEM_CACHE_TIMEOUT = int(os.getenv("PROBLEM_CACHE_TIMEOUT", "3600"))
+PROBLEM_CACHE_REFRESH = float(os.getenv("PROBLEM_CACHE_REFRESH", "5"))
+
+# Token buckets for run/submit, per user: (burst, tokens per minute).
+# Buckets live in the default (shared) cache, see CACHES.
+THROTTLE_BUCKETS = {
+    "run": (int(os.getenv("THROTTLE_RUN_BURST", "10")), float(os.getenv("THROTTLE_RUN_PER_MINUTE", "30"))),
+    "submit": (int(os.getenv("THROTTLE_SUBMIT_BURST", "5")), float(os.getenv("THROTTLE_SUBMIT_PER_MINUTE", "12"))),
+}
+# Per IP address, larger: a contest hall behind one NAT shares its bucket.
+THROTTLE_IP_BUCKETS = {
+    "run": (int(os.getenv("THROTTLE_IP_RUN_BURST", "60")), float(os.getenv("THROTTLE_IP_RUN_PER_MINUTE", "180"))),
+    "submit": (int(os.getenv("THROTTLE_IP_SUBMIT_BURST", "30")),
+               float(os.getenv("THROTTLE_IP_SUBMIT_PER_MINUTE", "72"))),
+}
 
 # -----------------------------------------------------------------------------
 # Misc env-backed keys
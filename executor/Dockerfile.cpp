@@ -1,4 +1,6 @@
 FROM gcc:13
+COPY runner.c /src/runner.c
+RUN gcc -O2 -static -o /usr/local/bin/runner /src/runner.c
 RUN useradd -m coder
 WORKDIR /app
 USER coder
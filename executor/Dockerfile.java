@@ -1,4 +1,27 @@
+FROM gcc:13 AS runner
+COPY runner.c /src/runner.c
+RUN gcc -O2 -static -o /runner /src/runner.c
+
 FROM eclipse-temurin:17-jdk-jammy
+COPY --from=runner /runner /usr/local/bin/runner
+
+# Persistent test runner (JudgeRunner.java) plus a class-data-sharing archive
+# of the JDK and runner classes a typical test loads, recorded by running the
+# runner over JudgeWarmup. The runtime flags must match the ones used here
+# (same -cp, same GC), or the JVM silently ignores the archive.
+COPY JudgeRunner.java JudgeWarmup.java /opt/judge/src/
+RUN cd /opt/judge \
+ && javac -d /opt/judge src/JudgeRunner.java \
+ && mkdir -p /tmp/warm/build \
+ && javac -d /tmp/warm/build src/JudgeWarmup.java \
+ && cd /tmp/warm \
+ && printf '5\n3 1 4 1 5\n' > input_0.txt && cp input_0.txt input_1.txt \
+ && java -Xshare:off -XX:+UseSerialGC -XX:DumpLoadedClassList=/opt/judge/classes.lst \
+         -Djava.security.manager=allow -cp /opt/judge \
+         JudgeRunner /tmp/warm/build 0 2 10000 20000 1048576 65536 0 \
+ && java -Xshare:dump -XX:+UseSerialGC -XX:SharedClassListFile=/opt/judge/classes.lst \
+         -XX:SharedArchiveFile=/opt/judge/app.jsa -cp /opt/judge \
+ && cd / && rm -rf /tmp/warm
 RUN useradd -m coder
 WORKDIR /app
 USER coder
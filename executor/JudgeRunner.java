@@ -0,0 +1,239 @@
+// executor/JudgeRunner.java
+//
+// Persistent JVM for Java submissions: runs several tests in one JVM, loading
+// the user's Main in a fresh class loader each time (so static state starts
+// clean) with stdin/stdout/stderr redirected to per-test files.
+//
+//   java -cp /opt/judge JudgeRunner <classdir> <from> <count> <cpu_ms> <wall_ms>
+//        <out_limit> <err_limit> <stop_on_failure 0|1>
+//
+// Test i reads input_<i>.txt from the working directory and writes
+// out/<i>.out and out/<i>.err. After each test one line is written to the
+// JVM's own stdout:
+//
+//   <i> <status> <exit_code> <cpu_ms> <memory_kb> <wall_ms>
+//
+// status is ok / runtime_error / time_limit / memory_limit / output_limit,
+// as in the executor. cpu_ms is CPU time of the test's threads, memory_kb the
+// peak heap use. A watchdog enforces the CPU, wall and output limits; when a
+// limit is hit, or the test leaves the JVM in a doubtful state (OutOfMemory,
+// threads still running), the result is recorded and the JVM halts, and the
+// executor starts a new one at the next test.
+
+import java.io.*;
+import java.lang.management.*;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.file.*;
+import java.security.Permission;
+import java.util.List;
+
+public class JudgeRunner {
+
+    /** Thrown in place of exiting when a test calls System.exit. */
+    static final class ExitTrap extends SecurityException {
+        final int status;
+        ExitTrap(int status) { super("System.exit(" + status + ")"); this.status = status; }
+    }
+
+    /** Output stream that drops everything past `limit` bytes and remembers it did. */
+    static final class CappedStream extends OutputStream {
+        private final OutputStream out;
+        private final long limit;
+        private long written;
+        volatile boolean exceeded;
+
+        CappedStream(OutputStream out, long limit) { this.out = out; this.limit = limit; }
+
+        @Override public void write(int b) throws IOException {
+            if (written >= limit) { exceeded = true; return; }
+            written++;
+            out.write(b);
+        }
+
+        @Override public void write(byte[] b, int off, int len) throws IOException {
+            long room = limit - written;
+            if (len > room) {
+                exceeded = true;
+                len = (int) Math.max(0, room);
+            }
+            written += len;
+            out.write(b, off, len);
+        }
+
+        @Override public void flush() throws IOException { out.flush(); }
+        @Override public void close() throws IOException { out.close(); }
+    }
+
+    static volatile ThreadGroup testGroup;
+    static final ThreadMXBean THREADS = ManagementFactory.getThreadMXBean();
+    static final List<MemoryPoolMXBean> POOLS = ManagementFactory.getMemoryPoolMXBeans();
+
+    static PrintStream results;
+
+    public static void main(String[] args) throws Exception {
+        Path classDir = Paths.get(args[0]);
+        int from = Integer.parseInt(args[1]);
+        int count = Integer.parseInt(args[2]);
+        long cpuLimitNs = Long.parseLong(args[3]) * 1_000_000L;
+        long wallLimitNs = Long.parseLong(args[4]) * 1_000_000L;
+        long outLimit = Long.parseLong(args[5]);
+        long errLimit = Long.parseLong(args[6]);
+        boolean stopOnFailure = "1".equals(args[7]);
+
+        Files.createDirectories(Paths.get("out"));
+        results = new PrintStream(new FileOutputStream(FileDescriptor.out), false, "US-ASCII");
+        if (THREADS.isThreadCpuTimeSupported()) THREADS.setThreadCpuTimeEnabled(true);
+
+        System.setSecurityManager(new SecurityManager() {
+            @Override public void checkExit(int status) {
+                ThreadGroup g = testGroup;
+                if (g != null && g.parentOf(Thread.currentThread().getThreadGroup())) {
+                    throw new ExitTrap(status);
+                }
+            }
+            @Override public void checkPermission(Permission perm) { }
+            @Override public void checkPermission(Permission perm, Object context) { }
+        });
+
+        URL[] classPath = { classDir.toUri().toURL() };
+        for (int i = from; i < count; i++) {
+            String status = runTest(i, classPath, cpuLimitNs, wallLimitNs, outLimit, errLimit);
+            if (status == null) {
+                halt();  // JVM no longer trustworthy; the executor restarts at i + 1
+            }
+            if (stopOnFailure && !"ok".equals(status)) break;
+        }
+        halt();
+    }
+
+    static void halt() {
+        results.close();
+        Runtime.getRuntime().halt(0);
+    }
+
+    /** Runs test i; returns its status, or null if the JVM must be restarted afterwards. */
+    static String runTest(int i, URL[] classPath, long cpuLimitNs, long wallLimitNs,
+                          long outLimit, long errLimit) throws Exception {
+        CappedStream out = new CappedStream(new FileOutputStream("out/" + i + ".out"), outLimit);
+        CappedStream err = new CappedStream(new FileOutputStream("out/" + i + ".err"), errLimit);
+        PrintStream stdout = new PrintStream(new BufferedOutputStream(out, 1 << 16), false, "UTF-8");
+        PrintStream stderr = new PrintStream(new BufferedOutputStream(err, 1 << 12), true, "UTF-8");
+        InputStream stdin = new BufferedInputStream(new FileInputStream("input_" + i + ".txt"), 1 << 16);
+
+        System.gc();  // so the heap peak below is this test's
+        for (MemoryPoolMXBean p : POOLS) {
+            if (p.getType() == MemoryType.HEAP) p.resetPeakUsage();
+        }
+
+        final int[] exit = { 0 };
+        final long[] ownCpu = { 0 };
+        final Throwable[] fatal = { null };
+        ThreadGroup group = new ThreadGroup("test-" + i);
+        URLClassLoader loader = new URLClassLoader(classPath, ClassLoader.getPlatformClassLoader());
+        Thread test = new Thread(group, () -> {
+            try {
+                Class<?> main = Class.forName("Main", true, loader);
+                Method m = main.getMethod("main", String[].class);
+                m.setAccessible(true);  // `class Main` need not be public
+                m.invoke(null, (Object) new String[0]);
+            } catch (InvocationTargetException e) {
+                Throwable cause = e.getCause();
+                if (cause instanceof ExitTrap) {
+                    exit[0] = ((ExitTrap) cause).status;
+                } else {
+                    fatal[0] = cause;
+                    exit[0] = 1;
+                }
+            } catch (Throwable e) {
+                // ExceptionInInitializerError when a static initializer throws or exits
+                if (e.getCause() instanceof ExitTrap) {
+                    exit[0] = ((ExitTrap) e.getCause()).status;
+                } else {
+                    fatal[0] = e;
+                    exit[0] = 1;
+                }
+            } finally {
+                ownCpu[0] = THREADS.getCurrentThreadCpuTime();
+            }
+        }, "main", 64L << 20);
+
+        System.setIn(stdin);
+        System.setOut(stdout);
+        System.setErr(stderr);
+        testGroup = group;
+        long t0 = System.nanoTime();
+        test.start();
+
+        String limit = null;
+        long cpuNs = 0;
+        while (test.isAlive()) {
+            test.join(5);
+            cpuNs = Math.max(cpuNs, cpuOf(group, test));
+            long wall = System.nanoTime() - t0;
+            if (cpuNs > cpuLimitNs || wall > wallLimitNs) limit = "time_limit";
+            else if (out.exceeded) limit = "output_limit";
+            if (limit != null) break;
+        }
+        long wallNs = System.nanoTime() - t0;
+        cpuNs = Math.max(cpuNs, ownCpu[0]);
+        testGroup = null;
+
+        if (limit == null) {  // otherwise the test may still be writing; the JVM halts anyway
+            stdout.flush();
+            if (fatal[0] != null) {
+                stderr.print("Exception in thread \"main\" ");
+                fatal[0].printStackTrace(stderr);
+            }
+            stderr.flush();
+        }
+
+        String status;
+        boolean restart = limit != null;
+        if (limit != null) {
+            status = limit;
+        } else if (fatal[0] instanceof OutOfMemoryError) {
+            status = "memory_limit";
+            restart = true;
+        } else if (out.exceeded) {
+            status = "output_limit";
+        } else if (exit[0] != 0) {
+            status = "runtime_error";
+        } else {
+            status = "ok";
+        }
+        if (group.activeCount() > 0) restart = true;  // threads left running
+
+        long heapKb = 0;
+        for (MemoryPoolMXBean p : POOLS) {
+            if (p.getType() == MemoryType.HEAP && p.getPeakUsage() != null) {
+                heapKb += p.getPeakUsage().getUsed() / 1024;
+            }
+        }
+        int code = "time_limit".equals(status) ? 124 : exit[0];
+        results.print(i + " " + status + " " + code + " " + cpuNs / 1_000_000 + " "
+                + heapKb + " " + wallNs / 1_000_000 + "\n");
+        results.flush();
+
+        if (!restart) {
+            stdin.close();
+            stdout.close();
+            stderr.close();
+            loader.close();
+        }
+        return restart ? null : status;
+    }
+
+    /** CPU time of the test thread and any threads it started that are still alive. */
+    static long cpuOf(ThreadGroup group, Thread test) {
+        long total = Math.max(0, THREADS.getThreadCpuTime(test.getId()));
+        Thread[] threads = new Thread[group.activeCount() + 8];
+        int n = group.enumerate(threads, true);
+        for (int k = 0; k < n; k++) {
+            if (threads[k] != test) total += Math.max(0, THREADS.getThreadCpuTime(threads[k].getId()));
+        }
+        return total;
+    }
+}
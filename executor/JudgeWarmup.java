@@ -0,0 +1,54 @@
+// executor/JudgeWarmup.java
+//
+// Stand-in submission run through JudgeRunner while building the Java image,
+// so the class list for the CDS archive (see Dockerfile.java) covers what
+// typical solutions load: the usual input readers, collections, sorting,
+// string formatting and streams.
+
+import java.io.*;
+import java.util.*;
+import java.util.stream.*;
+
+class Main {
+    public static void main(String[] args) throws IOException {
+        BufferedReader br = new BufferedReader(new InputStreamReader(System.in));
+        StringTokenizer st = new StringTokenizer(br.readLine());
+        int n = Integer.parseInt(st.nextToken());
+        Scanner sc = new Scanner(br.readLine());
+        long[] a = new long[n];
+        for (int i = 0; i < n; i++) a[i] = sc.nextLong();
+
+        Arrays.sort(a);
+        List<Long> list = new ArrayList<>();
+        for (long x : a) list.add(x);
+        Collections.sort(list, Comparator.reverseOrder());
+        Map<Long, Integer> count = new HashMap<>();
+        TreeMap<Long, Integer> sorted = new TreeMap<>();
+        for (long x : a) {
+            count.merge(x, 1, Integer::sum);
+            sorted.put(x, sorted.getOrDefault(x, 0) + 1);
+        }
+        PriorityQueue<long[]> pq = new PriorityQueue<>((p, q) -> Long.compare(p[0], q[0]));
+        ArrayDeque<Integer> dq = new ArrayDeque<>();
+        for (int i = 0; i < n; i++) {
+            pq.add(new long[] { a[i], i });
+            dq.addLast(i);
+        }
+        Set<Long> seen = new HashSet<>(list);
+        BitSet bits = new BitSet(n);
+        bits.set(0, n);
+
+        String joined = list.stream().map(String::valueOf).collect(Collectors.joining(" "));
+        long sum = IntStream.range(0, n).mapToLong(i -> a[i]).sum();
+        StringBuilder sb = new StringBuilder();
+        sb.append(joined).append('\n');
+        sb.append(String.format("%d %.6f %s%n", sum, Math.sqrt(sum), seen.size() + sorted.size()));
+        sb.append(new java.math.BigInteger(String.valueOf(sum)).pow(3)).append('\n');
+
+        PrintWriter out = new PrintWriter(new BufferedWriter(new OutputStreamWriter(System.out)));
+        out.print(sb);
+        out.println(pq.peek()[0] + " " + dq.peekFirst() + " " + count.size() + " " + bits.cardinality());
+        out.flush();
+        System.out.println("done");
+    }
+}
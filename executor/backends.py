@@ -0,0 +1,128 @@
+# executor/backends.py
+"""
+Sandbox backends: where the compile and run steps of a job execute.
+
+A backend hands out a `Sandbox` per job. Inside it the job's files live under
+/tmp (job/ and build/), so the commands built in main.py are the same for
+every backend. `DockerBackend` runs jobs in pooled containers; the process
+backend in process_sandbox.py runs them directly on the executor host.
+"""
+import socket, time
+from collections import namedtuple
+from typing import Iterator, List
+
+ExecResult = namedtuple("ExecResult", "exit_code stdout stderr")
+
+
+class Sandbox:
+    def put(self, archive: bytes) -> None:
+        """Extract the tar `archive` under /tmp of the sandbox."""
+        raise NotImplementedError
+
+    def get(self, path: str) -> bytes:
+        """Tar of `path` (relative to /tmp) read back from the sandbox."""
+        raise NotImplementedError
+
+    def stream(self, paths: List[str]) -> Iterator[bytes]:
+        """
+        Tar of the files `paths` (relative to /tmp), in that order and without
+        the missing ones, as chunks of bytes read from the sandbox on demand.
+        """
+        raise NotImplementedError
+
+    def exec(self, argv: List[str], workdir: str) -> ExecResult:
+        """Run `argv` as the sandbox user; stdout/stderr are returned as bytes."""
+        raise NotImplementedError
+
+    def set_memory(self, mb: int) -> None:
+        """Cap the sandbox's memory (no swap) for the next steps, if supported."""
+
+
+class Backend:
+    def acquire(self) -> Sandbox:
+        raise NotImplementedError
+
+    def release(self, sandbox: Sandbox) -> None:
+        raise NotImplementedError
+
+    def prewarm(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+# ---------- Docker ----------
+
+class DockerSandbox(Sandbox):
+    def __init__(self, client, container):
+        self.client = client
+        self.container = container
+
+    def put(self, archive: bytes) -> None:
+        # put_archive cannot write into the tmpfs /tmp, so pipe it into `tar -x`
+        api = self.client.api
+        exec_id = api.exec_create(self.container.id, ["tar", "-x", "-C", "/tmp"], stdin=True)["Id"]
+        sock = api.exec_start(exec_id, socket=True)
+        raw = getattr(sock, "_sock", sock)
+        try:
+            raw.sendall(archive)
+            raw.shutdown(socket.SHUT_WR)
+            while raw.recv(65536):
+                pass
+        finally:
+            raw.close()
+        for _ in range(50):
+            info = api.exec_inspect(exec_id)
+            if not info.get("Running"):
+                break
+            time.sleep(0.01)
+        if info.get("ExitCode") != 0:
+            raise RuntimeError("could not copy job files into the sandbox")
+
+    def get(self, path: str) -> bytes:
+        res = self.container.exec_run(["tar", "-c", "-C", "/tmp", path], demux=True)
+        if res.exit_code != 0:
+            raise RuntimeError(f"could not read {path} from the sandbox")
+        return res.output[0] or b""
+
+    def stream(self, paths: List[str]) -> Iterator[bytes]:
+        res = self.container.exec_run(["tar", "-c", "--ignore-failed-read", "-C", "/tmp", *paths],
+                                      stderr=False, stream=True)
+        return res.output
+
+    def exec(self, argv: List[str], workdir: str) -> ExecResult:
+        res = self.container.exec_run(argv, workdir=workdir, demux=True)
+        out, err = res.output
+        return ExecResult(res.exit_code, out or b"", err or b"")
+
+    def set_memory(self, mb: int) -> None:
+        try:
+            self.container.update(mem_limit=f"{mb}m", memswap_limit=f"{mb}m")
+        except Exception:
+            pass  # keep the current cap
+
+
+class DockerBackend(Backend):
+    """Jobs run in containers taken from a warm ContainerPool."""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def acquire(self) -> DockerSandbox:
+        return DockerSandbox(self.pool.client, self.pool.acquire())
+
+    def release(self, sandbox: DockerSandbox) -> None:
+        self.pool.release(sandbox.container)
+
+    def prewarm(self) -> None:
+        self.pool.prewarm()
+
+    def shutdown(self) -> None:
+        self.pool.shutdown()
+
+    def stats(self) -> dict:
+        return {"backend": "docker", **self.pool.stats()}
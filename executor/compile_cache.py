@@ -0,0 +1,140 @@
+# executor/compile_cache.py
+"""
+Content-addressed cache of compiled artifacts (C++ binary, Java .class files).
+
+Entries live under <root>/<sha256>/ and are keyed by language, compiler
+flags and source. The cache keeps an index of entry sizes in least recently
+used order, so a store evicts without walking the whole cache; the directory
+mtime is bumped on every hit too, so the order survives a restart (the index
+is rebuilt from disk then). An entry being copied into a job is pinned (see
+pinned) and never evicted under it.
+"""
+import contextlib, hashlib, io, os, shutil, tarfile, threading, uuid
+from collections import Counter, OrderedDict
+
+
+def _size(path: str) -> int:
+    size = 0
+    for dirpath, _, files in os.walk(path):
+        for f in files:
+            try: size += os.path.getsize(os.path.join(dirpath, f))
+            except OSError: pass
+    return size
+
+
+class CompileCache:
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # key -> size, least recently used first
+        self._total = 0
+        self._pins = Counter()
+        self.enabled = max_bytes > 0
+        if self.enabled:
+            try:
+                os.makedirs(os.path.join(root, ".staging"), exist_ok=True)
+            except OSError:
+                self.enabled = False
+        if self.enabled:
+            self._load()
+
+    def _load(self) -> None:
+        entries = []
+        for name in os.listdir(self.root):
+            if name.startswith("."):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                entries.append((os.path.getmtime(path), name, _size(path)))
+            except OSError:
+                continue
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total += size
+
+    def _add(self, key: str) -> None:
+        """Put `key` at the recently used end of the index (lock held)."""
+        if key in self._index:
+            self._index.move_to_end(key)
+        else:
+            size = _size(os.path.join(self.root, key))
+            self._index[key] = size
+            self._total += size
+
+    @staticmethod
+    def key(lang: str, flags: str, code: str) -> str:
+        h = hashlib.sha256()
+        for part in (lang, flags, code):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def lookup(self, key: str):
+        """Path of a cached entry (and mark it as recently used), or None."""
+        if not self.enabled or key is None:
+            return None
+        path = os.path.join(self.root, key)
+        with self._lock:
+            try:
+                os.utime(path)
+            except OSError:
+                return None
+            self._add(key)
+        return path
+
+    @contextlib.contextmanager
+    def pinned(self, key: str):
+        """lookup(key), with the entry kept from eviction until the block exits."""
+        path = None
+        if self.enabled and key is not None:
+            with self._lock:
+                self._pins[key] += 1
+            path = self.lookup(key)
+        try:
+            yield path
+        finally:
+            if self.enabled and key is not None:
+                with self._lock:
+                    self._pins[key] -= 1
+                    if not self._pins[key]:
+                        del self._pins[key]
+
+    def store_archive(self, key: str, chunks, top: str) -> None:
+        """
+        Store a tar of the build directory read back from the sandbox (as
+        chunks of bytes). `top` is the directory at the root of the archive.
+        """
+        if not self.enabled:
+            return
+        staging = os.path.join(self.root, ".staging", uuid.uuid4().hex)
+        try:
+            with tarfile.open(fileobj=io.BytesIO(b"".join(chunks))) as tar:
+                tar.extractall(staging)
+            src = os.path.join(staging, top)
+            for dirpath, _, files in os.walk(src):
+                os.chmod(dirpath, 0o755)
+                for name in files:
+                    os.chmod(os.path.join(dirpath, name), 0o755)
+            dest = os.path.join(self.root, key)
+            with self._lock:
+                try:
+                    os.rename(src, dest)
+                except OSError:
+                    pass  # someone else stored the same key first
+                if os.path.isdir(dest):
+                    self._add(key)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop least recently used, unpinned entries until the cache fits under max_bytes."""
+        with self._lock:
+            for key in list(self._index):
+                if self._total <= self.max_bytes:
+                    break
+                if self._pins[key]:
+                    continue
+                shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+                self._total -= self._index.pop(key)
@@ -0,0 +1,63 @@
+# executor/dispatch.py
+"""
+Bounded worker pool that keeps blocking Docker SDK calls off the event loop.
+
+Jobs are handed to a fixed number of worker threads in arrival order (the
+executor's work queue is FIFO), and the queue depth and time spent waiting
+for a free worker are tracked for /status.
+"""
+import asyncio, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobQueue:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sandbox")
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self._wait_total = 0.0
+        self._last_wait = 0.0
+
+    async def run(self, fn, *args):
+        """
+        Run `fn(*args)` on a worker thread once one is free.
+        Returns (result, seconds spent waiting in the queue).
+        """
+        enqueued = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+
+        def job():
+            waited = time.perf_counter() - enqueued
+            with self._lock:
+                self.waiting -= 1
+                self.running += 1
+                self._wait_total += waited
+                self._last_wait = waited
+            try:
+                return fn(*args), waited
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, job)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self.completed + self.running
+            return {
+                "workers": self.workers,
+                "running": self.running,
+                "queue_depth": self.waiting,
+                "completed": self.completed,
+                "avg_wait_ms": int(self._wait_total / started * 1000) if started else 0,
+                "last_wait_ms": int(self._last_wait * 1000),
+            }
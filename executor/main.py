@@ -1,16 +1,42 @@
 # executor/main.py
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-import docker, os, uuid, shutil
+from typing import Callable, Dict, List, Optional
+import docker, hashlib, io, math, os, shlex, tarfile, time
+
+from backends import Backend, DockerBackend
+from compile_cache import CompileCache
+from dispatch import JobQueue
+from pool import ContainerPool
+from process_sandbox import ProcessBackend
 
 
 app = FastAPI()
-client = docker.from_env()
 
 class CodeExecutionRequest(BaseModel):
     code: str
     language: str
     input_data: str = ""
+    time_limit: Optional[float] = None    # CPU seconds per test
+    memory_limit: Optional[int] = None    # MB
+
+class BatchExecutionRequest(BaseModel):
+    code: str
+    language: str
+    inputs: List[str] = []
+    time_limit: Optional[float] = None
+    memory_limit: Optional[int] = None
+    stop_on_failure: bool = False         # skip the rest after the first non-ok run
+
+class CheckCase(BaseModel):
+    input: str = ""
+    output: str = ""                      # contestant's output
+    answer: str = ""                      # expected output from the test data
+
+class CheckRequest(BaseModel):
+    code: str                             # checker source
+    language: str
+    cases: List[CheckCase] = []
 
 IMAGES = {
     "python": "codearena/python-executor",
@@ -24,93 +50,612 @@ LANG_FILE = {
     "java":   "Main.java",
 }
 
-def command_for(lang: str) -> str:
+# Hard wall-clock cap (seconds) for one test run and for the compile step.
+RUN_TIMEOUT = int(os.environ.get("RUN_TIMEOUT", "8"))
+COMPILE_TIMEOUT = int(os.environ.get("COMPILE_TIMEOUT", "30"))
+
+# Limits used when a request does not carry the problem's own.
+DEFAULT_TIME_LIMIT = float(os.environ.get("DEFAULT_TIME_LIMIT", "2"))
+DEFAULT_MEMORY_LIMIT = int(os.environ.get("DEFAULT_MEMORY_LIMIT", "256"))
+
+# Per-language slack applied to the requested limits, e.g. TIME_MULTIPLIER_PYTHON=3.
+# Java gets memory headroom by default: the heap (-Xmx) is the problem's limit,
+# the JVM itself needs more on top.
+_DEFAULT_MULTIPLIERS = {"java": {"MEMORY": "2"}}
+
+def _multiplier(kind: str, lang: str) -> float:
+    default = _DEFAULT_MULTIPLIERS.get(lang, {}).get(kind, "1")
+    return float(os.environ.get(f"{kind}_MULTIPLIER_{lang.upper()}", default))
+
+# Extra cgroup memory for the runner, shell and idle process next to the program.
+SANDBOX_MEMORY_OVERHEAD_MB = 32
+# Per-test output caps (bytes); the program is killed once it writes more.
+# Only this much ever leaves the sandbox.
+STDOUT_LIMIT_BYTES = int(os.environ.get("STDOUT_LIMIT_BYTES", str(16 * 1024 * 1024)))
+STDERR_LIMIT_BYTES = int(os.environ.get("STDERR_LIMIT_BYTES", str(64 * 1024)))
+# Total stdout returned for one batch: once it is used up, later tests get a
+# prefix of their output, flagged "truncated". Never below the per-test cap,
+# so a batch of one test always comes back whole.
+BATCH_OUTPUT_LIMIT_BYTES = max(STDOUT_LIMIT_BYTES, int(os.environ.get(
+    "BATCH_OUTPUT_LIMIT_BYTES", str(32 * 1024 * 1024))))
+
+# Compilers get their own cap, independent of the problem's limit.
+COMPILE_MEMORY_MB = int(os.environ.get("COMPILE_MEMORY_MB", "512"))
+
+# `timeout` exits with 124 when it had to stop the command.
+TIMEOUT_EXIT_CODE = 124
+
+# Per-test accounting wrapper baked into every language image (runner.c).
+RUNNER = "/usr/local/bin/runner"
+STATS_MARKER = "__CODEARENA_STATS__"
+
+# Compiled artifacts live here inside the sandbox; on a cache hit the cached
+# directory is copied to the same path and compilation is skipped.
+BUILD_DIR = "/tmp/build"
+
+COMPILE_FLAGS = {
+    "cpp":  "-std=gnu++17 -O2 -pipe",
+    "java": "",
+}
+
+def compile_command(lang: str):
+    """Shell command that builds the submission into BUILD_DIR, or None for interpreted languages."""
+    if lang == "python":
+        return None
+    if lang == "cpp":
+        return f"g++ {COMPILE_FLAGS['cpp']} -o {BUILD_DIR}/main main.cpp"
+    if lang == "java":
+        return f"javac {COMPILE_FLAGS['java']} Main.java -d {BUILD_DIR}"
+    raise HTTPException(status_code=400, detail="Unsupported language")
+
+def run_command(lang: str, memory_mb: int = DEFAULT_MEMORY_LIMIT) -> str:
+    """Shell command that runs an already compiled submission (reads stdin)."""
     if lang == "python":
-        return "python script.py < input.txt"
+        return "python script.py"
     if lang == "cpp":
-        return ("g++ -std=gnu++17 -O2 -pipe -o /tmp/main main.cpp 2> /tmp/compile.err "
-                "&& /tmp/main < input.txt "
-                "|| { cat /tmp/compile.err 1>&2; exit 1; }")
+        return f"{BUILD_DIR}/main"
     if lang == "java":
-        return ("javac Main.java -d /tmp 2> /tmp/compile.err "
-                "&& java -Xss64m -Xms64m -Xmx256m -cp /tmp Main < input.txt "
-                "|| { cat /tmp/compile.err 1>&2; exit 1; }")
+        return (f"java -Xss64m -Xms{min(64, memory_mb)}m -Xmx{memory_mb}m "
+                f"-cp {BUILD_DIR} Main")
     raise HTTPException(status_code=400, detail="Unsupported language")
 
-# Detect if we are running inside a container
-IS_DOCKER = os.path.exists("/.dockerenv")
+# Persistent runners, baked into the language images under RUNNER_DIR, run a
+# whole batch in one process instead of starting an interpreter per test:
+#  - Java: a JVM (JudgeRunner.java, with a CDS archive) that loads Main in a
+#    fresh class loader per test. The default, JAVA_RUNNER=plain, runs
+#    `java Main` per test. JAVA_RUNNER=persistent is for trusted code only
+#    (e.g. a judge grading its own reference solutions): the tests share the
+#    JVM that prints the result lines, and nothing keeps a submission from
+#    writing its own. Only with the docker backend, the process backend's
+#    host may not have RUNNER_DIR.
+#  - Python: a fork server (pyrunner.py) that imports the common modules and
+#    compiles the script once, then forks a clean child per test.
+#    PYTHON_RUNNER=plain runs `python script.py` per test.
+RUNNER_DIR = "/opt/judge"
+# Allowance for start-up, and per test for JIT/GC threads and forking, on top
+# of the per-test CPU limits.
+JAVA_RUNNER_STARTUP_MS = int(os.environ.get("JAVA_RUNNER_STARTUP_MS", "2000"))
+JAVA_RUNNER_OVERHEAD_MS = int(os.environ.get("JAVA_RUNNER_OVERHEAD_MS", "200"))
+PYTHON_RUNNER_STARTUP_MS = int(os.environ.get("PYTHON_RUNNER_STARTUP_MS", "1000"))
+PYTHON_RUNNER_OVERHEAD_MS = int(os.environ.get("PYTHON_RUNNER_OVERHEAD_MS", "50"))
+
+def java_runner_command(memory_mb: int) -> List[str]:
+    """JVM running JudgeRunner; the GC and -cp must match the CDS dump in Dockerfile.java."""
+    return ["java", f"-XX:SharedArchiveFile={RUNNER_DIR}/app.jsa", "-Xshare:auto",
+            "-XX:+UseSerialGC", "-XX:-UsePerfData",
+            f"-Xms{min(64, memory_mb)}m", f"-Xmx{memory_mb}m",
+            "-Djava.security.manager=allow", "-cp", RUNNER_DIR, "JudgeRunner"]
+
+# Sandbox backend per language: "docker" (pooled containers) or "process"
+# (namespaced processes on this host, see process_sandbox.py).
+# SANDBOX_BACKEND sets the default, SANDBOX_BACKEND_<LANG> overrides it.
+SANDBOX_BACKEND = os.environ.get("SANDBOX_BACKEND", "docker")
+BACKEND_FOR = {
+    lang: os.environ.get(f"SANDBOX_BACKEND_{lang.upper()}", SANDBOX_BACKEND).strip().lower()
+    for lang in IMAGES
+}
+JAVA_RUNNER = os.environ.get("JAVA_RUNNER", "plain").strip().lower()
+if BACKEND_FOR["java"] != "docker":
+    JAVA_RUNNER = "plain"
+PYTHON_RUNNER = os.environ.get("PYTHON_RUNNER", "forkserver").strip().lower()
+# the process backend runs on this host, which has its own copy next to this file
+PYTHON_RUNNER_PATH = (f"{RUNNER_DIR}/pyrunner.py" if BACKEND_FOR["python"] == "docker"
+                      else os.path.join(os.path.dirname(os.path.abspath(__file__)), "pyrunner.py"))
+
+def persistent_runner(lang: str, n: int, cpu_ms: int, wall_ms: int,
+                      memory_mb: int, rss_mb: int, stop_on_failure: bool):
+    """
+    (command, startup_ms, overhead_ms) for the language's persistent runner,
+    where command(start) is its argv for tests start..n-1; None to run each
+    test in a process of its own.
+    """
+    def tail(start: int) -> List[str]:
+        return [str(start), str(n), str(cpu_ms), str(wall_ms), str(STDOUT_LIMIT_BYTES),
+                str(STDERR_LIMIT_BYTES), "1" if stop_on_failure else "0"]
+
+    if lang == "java" and JAVA_RUNNER == "persistent":
+        return (lambda start: [*java_runner_command(memory_mb), BUILD_DIR, *tail(start)],
+                JAVA_RUNNER_STARTUP_MS, JAVA_RUNNER_OVERHEAD_MS)
+    if lang == "python" and PYTHON_RUNNER == "forkserver":
+        return (lambda start: ["python", PYTHON_RUNNER_PATH, LANG_FILE["python"], *tail(start),
+                               str(rss_mb * 1024)],
+                PYTHON_RUNNER_STARTUP_MS, PYTHON_RUNNER_OVERHEAD_MS)
+    return None
 
-# If HOST_RUNS_DIR is not provided, default to a local ./runs folder (absolute)
-DEFAULT_LOCAL_RUNS = os.path.abspath(os.path.join(os.getcwd(), "runs"))
+# Docker sandboxes have a read-only root and a tmpfs /tmp. Job files are
+# streamed in as an in-memory tar over exec stdin (put_archive cannot write
+# into tmpfs), so setting up a run touches no disk on either side.
+JOB_DIR = "/tmp/job"
+TMPFS_SIZE_MB = int(os.environ.get("TMPFS_SIZE_MB", "256"))
 
-HOST_RUNS_DIR = os.environ.get("HOST_RUNS_DIR") or DEFAULT_LOCAL_RUNS
-IN_CONTAINER_RUNS_DIR = (
-    os.environ.get("IN_CONTAINER_RUNS_DIR")
-    or ("/runs" if IS_DOCKER else HOST_RUNS_DIR)
+# Resource and lock-down settings shared by every sandbox container.
+SANDBOX_RUN_KWARGS = dict(
+    working_dir="/tmp",
+    user="coder",
+    network_mode="none",
+    mem_limit="256m",
+    pids_limit=100,
+    cpu_shares=1024,
+    cap_drop=["ALL"],
+    security_opt=["no-new-privileges"],
+    read_only=True,
+    tmpfs={"/tmp": f"rw,exec,nosuid,nodev,size={TMPFS_SIZE_MB}m,mode=1777"},
 )
 
-# Only try to create the directory if it's not the root '/runs' on macOS host
-# (When running locally, IN_CONTAINER_RUNS_DIR == HOST_RUNS_DIR == ./runs)
-try:
-    os.makedirs(IN_CONTAINER_RUNS_DIR, exist_ok=True)
-except OSError:
-    # If you run locally with IN_CONTAINER_RUNS_DIR='/runs', this would fail.
-    # That's why Option B exports IN_CONTAINER_RUNS_DIR to a writable path.
-    pass
+# Warm pool: POOL_SIZE idle containers per language (POOL_SIZE_<LANG> overrides),
+# each replaced after POOL_MAX_USES jobs.
+POOL_SIZE = int(os.environ.get("POOL_SIZE", "2"))
+POOL_MAX_USES = int(os.environ.get("POOL_MAX_USES", "50"))
 
+COMPILE_CACHE_DIR = (
+    os.environ.get("COMPILE_CACHE_DIR")
+    or os.path.abspath(os.path.join(os.getcwd(), "compile-cache"))
+)
+COMPILE_CACHE_MAX_MB = int(os.environ.get("COMPILE_CACHE_MAX_MB", "512"))
 
-@app.post("/execute")
-async def execute_code(req: CodeExecutionRequest):
-    lang = req.language.strip().lower()
-    if lang not in IMAGES:
-        raise HTTPException(status_code=400, detail="Unsupported language")
+# Process backend: job dirs on tmpfs, one uid per concurrent slot.
+PROCESS_SANDBOX_ROOT = os.environ.get("PROCESS_SANDBOX_ROOT", "/dev/shm/codearena")
+PROCESS_SANDBOX_UID_BASE = int(os.environ.get("PROCESS_SANDBOX_UID_BASE", "20000"))
+
+# At most MAX_CONCURRENCY sandboxes run at once; further requests wait in a
+# FIFO queue without blocking the event loop.
+MAX_CONCURRENCY = int(os.environ.get("MAX_CONCURRENCY", str(os.cpu_count() or 4)))
+jobs = JobQueue(MAX_CONCURRENCY)
+
+# Only talk to Docker when some language actually uses it.
+client = docker.from_env() if "docker" in BACKEND_FOR.values() else None
+_process_backend = None
+
+def _make_backend(lang: str) -> Backend:
+    global _process_backend
+    kind = BACKEND_FOR[lang]
+    if kind == "docker":
+        return DockerBackend(ContainerPool(
+            client, lang, IMAGES[lang],
+            size=int(os.environ.get(f"POOL_SIZE_{lang.upper()}", POOL_SIZE)),
+            max_uses=POOL_MAX_USES,
+            run_kwargs=SANDBOX_RUN_KWARGS,
+        ))
+    if kind == "process":
+        if _process_backend is None:  # one set of slots/uids for all languages
+            _process_backend = ProcessBackend(
+                PROCESS_SANDBOX_ROOT, MAX_CONCURRENCY, PROCESS_SANDBOX_UID_BASE,
+                hide=[COMPILE_CACHE_DIR],
+            )
+        return _process_backend
+    raise ValueError(f"unknown sandbox backend {kind!r} for {lang}")
+
+backends: Dict[str, Backend] = {lang: _make_backend(lang) for lang in IMAGES}
+
+compile_cache = CompileCache(COMPILE_CACHE_DIR, COMPILE_CACHE_MAX_MB * 1024 * 1024)
+
+
+@app.on_event("startup")
+def prewarm_backends():
+    for b in set(backends.values()):
+        b.prewarm()
 
-    run_id = str(uuid.uuid4())
-    # Write files via the API container's bind mount
-    run_dir_in = os.path.join(IN_CONTAINER_RUNS_DIR, run_id)  # inside this container
-    os.makedirs(run_dir_in, exist_ok=True)
+@app.on_event("shutdown")
+def drain_backends():
+    jobs.shutdown()
+    for b in set(backends.values()):
+        b.shutdown()
 
-    code_path  = os.path.join(run_dir_in, LANG_FILE[lang])
-    input_path = os.path.join(run_dir_in, "input.txt")
-    with open(code_path, "w", encoding="utf-8") as f:
-        f.write(req.code)
-    with open(input_path, "w", encoding="utf-8") as f:
-        f.write(req.input_data)
 
-    # The Docker daemon needs the **host** path for the bind mount:
-    run_dir_host = os.path.join(HOST_RUNS_DIR, run_id)
+def _decode(b) -> str:
+    return (b or b"").decode("utf-8", "replace")
 
-    container = None
+def _timed(argv: List[str], timeout: int) -> List[str]:
+    # `timeout` signals its whole process group, so children go too.
+    return ["timeout", "-k", "1", str(timeout), *argv]
+
+def _sh(cmd: str, timeout: int) -> List[str]:
+    return _timed(["/bin/sh", "-c", cmd], timeout)
+
+def _split_stats(stderr: str):
+    """Strip the runner's trailer off stderr; returns (stderr, {cpu_ms, rss_kb, exit, limit})."""
+    i = stderr.rfind("\n" + STATS_MARKER)
+    if i < 0:
+        return stderr, {}
+    stats = {}
+    for kv in stderr[i + 1 + len(STATS_MARKER):].split():
+        k, _, v = kv.partition("=")
+        try: stats[k] = int(v)
+        except ValueError: stats[k] = v
+    return stderr[:i], stats
+
+def _job_archive(files: Dict[str, str], cached_build) -> bytes:
+    """
+    Tar with job/<files> (and build/ from the compile cache, if any), to be
+    extracted into /tmp of the sandbox by the sandbox user.
+    """
+    def own(info: tarfile.TarInfo) -> tarfile.TarInfo:
+        info.mode = 0o755
+        return info
+
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        root = tarfile.TarInfo(os.path.basename(JOB_DIR))
+        root.type = tarfile.DIRTYPE
+        tar.addfile(own(root))
+        for name, text in files.items():
+            data = text.encode("utf-8")
+            info = tarfile.TarInfo(f"{root.name}/{name}")
+            info.size = len(data)
+            tar.addfile(own(info), io.BytesIO(data))
+        if cached_build:
+            tar.add(cached_build, arcname=os.path.basename(BUILD_DIR), filter=own)
+    return buf.getvalue()
+
+def _status(exit_code: int, stats: dict) -> str:
+    if exit_code == TIMEOUT_EXIT_CODE or stats.get("limit") == "time":
+        return "time_limit"
+    if stats.get("limit") == "memory":
+        return "memory_limit"
+    if stats.get("limit") == "output":
+        return "output_limit"
+    if exit_code != 0:
+        return "runtime_error"
+    return "ok"
+
+class _ChunkReader(io.RawIOBase):
+    """Read-only file over an iterator of byte chunks."""
+
+    def __init__(self, chunks):
+        self._chunks, self._buf = iter(chunks), b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buf:
+            self._buf = next(self._chunks, None)
+            if self._buf is None:
+                self._buf = b""
+                return 0
+        n = min(len(b), len(self._buf))
+        b[:n], self._buf = self._buf[:n], self._buf[n:]
+        return n
+
+def _blake(data: bytes = b""):
+    return hashlib.blake2b(data, digest_size=16)
+
+def _output_digest(out: bytes, err: bytes) -> str:
+    """pyrunner.output_digest, from the digests of a test's out and err files."""
+    return _blake(out + err).hexdigest()
+
+def _read_outputs(sandbox, indices: List[int], budget: int) -> Dict[str, dict]:
+    """
+    A persistent runner's out/<i>.out and out/<i>.err for tests `indices`,
+    streamed out of the sandbox in test order, keyed by file name: "data" is
+    what is kept of the file (stdout until `budget` bytes are used up in
+    all, stderr up to its cap), "truncated" whether some was dropped, and
+    "digest" that of the whole file.
+    """
+    top = f"{os.path.basename(JOB_DIR)}/out"
+    paths = [f"{top}/{i}.{ext}" for i in indices for ext in ("out", "err")]
+    files = {}
     try:
-        container = client.containers.run(
-            image=IMAGES[lang],
-            command=f"/bin/sh -lc '{command_for(lang)}'",
-            volumes={ run_dir_host: {"bind": "/app", "mode": "ro"} },  # host path -> /app in child
-            working_dir="/app",
-            user="coder",
-            network_mode="none",
-            mem_limit="256m",
-            pids_limit=100,
-            cpu_shares=1024,
-            detach=True,
-        )
+        chunks = io.BufferedReader(_ChunkReader(sandbox.stream(paths)))
+        with tarfile.open(fileobj=chunks, mode="r|") as tar:
+            for m in tar:
+                f = tar.extractfile(m) if m.isfile() else None
+                if f is None:
+                    continue
+                name = os.path.basename(m.name)
+                keep = budget if name.endswith(".out") else STDERR_LIMIT_BYTES
+                h, kept, size = _blake(), [], 0
+                for chunk in iter(lambda: f.read(1 << 16), b""):
+                    h.update(chunk)
+                    if size < keep:
+                        kept.append(chunk[:keep - size])
+                    size += len(chunk)
+                data = b"".join(kept)
+                if name.endswith(".out"):
+                    budget -= len(data)
+                files[name] = {"data": data, "truncated": size > len(data), "digest": h.digest()}
+    except Exception:
+        pass  # what was read so far; the rest come back empty
+    return files
+
+def _run_persistent(sandbox, n: int, command: Callable[[int], List[str]], cpu_ms: int,
+                    wall_ms: int, rss_mb: int, startup_ms: int, overhead_ms: int,
+                    stop_on_failure: bool) -> List[dict]:
+    """
+    Run tests 0..n-1 through a persistent runner (JudgeRunner for Java,
+    pyrunner.py for Python); `command(start)` is its argv for tests start..n-1.
+    The runner writes out/<i>.out, out/<i>.err and prints a result line per
+    test. One runner process covers as many tests as it can: JudgeRunner stops
+    after a test that hit a limit or left threads behind, and a runner that
+    dies mid-test (crash, or the outer runner's limits) costs that test only.
+    Either way the next one starts at the following test.
+
+    Result lines are only taken in order, from `start` on: a line for any
+    other index did not come from the runner, and neither did anything after
+    it. A line that carries a digest (pyrunner's do) must match the files read
+    back at the end, or the test's output was rewritten after it ended.
+    """
+    results: Dict[int, dict] = {}
+    start = 0
+    while start < n:
+        left = n - start
+        total_cpu = (cpu_ms + overhead_ms) * left + startup_ms
+        total_wall = wall_ms * left + startup_ms
+        cmd = [RUNNER, "-t", str(total_cpu), "-w", str(total_wall), "-m", str(rss_mb * 1024),
+               "-o", str(1024 * 1024), "-e", str(STDERR_LIMIT_BYTES), "/dev/null", "--",
+               *command(start)]
+        t0 = time.perf_counter()
+        res = sandbox.exec(_timed(cmd, math.ceil(total_wall / 1000) + 1), JOB_DIR)
+        elapsed = int((time.perf_counter() - t0) * 1000)
+        err, stats = _split_stats(_decode(res.stderr))
+
+        last = start - 1
+        for line in _decode(res.stdout).splitlines():
+            parts = line.split()
+            if len(parts) not in (6, 7) or not all(p.isdigit() for p in parts[2:6]):
+                continue
+            if parts[0] != str(last + 1) or last + 1 >= n:
+                break
+            last += 1
+            results[last] = {"status": parts[1], "exit_code": int(parts[2]), "time_ms": int(parts[3]),
+                             "memory_kb": int(parts[4]), "wall_ms": int(parts[5]),
+                             "digest": parts[6] if len(parts) == 7 else None}
+        if stop_on_failure and last >= start and results[last]["status"] != "ok":
+            break
 
+        outer = _status(res.exit_code, stats)
+        if outer == "ok" and last >= start:
+            start = last + 1  # the runner asked to be restarted (or finished)
+            continue
+        # the runner died during test last+1: charge it with whatever killed it
+        i = last + 1
+        if i >= n:
+            break
+        results[i] = {"status": "runtime_error" if outer == "ok" else outer,
+                      "exit_code": res.exit_code, "time_ms": stats.get("cpu_ms", elapsed),
+                      "memory_kb": stats.get("rss_kb", 0), "wall_ms": elapsed, "stderr": err}
+        if stop_on_failure:
+            break
+        start = i + 1
+
+    files = _read_outputs(sandbox, sorted(results), BATCH_OUTPUT_LIMIT_BYTES)
+    missing = {"data": b"", "truncated": False, "digest": _blake().digest()}
+    out = []
+    for i in sorted(results):
+        r = results[i]
+        status = r["status"]
+        stdout, stderr = files.get(f"{i}.out", missing), files.get(f"{i}.err", missing)
+        truncated = stdout["truncated"]
+        if r.get("digest") and r["digest"] != _output_digest(stdout["digest"], stderr["digest"]):
+            stdout, stderr = missing, {"data": b"output files changed after the test ended\n"}
+            status, truncated = "runtime_error", False
+        out.append({
+            "stdout": _decode(stdout["data"]),
+            "stderr": _decode(stderr["data"]) + r.get("stderr", ""),
+            "truncated": truncated,
+            "exit_code": r["exit_code"],
+            "status": status,
+            "timed_out": status == "time_limit",
+            "time_ms": r["time_ms"],
+            "memory_kb": r["memory_kb"],
+            "wall_ms": r["wall_ms"],
+        })
+    return out
+
+def run_batch(lang: str, code: str, inputs: List[str],
+              time_limit: Optional[float] = None, memory_limit: Optional[int] = None,
+              stop_on_failure: bool = False,
+              extra_files: Optional[Dict[str, str]] = None,
+              run_args: Optional[List[List[str]]] = None) -> dict:
+    """
+    Compile `code` once and run it against every entry of `inputs` inside a
+    single sandbox of the language's backend. Returns
+      { "compile_error": str, "compile_cached": bool,
+        "results": [ {stdout, stderr, truncated, exit_code, status, timed_out,
+                      time_ms, memory_kb, wall_ms}, ... ] }
+    `status` is one of ok / runtime_error / time_limit / memory_limit / output_limit.
+    At most BATCH_OUTPUT_LIMIT_BYTES of stdout come back in all; a test whose
+    stdout did not fit gets a prefix of it and `truncated` set.
+    `results` is empty when compilation failed, and stops after the first
+    non-ok run when `stop_on_failure` is set. Compiled artifacts are reused
+    from the compile cache when the same source was built before; they are
+    copied into the sandbox together with the job files. `extra_files` are
+    added to the job dir and `run_args[i]` is appended to the command of run i
+    (used by /check to hand the checker its files). Java and Python go
+    through their persistent runner (see persistent_runner) unless `run_args`
+    are given.
+    """
+    build = compile_command(lang)
+    cache_key = CompileCache.key(lang, COMPILE_FLAGS[lang], code) if build else None
+
+    files = {LANG_FILE[lang]: code}
+    for i, data in enumerate(inputs):
+        files[f"input_{i}.txt"] = data or ""
+    files.update(extra_files or {})
+    with compile_cache.pinned(cache_key) as cached:
         try:
-            container.wait(timeout=8)
-        except Exception:
+            archive = _job_archive(files, cached)
+        except OSError:  # the entry went away all the same (another executor, by hand)
+            cached = None
+            archive = _job_archive(files, None)
+
+    # Limits after per-language multipliers: CPU ms and RSS KB for the runner,
+    # a wall clock allowance for blocked/sleeping programs, and the cgroup cap.
+    # RUN_TIMEOUT caps the wall allowance but never below the CPU limit, or a
+    # long limit would turn into a time limit hit short of it.
+    memory_mb = memory_limit or DEFAULT_MEMORY_LIMIT
+    cpu_ms  = int((time_limit or DEFAULT_TIME_LIMIT) * _multiplier("TIME", lang) * 1000)
+    wall_ms = max(cpu_ms + 1000, min(2 * cpu_ms + 1000, RUN_TIMEOUT * 1000))
+    rss_mb  = int(memory_mb * _multiplier("MEMORY", lang))
+    persistent = None if run_args else persistent_runner(
+        lang, len(inputs), cpu_ms, wall_ms, memory_mb, rss_mb, stop_on_failure)
+    # tmpfs pages are charged to the sandbox's cgroup, so the job files count
+    # too, and so do a persistent runner's out/<i>.out and .err files, which
+    # pile up for the whole batch (at most the tmpfs size)
+    cgroup_mb = rss_mb + SANDBOX_MEMORY_OVERHEAD_MB + math.ceil(len(archive) / (1024 * 1024))
+    if persistent:
+        outputs = len(inputs) * (STDOUT_LIMIT_BYTES + STDERR_LIMIT_BYTES)
+        cgroup_mb += min(math.ceil(outputs / (1024 * 1024)), TMPFS_SIZE_MB)
+
+    backend = backends[lang]
+    sandbox = backend.acquire()
+    try:
+        sandbox.put(archive)
+
+        if build and not cached:
+            sandbox.set_memory(COMPILE_MEMORY_MB)
+            res = sandbox.exec(_sh(f"mkdir -p {BUILD_DIR} && {build}", COMPILE_TIMEOUT), JOB_DIR)
+            if res.exit_code != 0:
+                msg = _decode(res.stderr)
+                if res.exit_code == TIMEOUT_EXIT_CODE:
+                    msg = msg or "Compilation timed out"
+                return {"compile_error": msg or "Compilation failed",
+                        "compile_cached": False, "results": []}
+            # Copy the artifacts out before any user code runs in this sandbox.
             try:
-                container.kill()
-            finally:
-                raise HTTPException(status_code=408, detail="Time Limit Exceeded")
+                tar = sandbox.get(os.path.basename(BUILD_DIR))
+                compile_cache.store_archive(cache_key, [tar], os.path.basename(BUILD_DIR))
+            except Exception:
+                pass  # caching is best-effort
+
+        sandbox.set_memory(cgroup_mb)
+        if persistent:
+            command, startup_ms, overhead_ms = persistent
+            results = _run_persistent(sandbox, len(inputs), command, cpu_ms, wall_ms, rss_mb,
+                                      startup_ms, overhead_ms, stop_on_failure)
+            return {"compile_error": "", "compile_cached": bool(cached), "results": results}
 
-        out = container.logs(stdout=True,  stderr=False).decode("utf-8", "replace")
-        err = container.logs(stdout=False, stderr=True ).decode("utf-8", "replace")
-        return {"output": out, "error": err}
+        results = []
+        argv = shlex.split(run_command(lang, memory_mb))
+        limits = ["-t", str(cpu_ms), "-w", str(wall_ms), "-m", str(rss_mb * 1024),
+                  "-o", str(STDOUT_LIMIT_BYTES), "-e", str(STDERR_LIMIT_BYTES)]
+        hard_timeout = math.ceil(wall_ms / 1000) + 1
+        budget = BATCH_OUTPUT_LIMIT_BYTES
+        for i in range(len(inputs)):
+            cmd = [RUNNER, *limits, f"input_{i}.txt", "--", *argv, *(run_args[i] if run_args else [])]
+            t0 = time.perf_counter()
+            res = sandbox.exec(_timed(cmd, hard_timeout), JOB_DIR)
+            elapsed = int((time.perf_counter() - t0) * 1000)
+            err, stats = _split_stats(_decode(res.stderr))
+            status = _status(res.exit_code, stats)
+            stdout = res.stdout[:budget]
+            budget -= len(stdout)
+            results.append({
+                "stdout": _decode(stdout),
+                "stderr": err,
+                "truncated": len(stdout) < len(res.stdout),
+                "exit_code": res.exit_code,
+                "status": status,
+                "timed_out": status == "time_limit",
+                # CPU time and peak RSS of the user process; wall time of the whole exec
+                "time_ms": stats.get("cpu_ms", elapsed),
+                "memory_kb": stats.get("rss_kb", 0),
+                "wall_ms": elapsed,
+            })
+            if stop_on_failure and status != "ok":
+                break
+        return {"compile_error": "", "compile_cached": bool(cached), "results": results}
 
     finally:
-        if container is not None:
-            try: container.remove(force=True)
-            except Exception: pass
-        # Clean run dir
-        try: shutil.rmtree(run_dir_in, ignore_errors=True)
-        except Exception: pass
+        backend.release(sandbox)
+
+
+def _check_language(language: str) -> str:
+    lang = language.strip().lower()
+    if lang not in IMAGES:
+        raise HTTPException(status_code=400, detail="Unsupported language")
+    return lang
+
+
+@app.post("/execute")
+async def execute_code(req: CodeExecutionRequest):
+    lang = _check_language(req.language)
+    batch, _ = await jobs.run(run_batch, lang, req.code, [req.input_data],
+                              req.time_limit, req.memory_limit)
+    if batch["compile_error"]:
+        return {"output": "", "error": batch["compile_error"]}
+
+    res = batch["results"][0]
+    if res["timed_out"]:
+        raise HTTPException(status_code=408, detail="Time Limit Exceeded")
+    return {"output": res["stdout"], "error": res["stderr"], "status": res["status"],
+            "time_ms": res["time_ms"], "memory_kb": res["memory_kb"]}
+
+
+@app.post("/execute/batch")
+async def execute_batch(req: BatchExecutionRequest):
+    """
+    Compile once, then run every input in order inside the same sandbox.
+    body: { code, language, inputs: [str, ...], time_limit?, memory_limit?, stop_on_failure? }
+    """
+    lang = _check_language(req.language)
+    batch, waited = await jobs.run(run_batch, lang, req.code, req.inputs,
+                                   req.time_limit, req.memory_limit, req.stop_on_failure)
+    batch["queue_wait_ms"] = int(waited * 1000)
+    return batch
+
+
+# Checkers get fixed, generous limits regardless of the problem's.
+CHECKER_TIME_LIMIT = float(os.environ.get("CHECKER_TIME_LIMIT", "5"))
+CHECKER_MEMORY_LIMIT = int(os.environ.get("CHECKER_MEMORY_LIMIT", "256"))
+
+
+@app.post("/check")
+async def check(req: CheckRequest):
+    """
+    Run a special-judge program once per case, testlib style:
+        checker <input> <output> <answer>
+    with the test input also on stdin. Exit code 0 accepts the output, 1 (WA)
+    and 2 (PE) reject it, anything else is a checker failure.
+    body: { code, language, cases: [{input, output, answer}, ...] }
+    Returns { compile_error, results: [{ok, message, exit_code, status}, ...] }.
+    """
+    lang = _check_language(req.language)
+    extra, args = {}, []
+    for i, c in enumerate(req.cases):
+        extra[f"output_{i}.txt"] = c.output
+        extra[f"answer_{i}.txt"] = c.answer
+        args.append([f"input_{i}.txt", f"output_{i}.txt", f"answer_{i}.txt"])
+    batch, _ = await jobs.run(run_batch, lang, req.code, [c.input for c in req.cases],
+                              CHECKER_TIME_LIMIT, CHECKER_MEMORY_LIMIT, False, extra, args)
+    results = []
+    for res in batch["results"]:
+        ok = res["status"] == "ok"
+        failed = not ok and (res["status"] != "runtime_error" or res["exit_code"] not in (1, 2))
+        results.append({
+            "ok": ok,
+            "failed": failed,
+            "message": (res["stdout"] or res["stderr"]).strip()[:1000],
+            "exit_code": res["exit_code"],
+            "status": res["status"],
+        })
+    return {"compile_error": batch["compile_error"], "results": results}
+
+
+@app.get("/status")
+def status():
+    """Load report: worker/queue counters and per-language sandbox backends."""
+    return {
+        "queue": jobs.stats(),
+        "backends": {lang: b.stats() for lang, b in backends.items()},
+    }
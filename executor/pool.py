@@ -0,0 +1,138 @@
+# executor/pool.py
+"""
+Warm pool of pre-started sandbox containers, one pool per language image.
+
+Containers idle on `sleep infinity`; work is dispatched into them with
+`exec_run`. After each job the container is scrubbed and put back, or
+destroyed and replaced once it is unhealthy or has served `max_uses` jobs.
+"""
+import logging, queue, threading
+
+import docker
+
+log = logging.getLogger("executor.pool")
+
+POOL_LABEL = "codearena.pool"
+
+# Runs as the sandbox user: kill leftovers (kill -1 spares PID 1 and the
+# caller) and wipe every scratch location a job could have written to
+# (the root filesystem is read-only; /tmp is a tmpfs).
+SCRUB_COMMAND = [
+    "/bin/sh", "-c",
+    "kill -9 -1 2>/dev/null; "
+    "find /tmp /var/tmp /dev/shm -mindepth 1 -delete 2>/dev/null; true",
+]
+
+
+def ensure_image(client, image: str) -> None:
+    """Pull `image` if the daemon does not have it yet."""
+    try:
+        client.images.get(image)
+    except docker.errors.ImageNotFound:
+        log.info("pulling missing image %s", image)
+        try:
+            client.images.pull(image)
+        except docker.errors.APIError as e:
+            log.warning("could not pull %s: %s", image, e)
+
+
+class ContainerPool:
+    def __init__(self, client, name: str, image: str, size: int, max_uses: int, run_kwargs: dict):
+        self.client = client
+        self.name = name
+        self.image = image
+        self.size = size
+        self.max_uses = max_uses
+        self.run_kwargs = run_kwargs
+        self._idle = queue.Queue()
+        self._uses = {}
+        self._lock = threading.Lock()
+
+    # ---- lifecycle ----
+
+    def _start(self):
+        container = self.client.containers.run(
+            image=self.image,
+            command=["sleep", "infinity"],
+            labels={POOL_LABEL: self.name},
+            detach=True,
+            **self.run_kwargs,
+        )
+        with self._lock:
+            self._uses[container.id] = 0
+        return container
+
+    def _destroy(self, container) -> None:
+        with self._lock:
+            self._uses.pop(container.id, None)
+        try: container.remove(force=True)
+        except Exception: pass
+
+    def _replenish(self) -> None:
+        while self._idle.qsize() < self.size:
+            try:
+                self._idle.put(self._start())
+            except Exception as e:
+                log.warning("pool %s: could not start container: %s", self.name, e)
+                return
+
+    def prewarm(self) -> None:
+        """Pull the image if needed, drop containers left by a previous run and fill the pool."""
+        ensure_image(self.client, self.image)
+        for stale in self.client.containers.list(all=True, filters={"label": f"{POOL_LABEL}={self.name}"}):
+            try: stale.remove(force=True)
+            except Exception: pass
+        self._replenish()
+
+    def shutdown(self) -> None:
+        while True:
+            try:
+                self._destroy(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    # ---- dispatch ----
+
+    @staticmethod
+    def healthy(container) -> bool:
+        try:
+            container.reload()
+            return container.status == "running"
+        except Exception:
+            return False
+
+    def acquire(self):
+        """An idle healthy container, or a freshly started one if the pool is empty."""
+        while True:
+            try:
+                container = self._idle.get_nowait()
+            except queue.Empty:
+                return self._start()
+            if self.healthy(container):
+                return container
+            self._destroy(container)
+
+    def release(self, container) -> None:
+        """Scrub and recycle `container`, or replace it when worn out or broken."""
+        with self._lock:
+            uses = self._uses.get(container.id, 0) + 1
+            self._uses[container.id] = uses
+
+        recycle = uses < self.max_uses and self._idle.qsize() < self.size
+        if recycle:
+            try:
+                recycle = container.exec_run(SCRUB_COMMAND, user="coder").exit_code == 0
+            except Exception:
+                recycle = False
+            recycle = recycle and self.healthy(container)
+
+        if recycle:
+            self._idle.put(container)
+            return
+        self._destroy(container)
+        threading.Thread(target=self._replenish, daemon=True).start()
+
+    def stats(self) -> dict:
+        with self._lock:
+            live = len(self._uses)
+        return {"image": self.image, "idle": self._idle.qsize(), "live": live, "size": self.size}
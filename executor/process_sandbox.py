@@ -0,0 +1,344 @@
+# executor/process_sandbox.py
+"""
+Process sandbox backend: runs jobs directly on the executor host, no Docker.
+
+Every job gets a private directory (under /dev/shm by default, so nothing
+touches disk) that is bind-mounted over /tmp inside fresh mount, network,
+IPC, UTS and PID namespaces. Commands therefore see the same /tmp/job and
+/tmp/build layout as in a container, have no network, and everything they
+start dies with them. The directory holding all jobs, and any other host
+directory the backend is given (the compile cache), is covered by an empty
+read-only tmpfs, so a job cannot see the others or the cached builds.
+
+When the executor runs as root, each concurrent slot has its own
+unprivileged uid and its own cgroup v2 group (memory.max, pids.max).
+Otherwise a user namespace is used and the caller's uid is kept: jobs can
+then touch whatever the executor itself can outside the hidden directories,
+so this is refused unless PROCESS_SANDBOX_ALLOW_ROOTLESS=1 is set (test
+environments without Docker). rlimits and no_new_privs are always applied,
+plus a seccomp deny-list when the libseccomp Python bindings (`seccomp`)
+are installed.
+
+Run as a script, this module is the launcher that sets the isolation up
+and execs the command:
+
+    python process_sandbox.py --root DIR --workdir DIR [--uid N] [--cgroup DIR]
+                              [--hide DIR ...] -- argv...
+"""
+import argparse, ctypes, errno, io, logging, os, queue, resource, shutil, stat, subprocess, sys, tarfile, tempfile
+from typing import Iterator, List, Sequence
+
+from backends import Backend, ExecResult, Sandbox
+
+try:
+    import seccomp
+except ImportError:  # optional: namespaces and rlimits still apply
+    seccomp = None
+
+log = logging.getLogger("executor.process_sandbox")
+
+LAUNCHER = os.path.abspath(__file__)
+
+CLONE_NEWNS   = 0x00020000
+CLONE_NEWUTS  = 0x04000000
+CLONE_NEWIPC  = 0x08000000
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWPID  = 0x20000000
+CLONE_NEWNET  = 0x40000000
+
+MS_RDONLY  = 0x1
+MS_NOSUID  = 0x2
+MS_NODEV   = 0x4
+MS_NOEXEC  = 0x8
+MS_BIND    = 0x1000
+MS_REC     = 0x4000
+MS_PRIVATE = 0x40000
+
+PR_SET_NO_NEW_PRIVS = 38
+
+# Syscalls a submission has no business making.
+DENIED_SYSCALLS = [
+    "ptrace", "process_vm_readv", "process_vm_writev",
+    "mount", "umount2", "pivot_root", "chroot", "unshare", "setns",
+    "init_module", "finit_module", "delete_module", "kexec_load",
+    "bpf", "perf_event_open", "keyctl", "add_key", "request_key",
+    "swapon", "swapoff", "reboot", "acct", "quotactl",
+]
+
+RLIMITS = {
+    resource.RLIMIT_CORE: 0,
+    resource.RLIMIT_NOFILE: 256,
+    resource.RLIMIT_FSIZE: 64 * 1024 * 1024,
+}
+# per-uid process cap; only meaningful when every slot has its own uid
+SLOT_NPROC = 100
+
+SANDBOX_ENV = {
+    "PATH": "/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin",
+    "HOME": "/tmp",
+    "LANG": "C.UTF-8",
+}
+
+_libc = ctypes.CDLL(None, use_errno=True)
+
+
+def _check(ret: int, what: str) -> None:
+    if ret != 0:
+        e = ctypes.get_errno()
+        raise OSError(e, f"{what}: {os.strerror(e)}")
+
+
+def _mount(source, target, fstype, flags, data=None) -> None:
+    _check(_libc.mount(
+        source.encode() if source else None, target.encode(),
+        fstype.encode() if fstype else None, ctypes.c_ulong(flags),
+        data.encode() if data else None,
+    ), f"mount {target}")
+
+
+def _write(path: str, text: str) -> None:
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _apply_seccomp() -> None:
+    if seccomp is None:
+        return
+    f = seccomp.SyscallFilter(defaction=seccomp.ALLOW)
+    for name in DENIED_SYSCALLS:
+        try:
+            f.add_rule(seccomp.ERRNO(errno.EPERM), name)
+        except Exception:
+            pass  # not a syscall on this architecture
+    f.load()
+
+
+def launch(root: str, workdir: str, uid, cgroup, argv: List[str],
+           hide: Sequence[str] = ()) -> int:
+    """
+    Enter the sandbox and run `argv`; returns its exit status (128+signal if
+    killed). `hide` are host directories covered by an empty tmpfs.
+    """
+    if cgroup:
+        _write(os.path.join(cgroup, "cgroup.procs"), str(os.getpid()))
+
+    rootless = os.geteuid() != 0
+    flags = CLONE_NEWNS | CLONE_NEWNET | CLONE_NEWIPC | CLONE_NEWUTS | CLONE_NEWPID
+    real_uid, real_gid = os.getuid(), os.getgid()
+    _check(_libc.unshare(flags | (CLONE_NEWUSER if rootless else 0)), "unshare")
+    if rootless:
+        _write("/proc/self/setgroups", "deny")
+        _write("/proc/self/uid_map", f"{real_uid} {real_uid} 1")
+        _write("/proc/self/gid_map", f"{real_gid} {real_gid} 1")
+
+    _mount(None, "/", None, MS_REC | MS_PRIVATE)
+    _mount(root, "/tmp", None, MS_BIND | MS_REC)
+    for path in hide:
+        # a path under /tmp is already out of sight behind the job dir
+        if os.path.isdir(path):
+            _mount("tmpfs", path, "tmpfs", MS_RDONLY | MS_NOSUID | MS_NODEV | MS_NOEXEC,
+                   "size=4k,mode=0555")
+
+    pid = os.fork()
+    if pid:
+        # the child is PID 1 of the new namespace: when it exits, all it started dies
+        _, status = os.waitpid(pid, 0)
+        return os.WEXITSTATUS(status) if os.WIFEXITED(status) else 128 + os.WTERMSIG(status)
+
+    try:
+        try:
+            _mount("proc", "/proc", "proc", MS_NOSUID | MS_NODEV | MS_NOEXEC)
+        except OSError:
+            pass  # keep the host /proc view; processes outside are not signalable anyway
+        for res, value in RLIMITS.items():
+            resource.setrlimit(res, (value, value))
+        if uid is not None and not rootless:
+            resource.setrlimit(resource.RLIMIT_NPROC, (SLOT_NPROC, SLOT_NPROC))
+            os.setgroups([])
+            os.setgid(uid)
+            os.setuid(uid)
+        _check(_libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0), "prctl")
+        _apply_seccomp()
+        os.chdir(workdir)
+        os.execvpe(argv[0], argv, SANDBOX_ENV)
+    except BaseException as e:
+        print(f"sandbox: {e}", file=sys.stderr)
+    os._exit(127)
+
+
+# ---------- backend ----------
+
+def _cgroup_root():
+    """Delegated cgroup v2 directory for the sandbox slots, or None if unavailable."""
+    base = os.environ.get("PROCESS_SANDBOX_CGROUP", "/sys/fs/cgroup/codearena")
+    if not os.path.exists("/sys/fs/cgroup/cgroup.controllers"):
+        return None
+    try:
+        os.makedirs(base, exist_ok=True)
+        _write(os.path.join(base, "cgroup.subtree_control"), "+memory +pids")
+    except OSError as e:
+        log.warning("cgroup v2 unavailable for process sandbox: %s", e)
+        return None
+    return base
+
+
+class ProcessSandbox(Sandbox):
+    def __init__(self, slot: int, path: str, uid, cgroup, hide: Sequence[str] = ()):
+        self.slot = slot
+        self.path = path
+        self.uid = uid
+        self.cgroup = cgroup
+        self.hide = list(hide)
+
+    def _chown(self) -> None:
+        if self.uid is None:
+            return
+        for dirpath, dirs, files in os.walk(self.path):
+            for name in [dirpath] + [os.path.join(dirpath, n) for n in dirs + files]:
+                os.lchown(name, self.uid, self.uid)
+
+    def put(self, archive: bytes) -> None:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            for m in tar.getmembers():
+                if m.name.startswith("/") or ".." in m.name.split("/") or m.issym() or m.islnk():
+                    raise RuntimeError(f"refusing to extract {m.name!r}")
+            tar.extractall(self.path)
+        self._chown()
+
+    def get(self, path: str) -> bytes:
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            tar.add(os.path.join(self.path, path), arcname=path)
+        return buf.getvalue()
+
+    def stream(self, paths: List[str]) -> Iterator[bytes]:
+        for path in paths:
+            try:
+                f = open(os.path.join(self.path, path), "rb",
+                         opener=lambda name, flags: os.open(name, flags | os.O_NOFOLLOW))
+            except OSError:
+                continue
+            with f:
+                st = os.fstat(f.fileno())
+                if not stat.S_ISREG(st.st_mode):
+                    continue
+                info = tarfile.TarInfo(path)
+                info.size = st.st_size
+                yield info.tobuf(tarfile.GNU_FORMAT)
+                left = st.st_size
+                while left > 0:
+                    chunk = f.read(min(1 << 16, left))
+                    if not chunk:
+                        break
+                    left -= len(chunk)
+                    yield chunk
+                # padded to the size in the header if the file shrank meanwhile
+                yield bytes(left + (-st.st_size % tarfile.BLOCKSIZE))
+        yield bytes(2 * tarfile.BLOCKSIZE)
+
+    def exec(self, argv: List[str], workdir: str) -> ExecResult:
+        cmd = [sys.executable, LAUNCHER, "--root", self.path, "--workdir", workdir]
+        if self.uid is not None:
+            cmd += ["--uid", str(self.uid)]
+        if self.cgroup:
+            cmd += ["--cgroup", self.cgroup]
+        for path in self.hide:
+            cmd += ["--hide", path]
+        res = subprocess.run(cmd + ["--", *argv], stdin=subprocess.DEVNULL,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        return ExecResult(res.returncode, res.stdout, res.stderr)
+
+    def set_memory(self, mb: int) -> None:
+        if not self.cgroup:
+            return
+        try:
+            _write(os.path.join(self.cgroup, "memory.max"), f"{mb}M")
+            _write(os.path.join(self.cgroup, "memory.swap.max"), "0")
+            _write(os.path.join(self.cgroup, "pids.max"), str(SLOT_NPROC))
+        except OSError:
+            pass
+
+    def kill_all(self) -> None:
+        if not self.cgroup:
+            return
+        try:
+            _write(os.path.join(self.cgroup, "cgroup.kill"), "1")
+        except OSError:
+            pass
+
+
+class ProcessBackend(Backend):
+    """
+    `slots` jobs may run at once; slot i uses uid `uid_base + i` (when root)
+    and cgroup <root>/slot-i. `root` and the `hide` directories are covered
+    by an empty tmpfs inside every sandbox.
+    """
+
+    def __init__(self, root: str, slots: int, uid_base: int, hide: Sequence[str] = ()):
+        self.privileged = os.geteuid() == 0
+        if not self.privileged and os.environ.get("PROCESS_SANDBOX_ALLOW_ROOTLESS") != "1":
+            raise RuntimeError(
+                "the process sandbox needs root; set PROCESS_SANDBOX_ALLOW_ROOTLESS=1 to run "
+                "jobs as the executor's own user (test environments only)"
+            )
+        self.root = os.path.abspath(root)
+        self.slots = slots
+        self.uid_base = uid_base
+        self.hide = [self.root] + [os.path.abspath(p) for p in hide]
+        self._free = queue.Queue()
+        for i in range(slots):
+            self._free.put(i)
+        self.cgroup_root = _cgroup_root() if self.privileged else None
+        os.makedirs(root, exist_ok=True)
+
+    def acquire(self) -> ProcessSandbox:
+        slot = self._free.get()
+        path = tempfile.mkdtemp(prefix="job-", dir=self.root)
+        uid = self.uid_base + slot if self.privileged else None
+        cgroup = None
+        if self.cgroup_root:
+            cgroup = os.path.join(self.cgroup_root, f"slot-{slot}")
+            os.makedirs(cgroup, exist_ok=True)
+        if uid is not None:
+            os.chown(path, uid, uid)
+        os.chmod(path, 0o700)
+        return ProcessSandbox(slot, path, uid, cgroup, self.hide)
+
+    def release(self, sandbox: ProcessSandbox) -> None:
+        sandbox.kill_all()
+        shutil.rmtree(sandbox.path, ignore_errors=True)
+        self._free.put(sandbox.slot)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "process",
+            "slots": self.slots,
+            "idle": self._free.qsize(),
+            "privileged": self.privileged,
+            "cgroups": bool(self.cgroup_root),
+            "seccomp": seccomp is not None,
+        }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--root", required=True)
+    ap.add_argument("--workdir", default="/tmp")
+    ap.add_argument("--uid", type=int)
+    ap.add_argument("--cgroup")
+    ap.add_argument("--hide", action="append", default=[])
+    ap.add_argument("argv", nargs=argparse.REMAINDER)
+    opts = ap.parse_args()
+    argv = opts.argv[1:] if opts.argv[:1] == ["--"] else opts.argv
+    if not argv:
+        ap.error("no command given")
+    try:
+        code = launch(opts.root, opts.workdir, opts.uid, opts.cgroup, argv, opts.hide)
+    except OSError as e:
+        print(f"sandbox: {e}", file=sys.stderr)
+        code = 2
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
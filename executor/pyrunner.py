@@ -0,0 +1,253 @@
+# executor/pyrunner.py
+"""
+Fork server for Python submissions: runs several tests of one script
+without starting an interpreter per test.
+
+    python pyrunner.py <script> <from> <count> <cpu_ms> <wall_ms>
+                       <out_limit> <err_limit> <stop_on_failure 0|1> <rss_kb>
+
+The parent imports the commonly used standard modules and compiles the
+script once, then forks a child per test. Each child gets input_<i>.txt as
+stdin and out/<i>.out, out/<i>.err as stdout/stderr, its own process group
+and the CPU limit, and runs the script as __main__ the way `python script`
+would: same sys.argv and sys.path[0], same traceback on an uncaught
+exception, same exit status for SystemExit, non-daemon threads and atexit
+handlers run before it exits. After each test one line goes to the
+parent's stdout:
+
+    <i> <status> <exit_code> <cpu_ms> <rss_kb> <wall_ms> <digest>
+
+with the same figures and statuses as runner.c, taken from wait4() on the
+child, and a digest of the test's out/err files as they were when it ended
+(see output_digest), so that a later test rewriting them is noticed.
+Children never share state, so unlike the Java runner the parent is not
+restarted between tests.
+
+Children run as the parent's uid, so the result lines must be out of their
+reach: the parent moves its stdout to a descriptor that every child closes
+first thing, points fd 1 at /dev/null, and makes itself non-dumpable so that
+/proc/<ppid>/fd is closed to them too.
+"""
+import ctypes, gc, hashlib, os, resource, signal, sys, time, types
+
+PRELOAD = ("array", "bisect", "collections", "copy", "decimal", "fractions", "functools",
+           "heapq", "io", "itertools", "math", "operator", "random", "re", "string",
+           "traceback", "typing")
+
+# the parent's own stdio, kept alive in the child so that dropping them does
+# not close the descriptors the test's streams now use
+_stdio = []
+
+_libc = ctypes.CDLL(None, use_errno=True)
+PR_SET_PDEATHSIG = 1
+PR_SET_DUMPABLE = 4
+
+_OOM_EVENTS = ("/sys/fs/cgroup/memory.events", "/sys/fs/cgroup/memory/memory.oom_control")
+
+
+def _oom_kills() -> int:
+    """oom_kill counter of the sandbox's memory cgroup, or -1 if unavailable."""
+    for path in _OOM_EVENTS:
+        try:
+            with open(path) as f:
+                for line in f:
+                    key, _, val = line.partition(" ")
+                    if key == "oom_kill":
+                        return int(val)
+        except OSError:
+            continue
+    return -1
+
+
+def output_digest(i: int) -> str:
+    """
+    Digest of test i's out and err files, taken over the digests of the two
+    (a missing file counts as empty). main.py computes it the same way.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for path in (f"out/{i}.out", f"out/{i}.err"):
+        part = hashlib.blake2b(digest_size=16)
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 16), b""):
+                    part.update(chunk)
+        except OSError:
+            pass
+        h.update(part.digest())
+    return h.hexdigest()
+
+
+def _exit_status(e: SystemExit) -> int:
+    code = e.code
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code & 0xFF
+    try:
+        print(code, file=sys.stderr)
+    except Exception:
+        pass
+    return 1
+
+
+def _reopen(fd: int, mode: str, like, **kwargs):
+    return open(fd, mode, encoding=like.encoding, errors=like.errors, newline="\n",
+                closefd=False, **kwargs)
+
+
+def _child(i: int, script: str, code, error, cpu_ms: int, fsize: int, results: int) -> None:
+    """Runs in the forked child; never returns."""
+    status = 1
+    try:
+        os.close(results)
+        os.setpgid(0, 0)
+        _libc.prctl(PR_SET_PDEATHSIG, signal.SIGKILL)  # gone if the fork server is killed
+        signal.signal(signal.SIGALRM, signal.SIG_DFL)
+        signal.signal(signal.SIGXFSZ, signal.SIG_DFL)  # python ignores it; die at the output cap
+        secs = (cpu_ms + 999) // 1000 + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (secs, secs + 1))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize))
+
+        for fd, path, flags in ((0, f"input_{i}.txt", os.O_RDONLY),
+                                (1, f"out/{i}.out", os.O_WRONLY | os.O_CREAT | os.O_TRUNC),
+                                (2, f"out/{i}.err", os.O_WRONLY | os.O_CREAT | os.O_TRUNC)):
+            src = os.open(path, flags, 0o644)
+            os.dup2(src, fd)
+            os.close(src)
+        # configured like the interpreter's own (the parent's are, being one)
+        _stdio.extend((sys.stdin, sys.stdout, sys.stderr))
+        sys.stdin = sys.__stdin__ = _reopen(0, "r", _stdio[0])
+        sys.stdout = sys.__stdout__ = _reopen(1, "w", _stdio[1])
+        sys.stderr = sys.__stderr__ = _reopen(2, "w", _stdio[2], buffering=1)
+
+        main = types.ModuleType("__main__")
+        main.__file__ = script
+        main.__builtins__ = __builtins__
+        sys.modules["__main__"] = main
+        sys.argv = [script]
+        sys.path[0] = os.path.dirname(script)
+    except BaseException:
+        os._exit(127)
+
+    try:
+        if error is not None:
+            raise error
+        exec(code, main.__dict__)
+        status = 0
+    except SystemExit as e:
+        status = _exit_status(e)
+    except BaseException as e:
+        tb = e.__traceback__.tb_next if e.__traceback__ else None  # hide this frame
+        sys.excepthook(type(e), e.with_traceback(tb), tb)
+        status = 1
+
+    # what the interpreter does on the way out
+    try:
+        threading = sys.modules.get("threading")
+        if threading is not None:
+            threading._shutdown()
+        import atexit
+        atexit._run_exitfuncs()
+    except SystemExit as e:
+        status = _exit_status(e)
+    except BaseException:
+        pass
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            status = status or 120  # as Python does when flushing stdout fails
+    os._exit(status)
+
+
+def main(argv) -> None:
+    script = os.path.abspath(argv[0])
+    start, count = int(argv[1]), int(argv[2])
+    cpu_ms, wall_ms = int(argv[3]), int(argv[4])
+    out_limit, err_limit = int(argv[5]), int(argv[6])
+    stop_on_failure = argv[7] == "1"
+    rss_kb = int(argv[8])
+
+    _libc.prctl(PR_SET_DUMPABLE, 0)
+    results = os.dup(1)
+    null = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(null, 1)
+    os.close(null)
+
+    for name in PRELOAD:
+        __import__(name)
+    code = error = None
+    try:
+        with open(script, "rb") as f:
+            code = compile(f.read(), script, "exec")
+    except (SyntaxError, ValueError) as e:
+        error = e.with_traceback(None)  # raised in every child, as python would
+    os.makedirs("out", exist_ok=True)
+
+    expired = []
+
+    def on_alarm(signum, frame):
+        expired.append(True)
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+    signal.signal(signal.SIGALRM, on_alarm)
+    # one byte past the larger cap stops the child; the exact caps are checked below
+    fsize = max(out_limit, err_limit) + 1
+    gc.freeze()  # keep the preloaded heap shared instead of copied into every child
+
+    for i in range(start, count):
+        del expired[:]
+        oom_before = _oom_kills()
+        sys.stdout.flush()
+        t0 = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            _child(i, script, code, error, cpu_ms, fsize, results)
+        try:
+            os.setpgid(pid, pid)
+        except OSError:
+            pass  # the child did it already
+        signal.setitimer(signal.ITIMER_REAL, wall_ms / 1000)
+        _, wstatus, ru = os.wait4(pid, 0)
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        wall = int((time.perf_counter() - t0) * 1000)
+        try:
+            os.killpg(pid, signal.SIGKILL)  # nothing the test started may outlive it
+        except OSError:
+            pass
+
+        cpu = int((ru.ru_utime + ru.ru_stime) * 1000)
+        sig = os.WTERMSIG(wstatus) if os.WIFSIGNALED(wstatus) else 0
+        exit_code = os.WEXITSTATUS(wstatus) if os.WIFEXITED(wstatus) else 128 + sig
+        over = False
+        for path, limit in ((f"out/{i}.out", out_limit), (f"out/{i}.err", err_limit)):
+            try:
+                if os.path.getsize(path) > limit:
+                    os.truncate(path, limit)
+                    over = True
+            except OSError:
+                pass
+        oom_after = _oom_kills()
+
+        if over or sig == signal.SIGXFSZ:
+            status = "output_limit"
+        elif expired or sig == signal.SIGXCPU or cpu > cpu_ms:
+            status = "time_limit"
+        elif (ru.ru_maxrss > rss_kb or (0 <= oom_before < oom_after)
+              or (oom_before < 0 and sig == signal.SIGKILL)):
+            status = "memory_limit"
+        elif exit_code != 0:
+            status = "runtime_error"
+        else:
+            status = "ok"
+        line = f"{i} {status} {exit_code} {cpu} {ru.ru_maxrss} {wall} {output_digest(i)}\n"
+        os.write(results, line.encode())
+        if stop_on_failure and status != "ok":
+            break
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,329 @@
+/*
+ * executor/runner.c
+ *
+ * Runs one test inside the sandbox and reports what the user program cost:
+ *
+ *   runner [-t cpu_ms] [-w wall_ms] [-m rss_kb] [-o out_bytes] [-e err_bytes]
+ *          <stdin-file> -- command [args...]
+ *
+ * The command gets <stdin-file> as stdin and runs in its own process group.
+ * When it exits, a trailer line is appended to stderr:
+ *
+ *   __CODEARENA_STATS__ cpu_ms=<user+sys> rss_kb=<peak RSS> exit=<code> limit=<none|time|memory|output>
+ *
+ * Figures come from wait4() so they cover the user process only, not the
+ * container or the exec machinery. The exit status is passed through
+ * (128+signal when killed). SIGTERM (from `timeout`) is forwarded to the
+ * whole process group.
+ *
+ * Limits: CPU time is polled from /proc/<pid>/stat every 100 ms (the program
+ * plus the children it has reaped), which kills the group at the limit, and
+ * checked exactly after exit; RLIMIT_CPU stays as a backstop. The wall clock
+ * limit kills the group.
+ * Memory is checked against peak RSS, and an OOM kill by the container's
+ * cgroup (memory.events) is reported as a memory limit hit as well.
+ *
+ * The program's stdout/stderr are pipes that the runner copies through as
+ * they fill, up to -o / -e bytes; one byte more kills the program. Only the
+ * runner writes to the real stderr, so the trailer cannot be forged.
+ */
+#include <errno.h>
+#include <fcntl.h>
+#include <poll.h>
+#include <signal.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/resource.h>
+#include <sys/time.h>
+#include <sys/types.h>
+#include <sys/wait.h>
+#include <time.h>
+#include <unistd.h>
+
+#define STATS_MARKER "__CODEARENA_STATS__"
+
+static volatile pid_t child = 0;
+static volatile sig_atomic_t killed = 0;
+static volatile sig_atomic_t wall_expired = 0;
+static int cpu_expired = 0;
+
+static void on_term(int sig)
+{
+    (void)sig;
+    killed = 1;
+    if (child > 0)
+        kill(-child, SIGKILL);
+}
+
+static void on_alarm(int sig)
+{
+    (void)sig;
+    wall_expired = 1;
+    killed = 1;
+    if (child > 0)
+        kill(-child, SIGKILL);
+}
+
+/* oom_kill counter of the container's memory cgroup, or -1 if unavailable */
+static long oom_kills(void)
+{
+    static const char *paths[] = {
+        "/sys/fs/cgroup/memory.events",               /* cgroup v2 */
+        "/sys/fs/cgroup/memory/memory.oom_control",   /* cgroup v1 */
+    };
+    for (size_t i = 0; i < sizeof(paths) / sizeof(paths[0]); i++) {
+        FILE *f = fopen(paths[i], "r");
+        if (!f)
+            continue;
+        char key[64];
+        long val;
+        while (fscanf(f, "%63s %ld", key, &val) == 2) {
+            if (strcmp(key, "oom_kill") == 0) {
+                fclose(f);
+                return val;
+            }
+        }
+        fclose(f);
+    }
+    return -1;
+}
+
+static volatile sig_atomic_t output_exceeded = 0;
+
+struct stream {
+    int fd;         /* read end of the program's pipe, -1 once closed */
+    int out;        /* where it is copied to */
+    long left;      /* bytes still allowed, <0 for unlimited */
+};
+
+static void write_all(int fd, const char *buf, ssize_t n)
+{
+    while (n > 0) {
+        ssize_t w = write(fd, buf, (size_t)n);
+        if (w < 0) {
+            if (errno == EINTR)
+                continue;
+            return;
+        }
+        buf += w;
+        n -= w;
+    }
+}
+
+/* copy what is available on `s`; returns 0 once the stream is closed */
+static int pump(struct stream *s)
+{
+    char buf[65536];
+    ssize_t n = read(s->fd, buf, sizeof(buf));
+    if (n < 0 && (errno == EINTR || errno == EAGAIN))
+        return 1;
+    if (n <= 0) {
+        close(s->fd);
+        s->fd = -1;
+        return 0;
+    }
+    if (s->left >= 0 && n > s->left) {
+        write_all(s->out, buf, s->left);
+        s->left = 0;
+        output_exceeded = 1;
+        killed = 1;
+        kill(-child, SIGKILL);
+        close(s->fd);
+        s->fd = -1;
+        return 0;
+    }
+    write_all(s->out, buf, n);
+    if (s->left >= 0)
+        s->left -= n;
+    return 1;
+}
+
+static long to_ms(struct timeval tv)
+{
+    return tv.tv_sec * 1000L + tv.tv_usec / 1000L;
+}
+
+static long now_ms(void)
+{
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec * 1000L + ts.tv_nsec / 1000000L;
+}
+
+/* utime+stime+cutime+cstime of `pid` from /proc, in ms, or -1 if unavailable */
+static long proc_cpu_ms(pid_t pid)
+{
+    static long ticks = 0;
+    if (ticks <= 0)
+        ticks = sysconf(_SC_CLK_TCK);
+    char path[64], buf[1024];
+    snprintf(path, sizeof(path), "/proc/%d/stat", (int)pid);
+    int fd = open(path, O_RDONLY);
+    if (fd < 0)
+        return -1;
+    ssize_t n = read(fd, buf, sizeof(buf) - 1);
+    close(fd);
+    if (n <= 0 || ticks <= 0)
+        return -1;
+    buf[n] = 0;
+    /* the command name in field 2 may contain spaces and parentheses */
+    char *p = strrchr(buf, ')');
+    unsigned long utime, stime;
+    long cutime, cstime;
+    if (!p || sscanf(p + 1, " %*c %*d %*d %*d %*d %*d %*u %*u %*u %*u %*u %lu %lu %ld %ld",
+                     &utime, &stime, &cutime, &cstime) != 4)
+        return -1;
+    return (long)(utime + stime + cutime + cstime) * 1000L / ticks;
+}
+
+int main(int argc, char **argv)
+{
+    long cpu_limit_ms = 0, wall_limit_ms = 0, mem_limit_kb = 0;
+    long out_limit = -1, err_limit = -1;
+    int opt;
+    while ((opt = getopt(argc, argv, "+t:w:m:o:e:")) != -1) {
+        switch (opt) {
+        case 't': cpu_limit_ms = atol(optarg); break;
+        case 'w': wall_limit_ms = atol(optarg); break;
+        case 'm': mem_limit_kb = atol(optarg); break;
+        case 'o': out_limit = atol(optarg); break;
+        case 'e': err_limit = atol(optarg); break;
+        default: goto usage;
+        }
+    }
+    if (argc - optind < 3 || strcmp(argv[optind + 1], "--") != 0)
+        goto usage;
+    char *input = argv[optind];
+    char **cmd = &argv[optind + 2];
+
+    int in = open(input, O_RDONLY);
+    if (in < 0) {
+        perror(input);
+        return 2;
+    }
+
+    int out_pipe[2], err_pipe[2];
+    if (pipe(out_pipe) < 0 || pipe(err_pipe) < 0) {
+        perror("pipe");
+        return 2;
+    }
+
+    signal(SIGTERM, on_term);
+    signal(SIGALRM, on_alarm);
+    signal(SIGPIPE, SIG_IGN);
+    long oom_before = oom_kills();
+
+    pid_t pid = fork();
+    if (pid < 0) {
+        perror("fork");
+        return 2;
+    }
+    if (pid == 0) {
+        setpgid(0, 0);
+        signal(SIGTERM, SIG_DFL);
+        signal(SIGALRM, SIG_DFL);
+        if (cpu_limit_ms > 0) {
+            rlim_t secs = (rlim_t)((cpu_limit_ms + 999) / 1000 + 1);
+            struct rlimit rl = { secs, secs + 1 };
+            setrlimit(RLIMIT_CPU, &rl);
+        }
+        signal(SIGPIPE, SIG_DFL);
+        dup2(in, STDIN_FILENO);
+        dup2(out_pipe[1], STDOUT_FILENO);
+        dup2(err_pipe[1], STDERR_FILENO);
+        close(in);
+        close(out_pipe[0]); close(out_pipe[1]);
+        close(err_pipe[0]); close(err_pipe[1]);
+        execvp(cmd[0], cmd);
+        perror(cmd[0]);
+        _exit(127);
+    }
+    setpgid(pid, pid);
+    child = pid;
+    close(in);
+    close(out_pipe[1]);
+    close(err_pipe[1]);
+
+    if (wall_limit_ms > 0) {
+        struct itimerval it = { { 0, 0 }, { wall_limit_ms / 1000, (wall_limit_ms % 1000) * 1000 } };
+        setitimer(ITIMER_REAL, &it, NULL);
+    }
+
+    struct stream streams[2] = {
+        { out_pipe[0], STDOUT_FILENO, out_limit },
+        { err_pipe[0], STDERR_FILENO, err_limit },
+    };
+    int status = 0, exited = 0;
+    struct rusage ru;
+    long cpu_checked = now_ms();
+
+    /* copy output until the program exits and both pipes close; a descendant
+     * that keeps them open is not waited for once the program has exited.
+     * Closed pipes are -1 and ignored by poll(), which then just sleeps. */
+    while (!exited || streams[0].fd >= 0 || streams[1].fd >= 0) {
+        struct pollfd pfd[2];
+        for (int i = 0; i < 2; i++) {
+            pfd[i].fd = streams[i].fd;
+            pfd[i].events = POLLIN;
+        }
+        int r = poll(pfd, 2, exited ? 0 : 100);
+        if (r < 0 && errno != EINTR)
+            break;
+        for (int i = 0; r > 0 && i < 2; i++)
+            if (pfd[i].revents && streams[i].fd >= 0)
+                pump(&streams[i]);
+        if (exited && r <= 0)
+            break;
+        if (!exited && wait4(pid, &status, WNOHANG, &ru) == pid) {
+            exited = 1;
+            kill(-pid, SIGKILL);
+        }
+        if (!exited && cpu_limit_ms > 0 && now_ms() - cpu_checked >= 100) {
+            cpu_checked = now_ms();
+            if (proc_cpu_ms(pid) > cpu_limit_ms) {
+                cpu_expired = 1;
+                killed = 1;
+                kill(-pid, SIGKILL);
+            }
+        }
+    }
+    for (int i = 0; i < 2; i++)
+        if (streams[i].fd >= 0)
+            close(streams[i].fd);
+
+    while (!exited && wait4(pid, &status, 0, &ru) < 0) {
+        if (errno != EINTR) {
+            perror("wait4");
+            return 2;
+        }
+    }
+    /* nothing the program started may outlive it */
+    kill(-pid, SIGKILL);
+    struct itimerval off = { { 0, 0 }, { 0, 0 } };
+    setitimer(ITIMER_REAL, &off, NULL);
+
+    long cpu_ms = to_ms(ru.ru_utime) + to_ms(ru.ru_stime);
+    long oom_after = oom_kills();
+    int sig = WIFSIGNALED(status) ? WTERMSIG(status) : 0;
+
+    const char *limit = "none";
+    if (output_exceeded)
+        limit = "output";
+    else if (wall_expired || cpu_expired || sig == SIGXCPU || (cpu_limit_ms > 0 && cpu_ms > cpu_limit_ms))
+        limit = "time";
+    else if ((mem_limit_kb > 0 && ru.ru_maxrss > mem_limit_kb) ||
+             (oom_before >= 0 && oom_after > oom_before) ||
+             (oom_before < 0 && sig == SIGKILL && !killed))
+        limit = "memory";
+
+    int code = WIFEXITED(status) ? WEXITSTATUS(status) : 128 + sig;
+    fprintf(stderr, "\n" STATS_MARKER " cpu_ms=%ld rss_kb=%ld exit=%d limit=%s\n",
+            cpu_ms, ru.ru_maxrss, code, limit);
+    return code;
+
+usage:
+    fprintf(stderr, "usage: runner [-t cpu_ms] [-w wall_ms] [-m rss_kb] [-o out_bytes] [-e err_bytes] "
+                    "<stdin-file> -- command [args...]\n");
+    return 2;
+}
@@ -0,0 +1,15 @@
+# executor/tests/__init__.py
+# main.py reads its configuration at import: run every language on the
+# process backend, with the job and compile-cache dirs somewhere disposable,
+# so importing it needs neither Docker nor root.
+import os, sys, tempfile
+
+_scratch = tempfile.mkdtemp(prefix="executor-tests-")
+os.environ.setdefault("SANDBOX_BACKEND", "process")
+os.environ.setdefault("PROCESS_SANDBOX_ALLOW_ROOTLESS", "1")
+os.environ.setdefault("PROCESS_SANDBOX_ROOT", os.path.join(_scratch, "jobs"))
+os.environ.setdefault("COMPILE_CACHE_DIR", os.path.join(_scratch, "compile-cache"))
+
+EXECUTOR_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if EXECUTOR_DIR not in sys.path:
+    sys.path.insert(0, EXECUTOR_DIR)
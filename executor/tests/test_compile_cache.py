@@ -0,0 +1,117 @@
+import io, os, shutil, tarfile, tempfile, unittest
+from contextlib import contextmanager
+from unittest import mock
+
+import main
+from backends import ExecResult
+from compile_cache import CompileCache
+
+
+def _build(size: int) -> bytes:
+    """Tar of a build/ directory holding one file of `size` bytes."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        info = tarfile.TarInfo("build/main")
+        info.size = size
+        tar.addfile(info, io.BytesIO(b"x" * size))
+    return buf.getvalue()
+
+
+class CompileCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def cache(self, max_bytes=250):
+        return CompileCache(self.root, max_bytes)
+
+    def store(self, cache, key, size=100):
+        cache.store_archive(key, [_build(size)], "build")
+
+    def test_store_and_lookup(self):
+        cache = self.cache()
+        self.assertIsNone(cache.lookup("a"))
+        self.store(cache, "a")
+        with open(os.path.join(cache.lookup("a"), "main"), "rb") as f:
+            self.assertEqual(f.read(), b"x" * 100)
+        self.assertEqual(os.listdir(os.path.join(self.root, ".staging")), [])
+
+    def test_evicts_least_recently_used(self):
+        cache = self.cache()
+        self.store(cache, "a")
+        self.store(cache, "b")
+        cache.lookup("a")
+        self.store(cache, "c")
+        self.assertEqual((cache.lookup("b"), cache._total), (None, 200))
+        self.assertIsNotNone(cache.lookup("a"))
+        self.assertIsNotNone(cache.lookup("c"))
+
+    def test_pinned_entry_is_kept(self):
+        cache = self.cache()
+        self.store(cache, "a")
+        self.store(cache, "b")
+        with cache.pinned("a") as path:
+            cache.lookup("b")
+            self.store(cache, "c")
+            self.store(cache, "d")
+            self.assertTrue(os.path.isdir(path))
+        self.assertEqual(sorted(cache._index), ["a", "d"])
+        self.store(cache, "e")  # unpinned again: evictable
+        self.assertEqual(sorted(cache._index), ["d", "e"])
+
+    def test_pinned_miss(self):
+        with self.cache().pinned("a") as path:
+            self.assertIsNone(path)
+        with CompileCache(self.root, 0).pinned("a") as path:
+            self.assertIsNone(path)
+
+    def test_index_rebuilt_on_start(self):
+        cache = self.cache()
+        for key in "abc":
+            self.store(cache, key, 50)
+        os.utime(os.path.join(self.root, "a"), (1, 1))  # least recently used before the restart
+        cache = self.cache()
+        self.assertEqual((list(cache._index)[0], cache._total), ("a", 150))
+        self.store(cache, "d", 150)
+        self.assertIsNone(cache.lookup("a"))
+
+
+class _Sandbox:
+    def __init__(self):
+        self.archives, self.commands = [], []
+
+    def put(self, archive):
+        self.archives.append(archive)
+
+    def get(self, path):
+        return _build(10)
+
+    def exec(self, argv, workdir):
+        self.commands.append(argv)
+        return ExecResult(0, b"", b"")
+
+    def set_memory(self, mb):
+        pass
+
+
+class RunBatchCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.sandbox = _Sandbox()
+        backend = mock.Mock(acquire=mock.Mock(return_value=self.sandbox))
+        patcher = mock.patch.dict(main.backends, {"cpp": backend})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_vanished_entry_recompiles(self):
+        @contextmanager
+        def gone(key):
+            yield os.path.join(tempfile.gettempdir(), "no-such-entry")
+
+        with mock.patch.object(main.compile_cache, "pinned", gone):
+            out = main.run_batch("cpp", "int main(){}", [""])
+        self.assertFalse(out["compile_cached"])
+        self.assertIn(main.compile_command("cpp"), " ".join(self.sandbox.commands[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
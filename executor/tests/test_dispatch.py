@@ -0,0 +1,59 @@
+import asyncio, threading, time, unittest
+
+from dispatch import JobQueue
+
+
+class JobQueueTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.jobs = JobQueue(2)
+        self.addCleanup(self.jobs.shutdown)
+
+    async def test_loop_keeps_running(self):
+        ticks = []
+
+        async def tick():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        (result, waited), _ = await asyncio.gather(self.jobs.run(time.sleep, 0.1), tick())
+        self.assertIsNone(result)
+        self.assertEqual(len(ticks), 5)  # all while the blocking call ran
+        self.assertLess(ticks[-1] - ticks[0], 0.1)
+
+    async def test_bounded_and_fifo(self):
+        gate, started, lock = threading.Event(), [], threading.Lock()
+        peak = [0]
+
+        def job(n):
+            with lock:
+                started.append(n)
+                peak[0] = max(peak[0], self.jobs.running)
+            gate.wait(5)
+            return n
+
+        tasks = [asyncio.ensure_future(self.jobs.run(job, n)) for n in range(5)]
+        while len(started) < 2:
+            await asyncio.sleep(0.01)
+        stats = self.jobs.stats()
+        self.assertEqual((stats["running"], stats["queue_depth"]), (2, 3))
+        gate.set()
+        results = await asyncio.gather(*tasks)
+        self.assertEqual([r for r, _ in results], list(range(5)))
+        self.assertEqual(sorted(started[:2]), [0, 1])
+        self.assertEqual(sorted(started[2:]), [2, 3, 4])
+        self.assertEqual(peak[0], 2)
+        self.assertGreater(results[4][1], 0)  # waited for a worker
+
+    async def test_errors_propagate(self):
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            await self.jobs.run(fail)
+        stats = self.jobs.stats()
+        self.assertEqual((stats["running"], stats["queue_depth"], stats["completed"]), (0, 0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
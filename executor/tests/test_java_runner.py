@@ -0,0 +1,25 @@
+import unittest
+from unittest import mock
+
+import main
+
+
+class JavaRunnerTests(unittest.TestCase):
+    def runner(self):
+        return main.persistent_runner("java", 3, 1000, 2000, 256, 256, False)
+
+    def test_plain_by_default(self):
+        self.assertEqual(main.JAVA_RUNNER, "plain")
+        self.assertIsNone(self.runner())
+
+    def test_persistent_when_configured(self):
+        # for trusted code only; any source then goes through JudgeRunner
+        with mock.patch.object(main, "JAVA_RUNNER", "persistent"):
+            command, startup_ms, _ = self.runner()
+        argv = command(1)
+        self.assertEqual(argv[argv.index("JudgeRunner") + 1:][:3], [main.BUILD_DIR, "1", "3"])
+        self.assertEqual(startup_ms, main.JAVA_RUNNER_STARTUP_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import itertools, time, unittest
+from unittest import mock
+
+import docker
+
+from pool import POOL_LABEL, SCRUB_COMMAND, ContainerPool
+
+
+class FakeContainer:
+    _ids = itertools.count(1)
+
+    def __init__(self, labels=None, scrub_exit=0):
+        self.id = f"c{next(self._ids)}"
+        self.labels = labels or {}
+        self.status = "running"
+        self.removed = False
+        self.scrub_exit = scrub_exit
+        self.execs = []
+
+    def reload(self):
+        pass
+
+    def remove(self, force=False):
+        self.removed = True
+        self.status = "removed"
+
+    def exec_run(self, cmd, user=None):
+        self.execs.append((cmd, user))
+        return mock.Mock(exit_code=self.scrub_exit)
+
+
+class FakeClient:
+    def __init__(self, stale=()):
+        self.started, self.stale = [], list(stale)
+        self.containers = mock.Mock(run=self.run, list=lambda **kw: self.stale)
+        self.images = mock.Mock()
+
+    def run(self, image, command, labels, detach, **kwargs):
+        container = FakeContainer(labels)
+        self.started.append(container)
+        return container
+
+
+class ContainerPoolTests(unittest.TestCase):
+    def pool(self, client, size=2, max_uses=3):
+        return ContainerPool(client, "cpp", "img", size=size, max_uses=max_uses,
+                             run_kwargs={"network_mode": "none"})
+
+    def wait_idle(self, pool, n):
+        deadline = time.monotonic() + 5
+        while pool._idle.qsize() < n and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(pool._idle.qsize(), n)
+
+    def test_prewarm(self):
+        stale = FakeContainer({POOL_LABEL: "cpp"})
+        client = FakeClient([stale])
+        pool = self.pool(client)
+        pool.prewarm()
+        self.assertTrue(stale.removed)
+        self.assertEqual(pool.stats(), {"image": "img", "idle": 2, "live": 2, "size": 2})
+        self.assertEqual(client.started[0].labels, {POOL_LABEL: "cpp"})
+
+    def test_missing_image_is_pulled(self):
+        client = FakeClient()
+        client.images.get.side_effect = docker.errors.ImageNotFound("no")
+        self.pool(client).prewarm()
+        client.images.pull.assert_called_once_with("img")
+
+    def test_acquire_skips_dead_containers(self):
+        client = FakeClient()
+        pool = self.pool(client)
+        pool.prewarm()
+        dead, alive = client.started
+        dead.status = "exited"
+        self.assertIs(pool.acquire(), alive)
+        self.assertTrue(dead.removed)
+        self.assertNotIn(pool.acquire(), (dead, alive))  # empty: started on demand
+
+    def test_release_scrubs_and_recycles(self):
+        pool = self.pool(FakeClient(), size=1)
+        pool.prewarm()
+        container = pool.acquire()
+        pool.release(container)
+        self.assertEqual(container.execs, [(SCRUB_COMMAND, "coder")])
+        self.assertIs(pool.acquire(), container)
+
+    def test_failed_scrub_replaces(self):
+        client = FakeClient()
+        pool = self.pool(client, size=1)
+        pool.prewarm()
+        container = pool.acquire()
+        container.scrub_exit = 1
+        pool.release(container)
+        self.assertTrue(container.removed)
+        self.wait_idle(pool, 1)
+        self.assertIsNot(pool.acquire(), container)
+
+    def test_worn_out_replaced(self):
+        pool = self.pool(FakeClient(), size=1, max_uses=2)
+        pool.prewarm()
+        container = pool.acquire()
+        pool.release(container)
+        self.assertIs(pool.acquire(), container)
+        pool.release(container)  # second use: retired without a scrub
+        self.assertTrue(container.removed)
+        self.assertEqual(len(container.execs), 1)
+        self.wait_idle(pool, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import io, os, shutil, tarfile, tempfile, unittest
+from unittest import mock
+
+import process_sandbox
+from process_sandbox import ProcessBackend, ProcessSandbox
+
+
+def _archive(**members):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name.replace("__", "/"))
+            info.size, info.mode = len(data), 0o755
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+class ProcessSandboxTests(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        self.sandbox = ProcessSandbox(0, self.path, None, None)
+
+    def write(self, name, data):
+        os.makedirs(os.path.dirname(os.path.join(self.path, name)), exist_ok=True)
+        with open(os.path.join(self.path, name), "wb") as f:
+            f.write(data)
+
+    def test_stream_in_order(self):
+        self.write("job/out/1.out", b"x" * 70000)
+        self.write("job/out/0.out", b"first")
+        os.symlink("/etc/passwd", os.path.join(self.path, "job/out/0.err"))
+        paths = ["job/out/0.out", "job/out/0.err", "job/out/1.out", "job/out/1.err"]
+        data = b"".join(self.sandbox.stream(paths))
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            self.assertEqual(tar.getnames(), ["job/out/0.out", "job/out/1.out"])  # no links followed
+            self.assertEqual(tar.extractfile("job/out/1.out").read(), b"x" * 70000)
+
+    def test_put_refuses_escapes(self):
+        for name, kind in [("../x", tarfile.REGTYPE), ("/etc/x", tarfile.REGTYPE),
+                           ("job/link", tarfile.SYMTYPE), ("job/hard", tarfile.LNKTYPE)]:
+            buf = io.BytesIO()
+            with tarfile.open(fileobj=buf, mode="w") as tar:
+                info = tarfile.TarInfo(name)
+                info.type, info.linkname = kind, "/etc/passwd"
+                tar.addfile(info)
+            with self.subTest(name=name), self.assertRaises(RuntimeError):
+                self.sandbox.put(buf.getvalue())
+
+
+class ProcessBackendTests(unittest.TestCase):
+    def setUp(self):
+        # not under /tmp, which the job dir covers anyway
+        self.root = tempfile.mkdtemp(dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+        os.chmod(self.root, 0o755)
+        self.addCleanup(shutil.rmtree, self.root)
+        # slots share this host's cgroup tree only in production
+        patcher = mock.patch.object(process_sandbox, "_cgroup_root", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_refuses_rootless(self):
+        env = {k: v for k, v in os.environ.items() if k != "PROCESS_SANDBOX_ALLOW_ROOTLESS"}
+        with mock.patch.object(process_sandbox.os, "geteuid", return_value=1000), \
+                mock.patch.dict(os.environ, env, clear=True), self.assertRaises(RuntimeError):
+            ProcessBackend(os.path.join(self.root, "jobs"), 1, 20000)
+
+    def test_slots(self):
+        backend = ProcessBackend(os.path.join(self.root, "jobs"), 2, 20000)
+        a, b = backend.acquire(), backend.acquire()
+        self.assertNotEqual(a.path, b.path)
+        self.assertEqual(backend.stats()["idle"], 0)
+        if backend.privileged:
+            self.assertEqual({a.uid, b.uid}, {20000, 20001})
+        backend.release(a)
+        self.assertFalse(os.path.exists(a.path))
+        self.assertEqual(backend.stats()["idle"], 1)
+
+    def test_isolation(self):
+        secret = os.path.join(self.root, "cache")
+        os.makedirs(secret)
+        with open(os.path.join(secret, "entry"), "w") as f:
+            f.write("cached build")
+        backend = ProcessBackend(os.path.join(self.root, "jobs"), 1, 20000, hide=[secret])
+        sandbox = backend.acquire()
+        self.addCleanup(backend.release, sandbox)
+        sandbox.put(_archive(job__data=b"hello"))
+        script = (f"cat data; echo; echo pid=$$; ls -A {secret} | wc -l; "
+                  f"ls -A {backend.root} | wc -l; id -u; cat /proc/net/dev | grep -c :")
+        res = sandbox.exec(["/bin/sh", "-c", script], "/tmp/job")
+        if res.exit_code and b"sandbox:" in res.stderr:
+            self.skipTest(f"namespaces unavailable here: {res.stderr.decode().strip()}")
+        lines = res.stdout.decode().split()
+        self.assertEqual(lines[:4], ["hello", "pid=1", "0", "0"])  # hidden dirs are empty
+        if backend.privileged:
+            self.assertEqual(lines[4], str(sandbox.uid))
+        self.assertEqual(lines[5], "1")  # loopback only
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import io, os, shutil, subprocess, sys, tarfile, tempfile, textwrap, unittest
+from unittest import mock
+
+from . import EXECUTOR_DIR
+import main
+from backends import ExecResult
+
+PYRUNNER = os.path.join(EXECUTOR_DIR, "pyrunner.py")
+NOBODY = 65534
+
+
+def _digest(out, err=b""):
+    return main._output_digest(main._blake(out).digest(), main._blake(err).digest())
+
+
+def _line(i, status="ok", digest=None):
+    return f"{i} {status} 0 1 1024 2" + (f" {digest}" if digest else "")
+
+
+class ForkServerTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        os.chmod(self.dir, 0o777)
+
+    def run_tests(self, script, inputs, stop_on_failure=False):
+        with open(os.path.join(self.dir, "main.py"), "w") as f:
+            f.write(textwrap.dedent(script))
+        for i, data in enumerate(inputs):
+            with open(os.path.join(self.dir, f"input_{i}.txt"), "w") as f:
+                f.write(data)
+        # as an unprivileged uid, as in the sandbox: root may read any process's fds
+        python, drop = sys.executable, None
+        if os.geteuid() == 0:
+            python = shutil.which("python3", path="/usr/local/bin:/usr/bin:/bin") or python
+            drop = lambda: (os.setgid(NOBODY), os.setuid(NOBODY))
+        shutil.copy(PYRUNNER, self.dir)
+        argv = [python, "pyrunner.py", "main.py", "0", str(len(inputs)), "2000", "4000",
+                "65536", "65536", "1" if stop_on_failure else "0", str(256 * 1024)]
+        # the runner's stdout is a pipe of the sandbox user's own, as under runner.c
+        res = subprocess.run(["sh", "-c", '"$@" | cat', "sh", *argv],
+                             cwd=self.dir, capture_output=True, timeout=60, preexec_fn=drop)
+        return [line.split() for line in res.stdout.decode().splitlines()]
+
+    def output(self, i, ext="out"):
+        with open(os.path.join(self.dir, "out", f"{i}.{ext}"), "rb") as f:
+            return f.read()
+
+    def test_runs_each_test(self):
+        lines = self.run_tests("""
+            import sys
+            n = int(input())
+            print(n * 2)
+            if n == 3:
+                sys.exit("three")
+        """, ["1\n", "3\n", "5\n"])
+        self.assertEqual([(p[0], p[1], p[2]) for p in lines],
+                         [("0", "ok", "0"), ("1", "runtime_error", "1"), ("2", "ok", "0")])
+        self.assertEqual((self.output(0), self.output(1), self.output(1, "err")), (b"2\n", b"6\n", b"three\n"))
+        for i, parts in enumerate(lines):
+            self.assertEqual(parts[6], _digest(self.output(i), self.output(i, "err")))
+
+    def test_stop_on_failure(self):
+        lines = self.run_tests("raise ValueError", ["", ""], stop_on_failure=True)
+        self.assertEqual([(p[0], p[1]) for p in lines], [("0", "runtime_error")])
+        self.assertIn(b"ValueError", self.output(0, "err"))
+
+    def test_results_out_of_reach(self):
+        lines = self.run_tests("""
+            import os, signal
+            forged = "1 ok 0 1 1 1\\n"
+            reached = []
+            for path in [f"/proc/{os.getppid()}/fd/{fd}" for fd in range(10)] + ["/dev/stdout"]:
+                try:
+                    with open(path, "w") as f:
+                        f.write(forged)
+                    reached.append(path)
+                except OSError:
+                    pass
+            for fd in range(3, 10):
+                try:
+                    os.write(fd, forged.encode())
+                    reached.append(fd)
+                except OSError:
+                    pass
+            print(reached)
+        """, ["", ""])
+        self.assertEqual([p[0] for p in lines], ["0", "1"])
+        self.assertEqual(self.output(0), b"['/dev/stdout']\n")  # its own stdout, out/0.out
+
+    def test_later_test_rewrites_output(self):
+        lines = self.run_tests("""
+            n = int(input())
+            print(n)
+            if n == 2:
+                with open("out/0.out", "w") as f:
+                    f.write("forged\\n")
+        """, ["1\n", "2\n"])
+        self.assertNotEqual(lines[0][6], _digest(self.output(0), self.output(0, "err")))
+
+
+class FakeSandbox:
+    """Replays one ExecResult per runner start and serves `files` as out/."""
+
+    def __init__(self, runs, files):
+        self.runs, self.files, self.commands = list(runs), files, []
+
+    def exec(self, argv, workdir):
+        self.commands.append(argv)
+        return self.runs.pop(0)
+
+    def stream(self, paths):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            for path in paths:
+                data = self.files.get(os.path.basename(path))
+                if data is not None:
+                    info = tarfile.TarInfo(path)
+                    info.size = len(data)
+                    tar.addfile(info, io.BytesIO(data))
+        data = buf.getvalue()
+        return (data[k:k + 1000] for k in range(0, len(data), 1000))
+
+
+def _ok(*lines):
+    return ExecResult(0, "".join(line + "\n" for line in lines).encode(), b"")
+
+
+class RunPersistentTests(unittest.TestCase):
+    def run_persistent(self, sandbox, n, stop_on_failure=False):
+        return main._run_persistent(sandbox, n, lambda start: ["runner", str(start)], 1000, 2000,
+                                    256, 100, 10, stop_on_failure)
+
+    def test_restart_after_runner_death(self):
+        killed = ExecResult(137, _line(0).encode() + b"\n", f"boom\n{main.STATS_MARKER} limit=time cpu_ms=3000\n".encode())
+        sandbox = FakeSandbox([killed, _ok(_line(2))], {"0.out": b"a", "2.out": b"c"})
+        results = self.run_persistent(sandbox, 3)
+        self.assertEqual([r["status"] for r in results], ["ok", "time_limit", "ok"])
+        self.assertEqual([r["stdout"] for r in results], ["a", "", "c"])
+        self.assertEqual([c[-1] for c in sandbox.commands], ["0", "2"])
+
+    def test_out_of_sequence_lines_ignored(self):
+        # a line for a later test, or past the batch, ends what is taken from this run
+        sandbox = FakeSandbox([_ok(_line(0), _line(2), _line(1)), _ok(_line(7), _line(1)), _ok(_line(2))], {})
+        results = self.run_persistent(sandbox, 3)
+        # the second run reported nothing for test 1 before its stray line
+        self.assertEqual([r["status"] for r in results], ["ok", "runtime_error", "ok"])
+        self.assertEqual([c[-1] for c in sandbox.commands], ["0", "1", "2"])
+
+    def test_rewritten_output_rejected(self):
+        files = {"0.out": b"forged", "0.err": b"", "1.out": b"b", "1.err": b""}
+        digests = [_digest(b"real"), _digest(b"b")]
+        sandbox = FakeSandbox([_ok(_line(0, digest=digests[0]), _line(1, digest=digests[1]))], files)
+        first, second = self.run_persistent(sandbox, 2)
+        self.assertEqual((first["status"], first["stdout"]), ("runtime_error", ""))
+        self.assertEqual((second["status"], second["stdout"]), ("ok", "b"))
+
+    def test_batch_output_cap(self):
+        files = {"0.out": b"a" * 600, "1.out": b"b" * 600, "2.out": b"c" * 600, "1.err": b"oops"}
+        sandbox = FakeSandbox([_ok(_line(0), _line(1), _line(2))], files)
+        with mock.patch.object(main, "BATCH_OUTPUT_LIMIT_BYTES", 1000):
+            results = self.run_persistent(sandbox, 3)
+        self.assertEqual([(len(r["stdout"]), r["truncated"]) for r in results],
+                         [(600, False), (400, True), (0, True)])
+        self.assertEqual(results[1]["stderr"], "oops")
+
+
+if __name__ == "__main__":
+    unittest.main()
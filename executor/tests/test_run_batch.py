@@ -0,0 +1,158 @@
+import io, os, tarfile, tempfile, unittest, uuid
+from unittest import mock
+
+import main
+from backends import ExecResult
+
+
+class FakeSandbox:
+    """Answers each run with the output `reply(argv)` gives."""
+
+    def __init__(self, reply):
+        self.reply, self.archives, self.commands = reply, [], []
+
+    def put(self, archive):
+        self.archives.append(archive)
+
+    def exec(self, argv, workdir):
+        self.commands.append(argv)
+        return self.reply(argv)
+
+    def get(self, path):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            info = tarfile.TarInfo(f"{path}/main")
+            info.size = 3
+            tar.addfile(info, io.BytesIO(b"bin"))
+        return buf.getvalue()
+
+    def set_memory(self, mb):
+        pass
+
+
+def _input(argv):
+    """Index of the test a run command is for."""
+    return int(argv[argv.index("--") - 1].split("_")[1].split(".")[0])
+
+
+def _stats(**stats):
+    return ("\n" + main.STATS_MARKER + " " + " ".join(f"{k}={v}" for k, v in stats.items()) + "\n").encode()
+
+
+def _compiling(argv):
+    return "mkdir -p" in " ".join(argv)
+
+
+class JobArchiveTests(unittest.TestCase):
+    def members(self, archive):
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            return {m.name: (m.mode, tar.extractfile(m).read() if m.isfile() else None)
+                    for m in tar.getmembers()}
+
+    def test_job_files(self):
+        members = self.members(main._job_archive({"main.cpp": "int main(){}", "input_0.txt": "é"}, None))
+        self.assertEqual(members, {"job": (0o755, None), "job/main.cpp": (0o755, b"int main(){}"),
+                                   "job/input_0.txt": (0o755, "é".encode())})
+
+    def test_cached_build(self):
+        with tempfile.TemporaryDirectory() as build:
+            with open(os.path.join(build, "main"), "wb") as f:
+                f.write(b"bin")
+            os.chmod(os.path.join(build, "main"), 0o700)
+            members = self.members(main._job_archive({"main.cpp": ""}, build))
+        self.assertEqual((members["build"][0], members["build/main"]), (0o755, (0o755, b"bin")))
+
+    def test_one_put_per_batch(self):
+        sandbox = FakeSandbox(lambda argv: ExecResult(0, b"", b""))
+        backend = mock.Mock(acquire=mock.Mock(return_value=sandbox))
+        with mock.patch.dict(main.backends, {"cpp": backend}):
+            main.run_batch("cpp", f"// {uuid.uuid4()}", ["1", "2"])
+        self.assertEqual(len(sandbox.archives), 1)
+        self.assertIn("job/input_1.txt", self.members(sandbox.archives[0]))
+        backend.release.assert_called_once_with(sandbox)
+
+    def test_sandbox_workdir_is_tmpfs(self):
+        self.assertTrue(main.SANDBOX_RUN_KWARGS["read_only"])
+        self.assertIn("/tmp", main.SANDBOX_RUN_KWARGS["tmpfs"])
+        self.assertTrue(main.JOB_DIR.startswith("/tmp/") and main.BUILD_DIR.startswith("/tmp/"))
+
+
+class RunBatchTests(unittest.TestCase):
+    def use(self, lang, sandbox):
+        backend = mock.Mock(acquire=mock.Mock(return_value=sandbox))
+        patcher = mock.patch.dict(main.backends, {lang: backend})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return backend
+
+    def source(self):
+        return f"// {uuid.uuid4()}\nint main() {{}}\n"  # a compile cache miss
+
+    def test_compile_once(self):
+        sandbox = FakeSandbox(lambda argv: ExecResult(0, b"" if _compiling(argv) else b"%d" % _input(argv), b""))
+        self.use("cpp", sandbox)
+        code = self.source()
+        out = main.run_batch("cpp", code, ["a", "b", "c"])
+        self.assertEqual((out["compile_error"], out["compile_cached"]), ("", False))
+        self.assertEqual([r["stdout"] for r in out["results"]], ["0", "1", "2"])
+        self.assertEqual([_compiling(c) for c in sandbox.commands], [True, False, False, False])
+
+        # the same source again: the build comes from the compile cache
+        sandbox.commands.clear()
+        out = main.run_batch("cpp", code, ["a"])
+        self.assertTrue(out["compile_cached"])
+        self.assertEqual([_compiling(c) for c in sandbox.commands], [False])
+
+    def test_compile_error(self):
+        self.use("cpp", FakeSandbox(lambda argv: ExecResult(1, b"", b"main.cpp:1: error")))
+        out = main.run_batch("cpp", self.source(), ["a", "b"])
+        self.assertEqual((out["compile_error"], out["results"]), ("main.cpp:1: error", []))
+
+    def test_statuses(self):
+        replies = [ExecResult(0, b"", _stats(cpu_ms=12, rss_kb=3000)),
+                   ExecResult(9, b"", b"Killed" + _stats(limit="memory", cpu_ms=5, rss_kb=300000)),
+                   ExecResult(main.TIMEOUT_EXIT_CODE, b"", b""),
+                   ExecResult(0, b"", _stats(limit="output")),
+                   ExecResult(3, b"", b"boom")]
+        self.use("cpp", FakeSandbox(lambda argv: ExecResult(0, b"", b"") if _compiling(argv)
+                                    else replies[_input(argv)]))
+        results = main.run_batch("cpp", self.source(), [""] * 5)["results"]
+        self.assertEqual([r["status"] for r in results],
+                         ["ok", "memory_limit", "time_limit", "output_limit", "runtime_error"])
+        self.assertEqual((results[0]["time_ms"], results[0]["memory_kb"]), (12, 3000))
+        self.assertEqual((results[1]["stderr"], results[1]["memory_kb"]), ("Killed", 300000))
+        self.assertTrue(results[2]["timed_out"])
+
+    def test_stop_on_failure(self):
+        sandbox = FakeSandbox(lambda argv: ExecResult(0 if _compiling(argv) or _input(argv) != 1 else 1, b"", b""))
+        self.use("cpp", sandbox)
+        results = main.run_batch("cpp", self.source(), ["", "", ""], stop_on_failure=True)["results"]
+        self.assertEqual([r["status"] for r in results], ["ok", "runtime_error"])
+
+    def test_limits(self):
+        sandbox = FakeSandbox(lambda argv: ExecResult(0, b"", b""))
+        self.use("cpp", sandbox)
+        with mock.patch.dict(main.os.environ, {"TIME_MULTIPLIER_CPP": "2"}):
+            main.run_batch("cpp", self.source(), [""], time_limit=1.5, memory_limit=64)
+        run = sandbox.commands[-1]
+        flags = run[run.index(main.RUNNER) + 1:run.index("--") - 1]
+        limits = dict(zip(flags[::2], flags[1::2]))
+        self.assertEqual((limits["-t"], limits["-m"]), ("3000", str(64 * 1024)))
+        self.assertGreaterEqual(int(limits["-w"]), 4000)
+
+    def test_batch_output_cap(self):
+        def reply(argv):
+            n = _input(argv)
+            return ExecResult(0, bytes([ord("a") + n]) * 600, b"")
+
+        self.use("python", FakeSandbox(reply))
+        with mock.patch.object(main, "PYTHON_RUNNER", "plain"), \
+                mock.patch.object(main, "BATCH_OUTPUT_LIMIT_BYTES", 1000):
+            results = main.run_batch("python", "", ["", "", ""])["results"]
+        self.assertEqual([(r["stdout"][:1], len(r["stdout"]), r["truncated"]) for r in results],
+                         [("a", 600, False), ("b", 400, True), ("", 0, True)])
+        self.assertEqual([r["status"] for r in results], ["ok"] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
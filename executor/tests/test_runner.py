@@ -0,0 +1,84 @@
+import os, shutil, signal, subprocess, sys, tempfile, unittest
+
+from . import EXECUTOR_DIR
+import main
+
+GCC = shutil.which("gcc")
+
+
+@unittest.skipUnless(GCC, "needs gcc to build runner.c")
+class RunnerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.mkdtemp()
+        cls.runner = os.path.join(cls.dir, "runner")
+        subprocess.run([GCC, "-O2", "-o", cls.runner, os.path.join(EXECUTOR_DIR, "runner.c")], check=True)
+        cls.input = os.path.join(cls.dir, "input.txt")
+        with open(cls.input, "w") as f:
+            f.write("7\n")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.dir)
+
+    def run_python(self, code, *limits):
+        res = subprocess.run([self.runner, *limits, self.input, "--", sys.executable, "-c", code],
+                             capture_output=True, timeout=30)
+        err, stats = main._split_stats(res.stderr.decode())
+        return res.returncode, res.stdout, err, stats
+
+    def test_passes_through(self):
+        code, out, err, stats = self.run_python("import sys; print(int(input()) * 6); sys.exit(3)")
+        self.assertEqual((code, out, err), (3, b"42\n", ""))
+        self.assertEqual((stats["exit"], stats["limit"]), (3, "none"))
+
+    def test_killed_by_signal(self):
+        code, _, _, stats = self.run_python("import os, signal; os.kill(os.getpid(), signal.SIGSEGV)")
+        self.assertEqual((code, stats["exit"]), (128 + signal.SIGSEGV, 128 + signal.SIGSEGV))
+
+    def test_cpu_time(self):
+        _, _, _, stats = self.run_python("import time\nt = time.process_time()\nwhile time.process_time() - t < 0.3: pass")
+        self.assertGreaterEqual(stats["cpu_ms"], 280)
+        self.assertLess(stats["cpu_ms"], 1500)
+
+    def test_peak_memory(self):
+        _, _, _, small = self.run_python("pass")
+        _, _, _, big = self.run_python("x = b'x' * (64 << 20)")
+        self.assertGreaterEqual(big["rss_kb"] - small["rss_kb"], 60 * 1024)
+
+    def test_cpu_limit(self):
+        code, _, _, stats = self.run_python("while True: pass", "-t", "300", "-w", "10000")
+        self.assertEqual(stats["limit"], "time")
+        self.assertNotEqual(code, 0)
+        self.assertLess(stats["cpu_ms"], 1500)
+
+    def test_wall_limit(self):
+        _, _, _, stats = self.run_python("import time; time.sleep(10)", "-t", "1000", "-w", "300")
+        self.assertEqual(stats["limit"], "time")
+        self.assertLess(stats["cpu_ms"], 300)
+
+    def test_memory_limit(self):
+        _, _, _, stats = self.run_python("x = b'x' * (64 << 20)", "-m", str(32 * 1024))
+        self.assertEqual(stats["limit"], "memory")
+        self.assertEqual(main._status(0, stats), "memory_limit")
+
+    def test_within_limits(self):
+        _, _, _, stats = self.run_python("print(1)", "-t", "2000", "-w", "4000", "-m", str(256 * 1024))
+        self.assertEqual(stats["limit"], "none")
+
+    def test_output_limit(self):
+        code, out, _, stats = self.run_python("print('x' * 1000)", "-o", "100")
+        self.assertEqual((len(out), stats["limit"]), (100, "output"))
+        self.assertEqual(main._status(code, stats), "output_limit")
+
+    def test_stderr_limit(self):
+        _, _, err, stats = self.run_python("import sys; sys.stderr.write('e' * 1000)", "-e", "10")
+        self.assertEqual((err, stats["limit"]), ("e" * 10, "output"))
+
+    def test_streams_large_output(self):
+        _, out, _, stats = self.run_python("import sys; sys.stdout.write('y' * (4 << 20))")
+        self.assertEqual((len(out), stats["limit"]), (4 << 20, "none"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -50,11 +50,11 @@ export default function Dashboard(){
 
     const buildClientSummary = async (): Promise<Summary> => {
       const [subsRes, probsRes] = await Promise.all([
-        api.get<Submission[]>('/submissions/'),
-        api.get<ProblemLite[]>('/problems/'),
+        api.get<{ results: Submission[] }>('/submissions/', { params: { page_size: 200 } }),
+        api.get<{ results: ProblemLite[] }>('/problems/', { params: { page_size: 200 } }),
       ]);
-      const subs = subsRes.data ?? [];
-      const probs = probsRes.data ?? [];
+      const subs = subsRes.data?.results ?? [];
+      const probs = probsRes.data?.results ?? [];
 
       const titleToDiff = new Map<string,string>();
       for (const p of probs) titleToDiff.set(p.title, (p as any).difficulty || 'Unknown');
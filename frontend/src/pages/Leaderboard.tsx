@@ -1,30 +1,45 @@
 import { useEffect, useState } from 'react';
 import api from '../services/apiClient';
-import { Box, Heading, Table, Thead, Tr, Th, Tbody, Td } from '@chakra-ui/react';
+import { Box, Button, Heading, Table, Thead, Tr, Th, Tbody, Td } from '@chakra-ui/react';
 
-type Row={user_id:number;username:string;solved:number;last_submission:string};
+type Row={rank:number;user_id:number;username:string;solved:number;last_submission:string};
+type Page={count:number;next_cursor:string|null;results:Row[]};
+
+const PAGE_SIZE=50;
 
 export default function Leaderboard(){
   const [rows,setRows]=useState<Row[]>([]);
-  useEffect(()=>{ (async()=>{
-    const r=await api.get('/leaderboard/');
-    setRows(r.data.results||[]);
-  })(); },[]);
+  const [cursor,setCursor]=useState<string|null>(null);
+  const [loading,setLoading]=useState(false);
+
+  const load=async(after:string|null)=>{
+    setLoading(true);
+    try{
+      const r=await api.get<Page>('/leaderboard/',{params:{limit:PAGE_SIZE,...(after?{cursor:after}:{})}});
+      setRows(prev=>after?[...prev,...(r.data.results||[])]:(r.data.results||[]));
+      setCursor(r.data.next_cursor);
+    } finally { setLoading(false); }
+  };
+  useEffect(()=>{ load(null); },[]);
+
   return (
     <Box p={8} color="white">
       <Heading size="lg" mb={4}>Leaderboard</Heading>
       <Table variant="simple" colorScheme="gray">
-        <Thead><Tr><Th>#</Th><Th>User</Th><Th isNumeric>Solved</Th><Th>Last Submission</Th></Tr></Thead>
+        <Thead><Tr><Th>#</Th><Th>User</Th><Th isNumeric>Solved</Th><Th>Last Solved</Th></Tr></Thead>
         <Tbody>
-          {rows.map((r,i)=>(
+          {rows.map(r=>(
             <Tr key={r.user_id}>
-              <Td>{i+1}</Td><Td>{r.username}</Td>
+              <Td>{r.rank}</Td><Td>{r.username}</Td>
               <Td isNumeric>{r.solved}</Td>
               <Td>{r.last_submission?.toString()?.replace('T',' ').slice(0,19) || '-'}</Td>
             </Tr>
           ))}
         </Tbody>
       </Table>
+      {cursor && (
+        <Button mt={4} size="sm" onClick={()=>load(cursor)} isLoading={loading}>Load more</Button>
+      )}
     </Box>
   );
 }
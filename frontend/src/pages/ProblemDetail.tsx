@@ -90,6 +90,11 @@ type SubmitRespA = {
   total_runtime_ms?: number; results?: SubmitItem[];
 };
 
+type SubmitStatus = SubmitRespA & { id: number; done: boolean };
+
+const POLL_MS = 1000;
+const POLL_MAX_MS = 5 * 60 * 1000;
+
 type SubmitRespB = {
   overall_verdict: string;
   breakdown: { id: number | string; visibility: 'public' | 'hidden'; status: string; timeMs?: number }[];
@@ -305,9 +310,16 @@ function ProblemDetailInner() {
   const doSubmit = async () => {
     setSubmitting(true); setSubmitData(null);
     try {
-      const r = await api.post(`/problems/${problemId}/submit/`, { code, language });
-      setSubmitData(r.data);
-      const mapped = toChips(r.data);
+      // submit only queues the submission; poll its status until judged
+      let { data } = await api.post<SubmitStatus>(`/problems/${problemId}/submit/`, { code, language });
+      const started = Date.now();
+      while (!data.done) {
+        if (Date.now() - started > POLL_MAX_MS) throw new Error('Judging is taking too long, check Submissions later');
+        await new Promise((res) => setTimeout(res, POLL_MS));
+        ({ data } = await api.get<SubmitStatus>(`/submissions/${data.id}/status/`));
+      }
+      setSubmitData(data);
+      const mapped = toChips(data);
       toast({ status: (mapped.overall === 'AC' || mapped.overall === 'Accepted') ? 'success' : 'error', title: mapped.overall });
     } catch (e: any) {
       console.error(e);
@@ -15,6 +15,8 @@ import {
   VStack,
   Text,
   Badge,
+  Button,
+  HStack,
   Link as ChakraLink,
 } from '@chakra-ui/react';
 import { Link as RouterLink } from 'react-router-dom';
@@ -26,18 +28,33 @@ interface Problem {
   title: string;
   difficulty: 'Easy' | 'Medium' | 'Hard';
   tags: string[];
+  submissions?: number;
+  accepted?: number;
 }
 
+interface ProblemPage {
+  count: number;
+  next: string | null;
+  previous: string | null;
+  results: Problem[];
+}
+
+const PAGE_SIZE = 50;
+
 const Problems = () => {
   const [problems, setProblems] = useState<Problem[]>([]);
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
+  const [page, setPage] = useState<number>(1);
+  const [count, setCount] = useState<number>(0);
 
   useEffect(() => {
     const fetchProblems = async () => {
+      setLoading(true);
       try {
-        const response = await api.get('/problems/');
-        setProblems(response.data);
+        const response = await api.get<ProblemPage>('/problems/', { params: { page, page_size: PAGE_SIZE } });
+        setProblems(response.data.results);
+        setCount(response.data.count);
       } catch (err) {
         setError('Failed to fetch problems. Please make sure the backend server is running.');
       } finally {
@@ -45,7 +62,9 @@ const Problems = () => {
       }
     };
     fetchProblems();
-  }, []);
+  }, [page]);
+
+  const pages = Math.max(1, Math.ceil(count / PAGE_SIZE));
 
   if (loading) {
     return (
@@ -91,6 +110,7 @@ const Problems = () => {
               <Th color="gray.700" fontWeight="bold">Challenge Title</Th>
               <Th color="gray.700" fontWeight="bold">Difficulty</Th>
               <Th color="gray.700" fontWeight="bold">Topics</Th>
+              <Th color="gray.700" fontWeight="bold" isNumeric>Acceptance</Th>
             </Tr>
           </Thead>
 
@@ -132,10 +152,30 @@ const Problems = () => {
                     {problem.tags.join(', ')}
                   </Text>
                 </Td>
+
+                <Td isNumeric>
+                  <Text fontSize="sm" color="gray.600">
+                    {problem.submissions
+                      ? `${Math.round((100 * (problem.accepted ?? 0)) / problem.submissions)}%`
+                      : '—'}
+                  </Text>
+                </Td>
               </Tr>
             ))}
           </Tbody>
         </Table>
+
+        {pages > 1 && (
+          <HStack justify="center" spacing={4}>
+            <Button size="sm" onClick={() => setPage(p => p - 1)} isDisabled={page <= 1}>
+              Previous
+            </Button>
+            <Text fontSize="sm" color="gray.600">Page {page} of {pages}</Text>
+            <Button size="sm" onClick={() => setPage(p => p + 1)} isDisabled={page >= pages}>
+              Next
+            </Button>
+          </HStack>
+        )}
       </VStack>
     </Container>
   );
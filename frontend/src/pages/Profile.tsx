@@ -17,14 +17,17 @@ const verdictStyles = (v: string) =>
 type Submission = {
   id: number;
   problem: string;
-  code: string;
   language: "python" | "cpp" | "java" | string;
   verdict: string;
   execution_time?: number;
   submitted_at: string;
 };
 
-type ProblemLite = { id: number; title: string; difficulty?: string };
+type Summary = {
+  total_submissions: number;
+  solved_count: number;
+  difficulty_breakdown: Record<string, number>;
+};
 
 const isAccepted = (v: string) => /^(ac|accepted)$/i.test((v || '').trim());
 const tagProps = (v: string) =>
@@ -35,32 +38,23 @@ export default function Profile() {
   const [loading, setLoading] = useState(true);
   const [byDiff, setByDiff] = useState<Record<string, number>>({});
   const [solved, setSolved] = useState(0);
+  const [total, setTotal] = useState(0);
 
   useEffect(() => {
     let alive = true;
     (async () => {
       try {
-        const probs = await api.get<ProblemLite[]>("/problems/");
-        const titleToDiff = new Map<string, string>();
-        for (const p of probs.data) titleToDiff.set(p.title, (p as any).difficulty || "Unknown");
-
-        const r = await api.get<Submission[]>("/submissions/");
+        // counters come from the server; the history is paged, so only its first page is fetched
+        const [summary, r] = await Promise.all([
+          api.get<Summary>("/me/summary/"),
+          api.get<{ results: Submission[] }>("/submissions/"),
+        ]);
         if (!alive) return;
 
-        const data = r.data ?? [];
-        setSubs(data);
-
-        const acceptedTitles = new Set(
-          data.filter(s => isAccepted(s.verdict)).map(s => s.problem)
-        );
-        setSolved(acceptedTitles.size);
-
-        const diffCounter: Record<string, number> = {};
-        for (const t of acceptedTitles) {
-          const d = titleToDiff.get(t) || "Unknown";
-          diffCounter[d] = (diffCounter[d] || 0) + 1;
-        }
-        setByDiff(diffCounter);
+        setSubs(r.data?.results ?? []);
+        setTotal(summary.data.total_submissions);
+        setSolved(summary.data.solved_count);
+        setByDiff(summary.data.difficulty_breakdown ?? {});
       } finally {
         if (alive) setLoading(false);
       }
@@ -79,7 +73,7 @@ export default function Profile() {
       <SimpleGrid columns={[1, 3]} spacing={4} mb={6}>
         <Stat bg="#111827" border="1px solid #1f2937" p={4} borderRadius="md">
           <StatLabel>Total submissions</StatLabel>
-          <StatNumber>{loading ? "…" : subs.length}</StatNumber>
+          <StatNumber>{loading ? "…" : total}</StatNumber>
         </Stat>
 
         <Stat bg="#111827" border="1px solid #1f2937" p={4} borderRadius="md">
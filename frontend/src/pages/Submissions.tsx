@@ -1,7 +1,7 @@
 //frontend/pages/Submissions.tsx
 import { useEffect, useState } from 'react';
 import api from '../services/apiClient';
-import { Box, Heading, Table, Thead, Tr, Th, Tbody, Td, Tag } from '@chakra-ui/react';
+import { Box, Button, Heading, Table, Thead, Tr, Th, Tbody, Td, Tag } from '@chakra-ui/react';
 
 // put this near the top of each file
 const verdictStyles = (v: string) =>
@@ -13,12 +13,13 @@ const verdictStyles = (v: string) =>
 type S = {
   id: number;
   problem: string;
-  code: string;
+  problem_id: number;
   language: string;
   verdict: string;
   execution_time: number;
   submitted_at: string;
 };
+type Page = { next: string | null; results: S[] };
 
 const isAccepted = (v: string) => /^(ac|accepted)$/i.test((v || '').trim());
 const tagProps = (v: string) =>
@@ -26,13 +27,19 @@ const tagProps = (v: string) =>
 
 export default function Submissions() {
   const [items, setItems] = useState<S[]>([]);
+  const [next, setNext] = useState<string | null>(null);
+  const [loading, setLoading] = useState(false);
 
-  useEffect(() => {
-    (async () => {
-      const r = await api.get('/submissions/');
-      setItems(r.data || []);
-    })();
-  }, []);
+  // newest first; `next` is the server's cursor link for the following page
+  const load = async (url: string | null) => {
+    setLoading(true);
+    try {
+      const r = await api.get<Page>(url ?? '/submissions/');
+      setItems(prev => url ? [...prev, ...(r.data.results || [])] : (r.data.results || []));
+      setNext(r.data.next);
+    } finally { setLoading(false); }
+  };
+  useEffect(() => { load(null); }, []);
 
   return (
     <Box p={8} color="white">
@@ -69,6 +76,9 @@ export default function Submissions() {
           ))}
         </Tbody>
       </Table>
+      {next && (
+        <Button mt={4} size="sm" onClick={() => load(next)} isLoading={loading}>Load more</Button>
+      )}
     </Box>
   );
 }
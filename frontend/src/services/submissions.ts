@@ -4,7 +4,8 @@ import api from './apiClient';
 export type Submission = {
   id: number;
   problem: string;        // title (from your serializer)
-  user: string;
+  problem_id?: number;
+  user?: string;
   language: string;
   verdict: string;        // 'Accepted', 'Wrong Answer', etc.
   execution_time?: number;